@@ -0,0 +1,113 @@
+## MIT License
+##
+## Copyright (c) 2021 conveen
+##
+## Permission is hereby granted, free of charge, to any person obtaining a copy
+## of this software and associated documentation files (the "Software"), to deal
+## in the Software without restriction, including without limitation the rights
+## to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+## copies of the Software, and to permit persons to whom the Software is
+## furnished to do so, subject to the following conditions:
+##
+## The above copyright notice and this permission notice shall be included in all
+## copies or substantial portions of the Software.
+##
+## THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+## IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+## FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+## AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+## LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+## OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+## SOFTWARE.
+
+import typing
+
+from django.db.models import QuerySet
+from django.template import loader
+from rest_framework import pagination
+from rest_framework.exceptions import ValidationError
+from rest_framework.request import Request as APIRequest
+from rest_framework.response import Response as APIResponse
+from rest_framework.utils.urls import replace_query_param
+from rest_framework.views import APIView
+
+
+class DestinationKeysetPagination(pagination.BasePagination):
+    """Keyset (cursor) pagination over ``models.Destination.id``.
+
+    Pagination is opt-in, and only applies if the ``page_size`` or ``cursor`` query parameter is provided.
+    The cursor is the ID of the last destination on the previous page, so each page is fetched with
+    an indexed ``id > cursor`` range scan instead of an ``OFFSET``, which gets slower the further in the
+    table the page is. Pages are returned as ``{"next": <URL of next page or null>, "results": [...]}``.
+    """
+
+    cursor_query_param = "cursor"
+    page_size_query_param = "page_size"
+    page_size = 100
+    max_page_size = 1000
+    template = "rest_framework/pagination/previous_and_next.html"
+
+    def __init__(self) -> None:
+        self.display_page_controls = False
+        self.next_cursor: typing.Optional[int] = None
+        self.request: typing.Optional[APIRequest] = None
+
+    def _parse_query_param(self, request: APIRequest, name: str, default: int, minimum: int) -> int:
+        value = request.query_params.get(name)
+        if value is None:
+            return default
+
+        try:
+            parsed = int(value)
+        except ValueError as exc:
+            raise ValidationError({name: "Must be an integer"}) from exc
+        if parsed < minimum:
+            raise ValidationError({name: f"Must be at least {minimum}"})
+        return parsed
+
+    def paginate_queryset(
+        self,
+        queryset: QuerySet,
+        request: APIRequest,
+        view: typing.Optional[APIView] = None,
+    ) -> typing.Optional[QuerySet]:
+        """Filter ``queryset`` to the requested page, or return ``None`` if pagination wasn't requested.
+
+        Returns a queryset (rather than a list of instances) so the page can be serialized with ``.values()``.
+        """
+        query_params = request.query_params
+        if self.cursor_query_param not in query_params and self.page_size_query_param not in query_params:
+            return None
+
+        self.request = request
+        self.display_page_controls = True
+        cursor = self._parse_query_param(request, self.cursor_query_param, 0, 0)
+        page_size = min(
+            self._parse_query_param(request, self.page_size_query_param, self.page_size, 1),
+            self.max_page_size,
+        )
+
+        # Fetch one more ID than the page size to find out whether there's a next page
+        ids = list(
+            queryset.prefetch_related(None)
+            .filter(id__gt=cursor)
+            .order_by("id")
+            .values_list("id", flat=True)[: page_size + 1]
+        )
+        self.next_cursor = ids[page_size - 1] if len(ids) > page_size else None
+        return queryset.filter(id__in=ids[:page_size]).order_by("id")
+
+    def get_next_link(self) -> typing.Optional[str]:
+        if self.next_cursor is None or self.request is None:
+            return None
+        return replace_query_param(self.request.build_absolute_uri(), self.cursor_query_param, self.next_cursor)
+
+    def get_paginated_response(self, data: typing.Any) -> APIResponse:
+        return APIResponse({"next": self.get_next_link(), "results": data})
+
+    def get_html_context(self) -> typing.Dict[str, typing.Optional[str]]:
+        # Pages can only be followed forward, since the cursor is the last ID of the previous page
+        return {"previous_url": None, "next_url": self.get_next_link()}
+
+    def to_html(self) -> str:
+        return loader.get_template(self.template).render(self.get_html_context())
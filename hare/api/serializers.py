@@ -23,10 +23,13 @@
 import logging
 import typing
 
+from django.db import transaction
+from django.db.models import QuerySet
 from rest_framework import serializers
 
 from hare.core import models
 from hare.core import models_utils
+from hare.core import signals
 
 
 logger = logging.getLogger(__name__)
@@ -41,13 +44,43 @@ class AliasSerializer(serializers.ModelSerializer):
         fields = ["id", "name"]
 
 
+class ShortcutAliasSerializer(AliasSerializer):
+    """Serializer for ``models.Alias`` nested in ``ShortcutSerializer``.
+
+    Uniqueness is validated by ``ShortcutSerializer`` instead, so that a shortcut's
+    own aliases can be submitted when it's updated.
+    """
+
+    class Meta(AliasSerializer.Meta):
+        extra_kwargs = {"name": {"validators": []}}
+
+
+class AliasesUpdateSerializer(serializers.Serializer):  # pylint: disable=abstract-method
+    """Serializer for updating the aliases of a shortcut.
+
+    Accepts either the desired ``aliases``, or lists of aliases to ``add`` and ``remove``
+    (see: ``models.DestinationManager.update_aliases``).
+    """
+
+    aliases = serializers.ListField(child=serializers.CharField(), required=False)
+    add = serializers.ListField(child=serializers.CharField(), required=False, default=list)
+    remove = serializers.ListField(child=serializers.CharField(), required=False, default=list)
+
+    def validate(self, attrs: RequestData) -> RequestData:
+        if "aliases" not in attrs and not attrs["add"] and not attrs["remove"]:
+            raise serializers.ValidationError("Must provide either aliases or aliases to add or remove")
+        if "aliases" in attrs and (attrs["add"] or attrs["remove"]):
+            raise serializers.ValidationError("Must not provide aliases along with aliases to add or remove")
+        return attrs
+
+
 class ShortcutSerializer(serializers.ModelSerializer):
     """Serializer for reading a shortcut.
 
     A shortcut is defined as a ``models.Destination`` and its associated ``models.Alias`` objects.
     """
 
-    aliases = AliasSerializer(many=True)
+    aliases = ShortcutAliasSerializer(many=True)
 
     def validate_url(self, value: str) -> str:  # pylint: disable=no-self-use
         """Validate the URL according to ``models_utils.validate_netloc_url``."""
@@ -58,8 +91,27 @@ class ShortcutSerializer(serializers.ModelSerializer):
 
         return value
 
+    def validate_aliases(self, value: typing.List[RequestData]) -> typing.List[RequestData]:
+        """Validate that there's at least one alias and none of them belong to another shortcut."""
+        names = {alias["name"] for alias in value}
+        if not names:
+            raise serializers.ValidationError("Must provide one or more aliases")
+
+        existing_aliases = models.Alias.objects.filter(name__in=names)
+        if self.instance is not None:
+            existing_aliases = existing_aliases.exclude(destination=self.instance)
+        existing_names = sorted(existing_aliases.values_list("name", flat=True))
+        if existing_names:
+            raise serializers.ValidationError(f"Aliases already exist: {', '.join(existing_names)}")
+
+        return value
+
     def validate(self, attrs: RequestData) -> RequestData:
         """Validate URL arguments and parse ``num_args``."""
+        # URL may be omitted from partial updates
+        if "url" not in attrs:
+            return attrs
+
         try:
             attrs["num_args"] = models_utils.gen_num_args_from_url(attrs["url"])
         except ValueError as exc:
@@ -72,14 +124,27 @@ class ShortcutSerializer(serializers.ModelSerializer):
         return attrs
 
     def create(self, validated_data: RequestData) -> models.Destination:
-        aliases = validated_data.pop("aliases")
-        destination = models.Destination.objects.create(**validated_data)
-        models.Alias.objects.bulk_create([models.Alias(**alias, destination=destination) for alias in aliases])
+        names = sorted({alias["name"] for alias in validated_data.pop("aliases")})
+        with transaction.atomic():
+            destination = models.Destination.objects.create(**validated_data)
+            models.Alias.objects.bulk_create([models.Alias(name=name, destination=destination) for name in names])
+            signals.shortcuts_changed.send(sender=models.Destination, destination_ids=[destination.id])
         return destination
 
     def update(self, instance: models.Destination, validated_data: RequestData) -> models.Destination:
-        validated_data.pop("aliases", None)
-        return super().update(instance, validated_data)
+        """Update destination and apply the difference between the submitted and stored aliases (if submitted).
+
+        See: ``models.DestinationManager.update_aliases``.
+        """
+        aliases = validated_data.pop("aliases", None)
+        with transaction.atomic():
+            instance = super().update(instance, validated_data)
+            if aliases is not None:
+                try:
+                    models.Destination.objects.update_aliases(instance, aliases=[alias["name"] for alias in aliases])
+                except ValueError as exc:
+                    raise serializers.ValidationError({"aliases": str(exc)}) from exc
+        return instance
 
     class Meta:
         model = models.Destination
@@ -90,3 +155,36 @@ class ShortcutSerializer(serializers.ModelSerializer):
             # Cannot be set via API, must be set by DB query
             "is_default_fallback": {"read_only": True},
         }
+
+
+def serialize_shortcut_values(
+    queryset: QuerySet,
+    fields: typing.Optional[typing.Sequence[str]] = None,
+) -> typing.List[RequestData]:
+    """Serialize destinations in ``queryset`` like ``ShortcutSerializer(queryset, many=True).data``.
+
+    Read-only fast path for listing shortcuts. Rows are fetched with ``.values_list`` and aliases with
+    a single query, and the representation is built directly, so no model instances are created and
+    no serializer fields are run. Produces the same JSON schema as ``ShortcutSerializer``, restricted
+    to ``fields`` (a subset of ``ShortcutSerializer.Meta.fields``) if provided. Aliases aren't
+    queried at all if they aren't requested.
+    """
+    fields = [field for field in ShortcutSerializer.Meta.fields if fields is None or field in fields]
+    # ID is always fetched to group aliases by destination
+    row_fields = ["id", *(field for field in fields if field not in ("id", "aliases"))]
+    rows = list(queryset.prefetch_related(None).values_list(*row_fields))
+
+    aliases: typing.Dict[int, typing.List[RequestData]] = {row[0]: [] for row in rows}
+    if aliases and "aliases" in fields:
+        for id_, name, destination_id in (
+            models.Alias.objects.filter(destination_id__in=list(aliases))
+            .order_by("id")
+            .values_list("id", "name", "destination_id")
+        ):
+            aliases[destination_id].append({"id": id_, "name": name})
+
+    results = []
+    for row in rows:
+        values = dict(zip(row_fields, row), aliases=aliases[row[0]])
+        results.append({field: values[field] for field in fields})
+    return results
@@ -19,3 +19,346 @@
 ## LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
 ## OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
 ## SOFTWARE.
+
+import json
+
+from django.urls import reverse
+from rest_framework import status
+from rest_framework import test as api_unittest
+from rest_framework.renderers import JSONRenderer
+
+from hare.api import serializers, views
+from hare.core import models
+
+
+class TestImportShortcuts(api_unittest.APITestCase):
+    """Tests for ``views.ImportShortcuts``."""
+
+    def test_import(self) -> None:
+        """Test that rows are imported and errors are reported per line."""
+        response = self.client.post(
+            reverse("api:import-shortcuts"),
+            data=(
+                '{"url": "https://www.python.org", "description": "Python", "aliases": ["py"]}\n'
+                '{"url": "https://github.com", "aliases": ["py"]}\n'
+            ),
+            content_type="application/jsonl",
+        )
+
+        self.assertEqual(status.HTTP_200_OK, response.status_code)
+        self.assertEqual(1, response.data["created"])
+        self.assertEqual([2], [error["line"] for error in response.data["errors"]])
+        self.assertTrue(models.Alias.objects.filter(name="py").exists())
+
+    def test_import_unsupported_content_type(self) -> None:
+        """Test that bodies that aren't JSON Lines or CSV are rejected."""
+        response = self.client.post(reverse("api:import-shortcuts"), data={}, format="json")
+        self.assertEqual(status.HTTP_415_UNSUPPORTED_MEDIA_TYPE, response.status_code)
+
+    def test_import_without_content_length(self) -> None:
+        """Test that bodies without a Content-Length are rejected rather than silently importing nothing."""
+        request = api_unittest.APIRequestFactory().post(
+            reverse("api:import-shortcuts"),
+            data='{"url": "https://www.python.org", "aliases": ["py"]}\n',
+            content_type="application/jsonl",
+            HTTP_TRANSFER_ENCODING="chunked",
+        )
+        del request.META["CONTENT_LENGTH"]
+
+        response = views.ImportShortcuts.as_view()(request)
+        self.assertEqual(status.HTTP_411_LENGTH_REQUIRED, response.status_code)
+        self.assertFalse(models.Alias.objects.filter(name="py").exists())
+
+
+class TestExportShortcuts(api_unittest.APITestCase):
+    """Tests for ``views.ExportShortcuts``."""
+
+    def test_export(self) -> None:
+        """Test that shortcuts are streamed in the requested format."""
+        models.Destination.objects.create_with_aliases("https://www.python.org", "Python", ["py", "python"])
+
+        response = self.client.get(reverse("api:export-shortcuts"), {"type": "csv"})
+        self.assertEqual(status.HTTP_200_OK, response.status_code)
+        self.assertEqual("text/csv", response["Content-Type"])
+        self.assertEqual(
+            "url,description,aliases,is_fallback,is_default_fallback\r\n"
+            "https://www.python.org,Python,py python,false,false\r\n",
+            b"".join(response.streaming_content).decode(),
+        )
+
+        response = self.client.get(reverse("api:export-shortcuts"), {"type": "xml"})
+        self.assertEqual(status.HTTP_400_BAD_REQUEST, response.status_code)
+
+
+class TestUpdateAliases(api_unittest.APITestCase):
+    """Tests for ``views.UpdateAliases``."""
+
+    def setUp(self) -> None:
+        self.python = models.Destination.objects.create_with_aliases(
+            "https://www.python.org", "Python", ["py", "python"]
+        )
+        models.Destination.objects.create_with_aliases("https://github.com", "GitHub", ["gh"])
+        self.url = reverse("api:aliases", kwargs={"pk": self.python.id})
+
+    def test_replace_aliases(self) -> None:
+        """Test that the desired aliases replace the existing ones."""
+        response = self.client.post(self.url, {"aliases": ["python", "python3"]}, format="json")
+        self.assertEqual(status.HTTP_200_OK, response.status_code)
+        self.assertEqual(["python", "python3"], response.data["aliases"])
+        self.assertEqual(
+            ["python", "python3"], sorted(self.python.aliases.values_list("name", flat=True))  # type: ignore
+        )
+
+    def test_add_remove_aliases(self) -> None:
+        """Test that aliases are added and removed."""
+        response = self.client.post(self.url, {"add": ["py3"], "remove": ["py", "gh"]}, format="json")
+        self.assertEqual(status.HTTP_200_OK, response.status_code)
+        self.assertEqual(["py3", "python"], response.data["aliases"])
+        self.assertTrue(models.Alias.objects.filter(name="gh").exists())
+
+    def test_invalid_aliases(self) -> None:
+        """Test that aliases of other destinations, or removing every alias, are rejected."""
+        for data in ({"add": ["gh"]}, {"aliases": []}, {}):
+            with self.subTest(data=data):
+                response = self.client.post(self.url, data, format="json")
+                self.assertEqual(status.HTTP_400_BAD_REQUEST, response.status_code)
+        self.assertEqual(["py", "python"], sorted(self.python.aliases.values_list("name", flat=True)))  # type: ignore
+
+    def test_alias_named_aliases(self) -> None:
+        """Test that an alias named "aliases" can still be created with the single alias route."""
+        response = self.client.post(reverse("api:alias", kwargs={"pk": self.python.id, "name": "aliases"}))
+        self.assertEqual(status.HTTP_201_CREATED, response.status_code)
+        self.assertTrue(models.Alias.objects.filter(name="aliases", destination=self.python).exists())
+
+
+class TestUpdateShortcut(api_unittest.APITestCase):
+    """Tests for updating shortcuts with ``views.GetUpdateDeleteShortcut``."""
+
+    def setUp(self) -> None:
+        self.python = models.Destination.objects.create_with_aliases(
+            "https://www.python.org", "Python", ["py", "python"]
+        )
+        self.github = models.Destination.objects.create_with_aliases("https://github.com", "GitHub", ["gh"])
+        self.url = reverse("api:shortcut", kwargs={"pk": self.python.id})
+
+    def test_update_aliases(self) -> None:
+        """Test that submitted aliases replace the stored ones, keeping the unchanged ones."""
+        alias_id = models.Alias.objects.get(name="python").id
+        response = self.client.put(
+            self.url,
+            {
+                "url": "https://www.python.org/search/?q={}",
+                "description": "Python Search",
+                "is_fallback": False,
+                "aliases": [{"name": "python"}, {"name": "pys"}],
+            },
+            format="json",
+        )
+
+        self.assertEqual(status.HTTP_200_OK, response.status_code)
+        self.assertEqual(1, response.data["num_args"])
+        self.assertEqual(["pys", "python"], sorted(alias["name"] for alias in response.data["aliases"]))
+        self.assertEqual(alias_id, models.Alias.objects.get(name="python").id)
+
+    def test_partial_update(self) -> None:
+        """Test that aliases are left as is if not submitted."""
+        response = self.client.patch(self.url, {"description": "Python.org"}, format="json")
+        self.assertEqual(status.HTTP_200_OK, response.status_code)
+        self.assertEqual(["py", "python"], sorted(alias["name"] for alias in response.data["aliases"]))
+
+    def test_update_aliases_of_other_shortcut(self) -> None:
+        """Test that aliases of other shortcuts are rejected."""
+        response = self.client.patch(self.url, {"aliases": [{"name": "gh"}]}, format="json")
+        self.assertEqual(status.HTTP_400_BAD_REQUEST, response.status_code)
+        self.assertEqual(self.github.id, models.Alias.objects.get(name="gh").destination_id)
+
+
+class TestShortcutQueryCounts(api_unittest.APITestCase):
+    """Tests that reading shortcuts takes a constant number of queries, regardless of the number of shortcuts."""
+
+    SIZES = (10, 1000, 10000)
+
+    def create_shortcuts(self, start: int, stop: int) -> None:
+        for batch_start in range(start, stop, 2000):
+            models.Destination.objects.create_many_with_aliases(
+                [
+                    models.NewShortcut(f"https://example.com/{index}/{{}}", "Example", [f"e{index}", f"ex{index}"])
+                    for index in range(batch_start, min(batch_start + 2000, stop))
+                ]
+            )
+
+    def test_num_queries(self) -> None:
+        """Test that listing shortcuts, and getting a single shortcut, take three queries each
+        (one for the ETag, one for destinations and one for their aliases).
+        """
+        num_shortcuts = 0
+        for size in self.SIZES:
+            self.create_shortcuts(num_shortcuts, size)
+            num_shortcuts = size
+            destination_id = models.Destination.objects.values_list("id", flat=True).last()
+
+            with self.subTest(size=size):
+                with self.assertNumQueries(3):
+                    response = self.client.get(reverse("api:shortcuts"))
+                self.assertEqual(size, len(response.data))
+                self.assertEqual(2, len(response.data[-1]["aliases"]))
+
+                with self.assertNumQueries(3):
+                    response = self.client.get(reverse("api:shortcut", kwargs={"pk": destination_id}))
+                self.assertEqual(2, len(response.data["aliases"]))
+
+
+class TestListShortcuts(api_unittest.APITestCase):
+    """Tests for listing shortcuts with ``views.ListCreateShortcut``."""
+
+    def test_same_schema(self) -> None:
+        """Test that the fast path serializes shortcuts exactly like ``serializers.ShortcutSerializer``."""
+        models.Destination.objects.create_with_aliases("https://www.python.org", "Python", ["py", "python"])
+        models.Destination.objects.create_with_aliases(
+            "https://duckduckgo.com/?q={}", "DuckDuckGo", ["ddg"], True, True
+        )
+
+        response = self.client.get(reverse("api:shortcuts"))
+        self.assertEqual(status.HTTP_200_OK, response.status_code)
+        expected = serializers.ShortcutSerializer(models.Destination.objects.all(), many=True).data
+        self.assertEqual(json.loads(JSONRenderer().render(expected)), response.json())
+
+    def test_sparse_fieldsets(self) -> None:
+        """Test that only the requested fields are returned, and aliases aren't queried unless requested."""
+        models.Destination.objects.create_with_aliases("https://www.python.org", "Python", ["py", "python"])
+
+        with self.assertNumQueries(2):
+            response = self.client.get(reverse("api:shortcuts"), {"fields": "url,description"})
+        self.assertEqual([{"url": "https://www.python.org", "description": "Python"}], response.json())
+
+        response = self.client.get(reverse("api:shortcuts"), {"fields": "aliases,password"})
+        self.assertEqual(status.HTTP_400_BAD_REQUEST, response.status_code)
+
+    def test_pagination(self) -> None:
+        """Test that pages follow each other by ID, and that every shortcut is returned exactly once."""
+        models.Destination.objects.create_many_with_aliases(
+            [models.NewShortcut(f"https://example.com/{index}", "Example", [f"e{index}"]) for index in range(5)]
+        )
+
+        names = []
+        url = reverse("api:shortcuts") + "?page_size=2&fields=aliases"
+        while url:
+            with self.assertNumQueries(4):
+                response = self.client.get(url)
+            self.assertEqual(status.HTTP_200_OK, response.status_code)
+            self.assertLessEqual(len(response.data["results"]), 2)
+            names.extend(alias["name"] for result in response.data["results"] for alias in result["aliases"])
+            url = response.data["next"]
+
+        self.assertEqual([f"e{index}" for index in range(5)], names)
+
+    def test_pagination_browsable_api(self) -> None:
+        """Test that the browsable API links to the next page."""
+        models.Destination.objects.create_many_with_aliases(
+            [models.NewShortcut(f"https://example.com/{index}", "Example", [f"e{index}"]) for index in range(3)]
+        )
+
+        response = self.client.get(reverse("api:shortcuts"), {"page_size": "2"}, HTTP_ACCEPT="text/html")
+        self.assertEqual(status.HTTP_200_OK, response.status_code)
+        self.assertContains(response, 'class="pager"')
+        self.assertContains(response, "cursor=2")
+
+
+class TestListChanges(api_unittest.APITestCase):
+    """Tests for ``views.ListChanges``."""
+
+    def test_sync(self) -> None:
+        """Test that a mirror synced with the full list and then the changes matches the shortcuts."""
+        python = models.Destination.objects.create_with_aliases("https://www.python.org", "Python", ["py"])
+        github = models.Destination.objects.create_with_aliases("https://github.com", "GitHub", ["gh"])
+
+        response = self.client.get(reverse("api:changes"))
+        self.assertEqual([python.id, github.id], [shortcut["id"] for shortcut in response.data["changed"]])
+        version = response.data["version"]
+
+        with self.assertNumQueries(1):
+            response = self.client.get(reverse("api:changes"), {"since": version})
+        self.assertEqual(status.HTTP_204_NO_CONTENT, response.status_code)
+
+        models.Alias.objects.create(name="python", destination=python)
+        github_id = github.id
+        github.delete()
+        pypi = models.Destination.objects.create_with_aliases("https://pypi.org", "PyPI", ["pypi"])
+
+        response = self.client.get(reverse("api:changes"), {"since": version})
+        self.assertEqual(status.HTTP_200_OK, response.status_code)
+        self.assertGreater(response.data["version"], version)
+        self.assertEqual(
+            [(python.id, ["py", "python"]), (pypi.id, ["pypi"])],
+            [
+                (shortcut["id"], sorted(alias["name"] for alias in shortcut["aliases"]))
+                for shortcut in response.data["changed"]
+            ],
+        )
+        self.assertEqual([github_id], response.data["deleted"])
+
+    def test_sync_pruned(self) -> None:
+        """Test that syncing since a version whose changes were pruned is rejected."""
+        models.Destination.objects.create_with_aliases("https://www.python.org", "Python", ["py"])
+        version = models.ShortcutsVersion.objects.current()
+        models.Destination.objects.create_with_aliases("https://github.com", "GitHub", ["gh"])
+        models.ShortcutChange.objects.prune(keep_versions=1)
+
+        response = self.client.get(reverse("api:changes"), {"since": version - 1})
+        self.assertEqual(status.HTTP_410_GONE, response.status_code)
+
+        response = self.client.get(reverse("api:changes"), {"since": version})
+        self.assertEqual(status.HTTP_200_OK, response.status_code)
+        self.assertEqual(["GitHub"], [shortcut["description"] for shortcut in response.data["changed"]])
+
+
+class TestSearchShortcuts(api_unittest.APITestCase):
+    """Tests for ``views.SearchShortcuts``."""
+
+    def setUp(self) -> None:
+        self.python = models.Destination.objects.create_with_aliases(
+            "https://docs.python.org/3/search.html?q={}", "Python documentation", ["py"]
+        )
+        self.github = models.Destination.objects.create_with_aliases(
+            "https://github.com/search?q={}", "Code search", ["gh", "python-code"]
+        )
+
+    def test_search(self) -> None:
+        """Test that shortcuts are returned best match first, with the same schema as the shortcut list."""
+        response = self.client.get(reverse("api:search"), {"q": "python"})
+        self.assertEqual(status.HTTP_200_OK, response.status_code)
+        self.assertEqual(
+            serializers.ShortcutSerializer([self.github, self.python], many=True).data,
+            response.data["results"],
+        )
+
+        response = self.client.get(reverse("api:search"), {"q": "python", "limit": "1"})
+        self.assertEqual([self.github.id], [shortcut["id"] for shortcut in response.data["results"]])
+
+    def test_invalid_limit(self) -> None:
+        """Test that limits that aren't between 1 and the maximum are rejected."""
+        for limit in ("0", "1000", "many"):
+            response = self.client.get(reverse("api:search"), {"q": "python", "limit": limit})
+            self.assertEqual(status.HTTP_400_BAD_REQUEST, response.status_code)
+
+
+class TestConditionalGet(api_unittest.APITestCase):
+    """Tests for answering ``If-None-Match`` on the shortcut views."""
+
+    def test_not_modified(self) -> None:
+        """Test that list and detail responses aren't serialized again while the shortcuts haven't changed."""
+        python = models.Destination.objects.create_with_aliases("https://www.python.org", "Python", ["py"])
+
+        for url in (reverse("api:shortcuts"), reverse("api:shortcut", kwargs={"pk": python.id})):
+            with self.subTest(url=url):
+                etag = self.client.get(url)["ETag"]
+                with self.assertNumQueries(1):
+                    response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+                self.assertEqual(status.HTTP_304_NOT_MODIFIED, response.status_code)
+
+                # Other representations of the same shortcuts have a different ETag
+                self.assertNotEqual(etag, self.client.get(url, HTTP_ACCEPT="text/html")["ETag"])
+
+        models.Alias.objects.create(name="python", destination=python)
+        response = self.client.get(reverse("api:shortcuts"), HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(status.HTTP_200_OK, response.status_code)
@@ -26,7 +26,13 @@ from hare.api import views
 
 app_name = "api"
 urlpatterns = [
+    path("changes/", views.ListChanges.as_view(), name="changes"),
+    path("search/", views.SearchShortcuts.as_view(), name="search"),
     path("shortcut/", views.ListCreateShortcut.as_view(), name="shortcuts"),
+    path("shortcut/export/", views.ExportShortcuts.as_view(), name="export-shortcuts"),
+    path("shortcut/import/", views.ImportShortcuts.as_view(), name="import-shortcuts"),
     path("shortcut/<int:pk>/", views.GetUpdateDeleteShortcut.as_view(), name="shortcut"),
+    # Alias names can't contain "/", so this can't collide with the alias route
+    path("shortcut/<int:pk>/aliases/batch/", views.UpdateAliases.as_view(), name="aliases"),
     path("shortcut/<int:pk>/<str:name>/", views.CreateDeleteAlias.as_view(), name="alias"),
 ]
@@ -20,33 +20,110 @@
 ## OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
 ## SOFTWARE.
 
+import codecs
 import logging
+import typing
 
+from django.db.models import Prefetch, QuerySet
+from django.http import StreamingHttpResponse
 from django.shortcuts import get_object_or_404
-from rest_framework import generics, status
+from django.utils.decorators import method_decorator
+from django.views.decorators.http import condition
+from rest_framework import generics, status, views
+from rest_framework.exceptions import ValidationError
+from rest_framework.permissions import SAFE_METHODS
 from rest_framework.request import Request as APIRequest
 from rest_framework.response import Response as APIResponse
 
-from hare.api import serializers
-from hare.core import models
+from hare.api import pagination, serializers
+from hare.core import conditional, models, search, shortcuts_io
 
 
 logger = logging.getLogger(__name__)
 
+# Request content types accepted by ``ImportShortcuts``, and the file format of each
+IMPORT_CONTENT_TYPES = {
+    "application/jsonl": shortcuts_io.JSONL_FORMAT,
+    "application/x-ndjson": shortcuts_io.JSONL_FORMAT,
+    "text/csv": shortcuts_io.CSV_FORMAT,
+}
+# Response content type of each file format returned by ``ExportShortcuts``
+EXPORT_CONTENT_TYPES = {
+    shortcuts_io.JSONL_FORMAT: "application/jsonl",
+    shortcuts_io.CSV_FORMAT: "text/csv",
+}
+
+
+def gen_shortcuts_queryset() -> QuerySet:
+    """Generate queryset of destinations with only the fields ``serializers.ShortcutSerializer`` reads.
+
+    Aliases are fetched with a single prefetch query, rather than one query per destination.
+    """
+    return models.Destination.objects.only(
+        *(field for field in serializers.ShortcutSerializer.Meta.fields if field != "aliases")
+    ).prefetch_related(Prefetch("aliases", queryset=models.Alias.objects.only("id", "name", "destination_id")))
+
 
 class ListCreateShortcut(generics.ListCreateAPIView):
-    """List all shortcuts or create a new one."""
+    """List all shortcuts or create a new one.
 
-    queryset = models.Destination.objects.all()
+    Shortcuts are listed with the read-only fast path ``serializers.serialize_shortcut_values``,
+    paginated by ID if requested (see: ``pagination.DestinationKeysetPagination``). The ``fields``
+    query parameter selects a comma-separated subset of fields to return (i.e., ``?fields=id,url``).
+    Responses carry an ETag (see: ``conditional.gen_shortcuts_etag``), and ``If-None-Match``
+    is answered with 304 without listing any shortcuts.
+    """
+
+    pagination_class = pagination.DestinationKeysetPagination
     serializer_class = serializers.ShortcutSerializer
 
+    def get_queryset(self) -> QuerySet:
+        return gen_shortcuts_queryset()
+
+    @method_decorator(condition(etag_func=conditional.gen_shortcuts_etag))
+    def get(self, request: APIRequest, *args, **kwargs) -> APIResponse:
+        return super().get(request, *args, **kwargs)
+
+    def get_fields(self) -> typing.Optional[typing.List[str]]:
+        """Parse sparse fieldset from the ``fields`` query parameter (if provided)."""
+        value = self.request.query_params.get("fields")
+        if value is None:
+            return None
+
+        fields = [field.strip() for field in value.split(",") if field.strip()]
+        valid_fields = serializers.ShortcutSerializer.Meta.fields
+        if not fields or not set(fields).issubset(valid_fields):
+            raise ValidationError({"fields": f"Must be a comma-separated subset of {', '.join(valid_fields)}"})
+        return fields
+
+    def list(self, request: APIRequest, *args, **kwargs) -> APIResponse:
+        fields = self.get_fields()
+        queryset = self.filter_queryset(self.get_queryset())
+        page = self.paginate_queryset(queryset)
+        if page is None:
+            return APIResponse(serializers.serialize_shortcut_values(queryset, fields))
+        return self.get_paginated_response(serializers.serialize_shortcut_values(page, fields))
+
 
 class GetUpdateDeleteShortcut(generics.RetrieveUpdateDestroyAPIView):
-    """Get, update, or delete shortcut."""
+    """Get, update, or delete shortcut.
+
+    Responses to ``GET`` carry an ETag (see: ``conditional.gen_shortcuts_etag``).
+    """
 
-    queryset = models.Destination.objects.all()
     serializer_class = serializers.ShortcutSerializer
 
+    @method_decorator(condition(etag_func=conditional.gen_shortcuts_etag))
+    def get(self, request: APIRequest, *args, **kwargs) -> APIResponse:
+        return super().get(request, *args, **kwargs)
+
+    def get_queryset(self) -> QuerySet:
+        # Saving a destination with deferred fields would only save the loaded fields,
+        # but updates recompile the URL into ``url_segments`` (see: ``models.Destination.save``)
+        if self.request.method not in SAFE_METHODS:
+            return models.Destination.objects.all()
+        return gen_shortcuts_queryset()
+
 
 class CreateDeleteAlias(generics.CreateAPIView, generics.DestroyAPIView):
     """Create or delete alias for shortcut."""
@@ -80,3 +157,167 @@ class CreateDeleteAlias(generics.CreateAPIView, generics.DestroyAPIView):
 
         serializer.save(destination_id=self.destination_id())
         return APIResponse(serializer.data, status=status.HTTP_201_CREATED)
+
+
+class UpdateAliases(generics.GenericAPIView):
+    """Update the aliases of a shortcut in a single request (see: ``serializers.AliasesUpdateSerializer``).
+
+    Responds with the final list of aliases.
+    """
+
+    queryset = models.Destination.objects.only("id")
+    serializer_class = serializers.AliasesUpdateSerializer
+
+    def post(self, request: APIRequest, *args, **kwargs) -> APIResponse:
+        destination = self.get_object()
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+
+        try:
+            aliases = models.Destination.objects.update_aliases(
+                destination,
+                serializer.validated_data["add"],
+                serializer.validated_data["remove"],
+                serializer.validated_data.get("aliases"),
+            )
+        except ValueError as exc:
+            return APIResponse({"detail": str(exc)}, status=status.HTTP_400_BAD_REQUEST)
+        return APIResponse({"aliases": aliases})
+
+
+class ListChanges(views.APIView):
+    """List shortcuts changed since the version in the ``since`` query parameter (see: ``models.ShortcutChange``).
+
+    Responds with the current shortcuts version, the current state of every shortcut that was created
+    or updated since then, and the IDs of the shortcuts that were deleted since then, so that clients
+    only download changes. If ``since`` is omitted every shortcut is returned, and if nothing changed
+    since then the response is an empty 204, so polling an up-to-date mirror takes a single query.
+    If the changes since then were pruned (see: ``models.ShortcutChangeManager.prune``) the response is a 410.
+    """
+
+    def get(self, request: APIRequest, *args, **kwargs) -> APIResponse:
+        since = request.query_params.get("since")
+        try:
+            since_version = int(since) if since is not None else None
+        except ValueError:
+            return APIResponse({"detail": "Since must be an integer version"}, status=status.HTTP_400_BAD_REQUEST)
+
+        # Version must be read before the changes, so a write committed in between is returned again
+        # by the next sync rather than being skipped
+        version = models.ShortcutsVersion.objects.current()
+        if since_version is None:
+            return APIResponse(
+                {
+                    "version": version,
+                    "changed": serializers.serialize_shortcut_values(models.Destination.objects.order_by("id")),
+                    "deleted": [],
+                }
+            )
+        if since_version >= version:
+            return APIResponse(status=status.HTTP_204_NO_CONTENT)
+
+        if since_version < models.ShortcutChange.objects.oldest_version(version):
+            return APIResponse(
+                {"detail": "Changes since the version were pruned, omit since to sync every shortcut"},
+                status=status.HTTP_410_GONE,
+            )
+
+        destination_ids = models.ShortcutChange.objects.changed_since(since_version)
+        changed = serializers.serialize_shortcut_values(
+            models.Destination.objects.filter(id__in=destination_ids).order_by("id")
+        )
+        changed_ids = {shortcut["id"] for shortcut in changed}
+        return APIResponse(
+            {
+                "version": version,
+                "changed": changed,
+                "deleted": [destination_id for destination_id in destination_ids if destination_id not in changed_ids],
+            }
+        )
+
+
+class SearchShortcuts(views.APIView):
+    """Search shortcuts by description, URL, and aliases (see: ``search.search``).
+
+    The query is read from the ``q`` query parameter, and up to ``limit`` shortcuts
+    (``search.DEFAULT_LIMIT`` by default) are returned, best match first.
+    """
+
+    def get(self, request: APIRequest, *args, **kwargs) -> APIResponse:
+        try:
+            limit = int(request.query_params.get("limit", search.DEFAULT_LIMIT))
+        except ValueError:
+            limit = 0
+        if not 0 < limit <= search.MAX_LIMIT:
+            return APIResponse(
+                {"detail": f"Limit must be an integer between 1 and {search.MAX_LIMIT}"},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        destination_ids = search.search(request.query_params.get("q", ""), limit)
+        shortcuts = {
+            shortcut["id"]: shortcut
+            for shortcut in serializers.serialize_shortcut_values(
+                models.Destination.objects.filter(id__in=destination_ids)
+            )
+        }
+        return APIResponse(
+            {"results": [shortcuts[id_] for id_ in destination_ids if id_ in shortcuts]},
+        )
+
+
+class ImportShortcuts(views.APIView):
+    """Import shortcuts from a JSON Lines or CSV request body (see: ``shortcuts_io.import_shortcuts``).
+
+    The body is parsed as it's read rather than loaded into memory, so the format is
+    selected by the ``Content-Type`` header (see: ``IMPORT_CONTENT_TYPES``).
+    """
+
+    def post(self, request: APIRequest, *args, **kwargs) -> APIResponse:
+        file_format = IMPORT_CONTENT_TYPES.get(request.content_type.split(";")[0].strip().lower())
+        if file_format is None:
+            return APIResponse(
+                {"detail": f"Content type must be one of {', '.join(IMPORT_CONTENT_TYPES)}"},
+                status=status.HTTP_415_UNSUPPORTED_MEDIA_TYPE,
+            )
+
+        # The body is only read up to Content-Length, so chunked bodies without one would import nothing
+        if not request.META.get("CONTENT_LENGTH"):
+            return APIResponse({"detail": "Content-Length header is required"}, status=status.HTTP_411_LENGTH_REQUIRED)
+
+        # request.stream is None if the body is empty
+        lines = codecs.iterdecode(request.stream or [], "utf-8")
+        try:
+            result = shortcuts_io.import_shortcuts(shortcuts_io.parse_shortcuts(lines, file_format))
+        except UnicodeDecodeError:
+            return APIResponse({"detail": "Body must be UTF-8 encoded"}, status=status.HTTP_400_BAD_REQUEST)
+
+        return APIResponse(
+            {
+                "created": result.num_created,
+                "errors": [{"line": error.line, "error": error.error} for error in result.errors],
+            }
+        )
+
+
+class ExportShortcuts(views.APIView):
+    """Export every shortcut as JSON Lines or CSV (see: ``shortcuts_io.export_shortcuts``).
+
+    The format is selected by the ``type`` query parameter (``jsonl`` by default), and the response
+    is streamed as the destinations are read from the database, so memory use stays constant.
+    """
+
+    def get(self, request: APIRequest, *args, **kwargs) -> typing.Union[APIResponse, StreamingHttpResponse]:
+        file_format = request.query_params.get("type", shortcuts_io.JSONL_FORMAT)
+        if file_format not in EXPORT_CONTENT_TYPES:
+            return APIResponse(
+                {"detail": f"Type must be one of {', '.join(EXPORT_CONTENT_TYPES)}"},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        response = StreamingHttpResponse(
+            shortcuts_io.export_shortcuts(file_format),
+            content_type=EXPORT_CONTENT_TYPES[file_format],
+        )
+        response["Content-Disposition"] = f'attachment; filename="shortcuts.{file_format}"'
+        return response
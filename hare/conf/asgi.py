@@ -31,8 +31,15 @@ https://docs.djangoproject.com/en/3.2/howto/deployment/asgi/
 
 import os
 
+from django.conf import settings
 from django.core.asgi import get_asgi_application
 
 os.environ.setdefault("DJANGO_SETTINGS_MODULE", "hare.conf.settings")
 
 application = get_asgi_application()
+
+# Answer redirect requests in front of the Django application, bypassing the middleware stack
+if settings.ASGI_FAST_REDIRECTS:
+    from hare.core.asgi import RedirectApplication  # pylint: disable=wrong-import-position
+
+    application = RedirectApplication(application)
@@ -172,3 +172,56 @@ if not DEBUG:
 # Messages Settings
 
 MESSAGE_STORAGE = "django.contrib.messages.storage.session.SessionStorage"
+
+
+# Resolver Settings
+
+# Maximum number of alias -> destination records held in the (per-process) resolver cache
+RESOLVER_CACHE_SIZE = int(ENV.get(f"{settings_utils.ENV_VAR_PREFIX}_RESOLVER_CACHE_SIZE", "4096"))
+
+# False positive rate of the resolver's Bloom filter of alias names, which lets search text skip the database
+RESOLVER_ALIAS_FILTER_ERROR_RATE = float(
+    ENV.get(f"{settings_utils.ENV_VAR_PREFIX}_RESOLVER_ALIAS_FILTER_ERROR_RATE", "0.01")
+)
+
+# Whether the resolver serves redirects from a snapshot of the shortcut tables when the database is unavailable
+RESOLVER_STALE_WHILE_ERROR = (
+    ENV.get(f"{settings_utils.ENV_VAR_PREFIX}_RESOLVER_STALE_WHILE_ERROR", "").lower() == "true"
+)
+
+# File the resolver snapshot is persisted to, so that new processes can serve redirects immediately
+RESOLVER_SNAPSHOT_PATH = settings_utils.gen_optional_path_setting("RESOLVER_SNAPSHOT_PATH")
+
+# Seconds after which resolver database queries are abandoned in favor of the snapshot
+RESOLVER_QUERY_TIMEOUT = settings_utils.gen_optional_float_setting("RESOLVER_QUERY_TIMEOUT")
+
+# Maximum number of resolver database queries in flight when RESOLVER_QUERY_TIMEOUT is set,
+# beyond which queries are skipped in favor of the snapshot rather than queued
+RESOLVER_MAX_QUERY_WORKERS = int(ENV.get(f"{settings_utils.ENV_VAR_PREFIX}_RESOLVER_MAX_QUERY_WORKERS", "4"))
+
+# Seconds between checks of the shortcuts version, which invalidate the resolver cache and alias filter
+# after writes made by other processes (see: hare.core.models.ShortcutsVersion)
+RESOLVER_VERSION_CHECK_INTERVAL = float(
+    ENV.get(f"{settings_utils.ENV_VAR_PREFIX}_RESOLVER_VERSION_CHECK_INTERVAL", "1.0")
+)
+
+# Memory-mapped alias index file shared by every process on the host (see: hare.core.alias_index)
+RESOLVER_ALIAS_INDEX_PATH = settings_utils.gen_optional_path_setting("RESOLVER_ALIAS_INDEX_PATH")
+
+# Seconds between polls of the shortcuts version, which enables serving every lookup from an in-memory
+# snapshot that is reloaded whenever the version changes (see: hare.core.models.ShortcutsVersion)
+RESOLVER_VERSION_POLL_INTERVAL = settings_utils.gen_optional_float_setting("RESOLVER_VERSION_POLL_INTERVAL")
+
+# Whether hare.conf.wsgi answers redirect requests before they reach Django (see: hare.core.wsgi)
+WSGI_FAST_REDIRECTS = ENV.get(f"{settings_utils.ENV_VAR_PREFIX}_WSGI_FAST_REDIRECTS", "").lower() == "true"
+
+# Whether hare.conf.asgi answers redirect requests resolved from memory before they reach Django,
+# since the middleware stack runs in threads (see: hare.core.asgi). Only applies to ASGI deployments.
+ASGI_FAST_REDIRECTS = settings_utils.gen_bool_setting("ASGI_FAST_REDIRECTS", default=True)
+
+# Whether redirects are served by an asynchronous view, for ASGI deployments
+ASYNC_REDIRECTS = ENV.get(f"{settings_utils.ENV_VAR_PREFIX}_ASYNC_REDIRECTS", "").lower() == "true"
+
+# Maximum edit distance of "did you mean" suggestions for aliases that don't exist, which enables showing
+# the suggestions before redirecting to the fallback destination (see: hare.core.suggestions)
+ALIAS_SUGGESTION_DISTANCE = settings_utils.gen_optional_int_setting("ALIAS_SUGGESTION_DISTANCE")
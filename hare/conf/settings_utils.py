@@ -122,3 +122,50 @@ def gen_logging_setting(debug: bool) -> typing.Dict[str, typing.Any]:
             },
         },
     }
+
+
+def gen_bool_setting(name: str, default: bool = False) -> bool:
+    """Setting parsed from optional ``<ENV_VAR_PREFIX>_<name>`` environment variable as ``bool``
+    (``"true"`` or ``"false"``, case insensitive), or ``default`` if it isn't set.
+    """
+    value = ENV.get(f"{ENV_VAR_PREFIX}_{name}")
+    if not value:
+        return default
+
+    value = value.lower()
+    if value not in {"true", "false"}:
+        raise ImproperlyConfigured(f"{ENV_VAR_PREFIX}_{name} must be true or false")
+    return value == "true"
+
+
+def gen_optional_float_setting(name: str) -> typing.Optional[float]:
+    """Setting parsed from optional ``<ENV_VAR_PREFIX>_<name>`` environment variable as ``float``."""
+    value = ENV.get(f"{ENV_VAR_PREFIX}_{name}")
+    if not value:
+        return None
+
+    try:
+        return float(value)
+    except ValueError as exc:
+        raise ImproperlyConfigured(f"{ENV_VAR_PREFIX}_{name} must be a number") from exc
+
+
+def gen_optional_int_setting(name: str) -> typing.Optional[int]:
+    """Setting parsed from optional ``<ENV_VAR_PREFIX>_<name>`` environment variable as ``int``."""
+    value = ENV.get(f"{ENV_VAR_PREFIX}_{name}")
+    if not value:
+        return None
+
+    try:
+        return int(value)
+    except ValueError as exc:
+        raise ImproperlyConfigured(f"{ENV_VAR_PREFIX}_{name} must be an integer") from exc
+
+
+def gen_optional_path_setting(name: str) -> typing.Optional[Path]:
+    """Setting parsed from optional ``<ENV_VAR_PREFIX>_<name>`` environment variable as ``Path``."""
+    value = ENV.get(f"{ENV_VAR_PREFIX}_{name}")
+    if not value:
+        return None
+
+    return Path(value)
@@ -35,6 +35,7 @@ Including another URLconf
     1. Import the include() function: from django.urls import include, path
     2. Add a URL to urlpatterns:  path('blog/', include('blog.urls'))
 """
+from django.conf import settings
 from django.contrib import admin
 from django.urls import include, path
 
@@ -42,9 +43,10 @@ from hare.core import views as core_views
 from hare.ui import views as ui_views
 
 urlpatterns = [
-    path("", ui_views.index, name="index"),
+    path("", ui_views.index_async if settings.ASYNC_REDIRECTS else ui_views.index, name="index"),
     path("admin/", admin.site.urls),
     path("api/", include("hare.api.urls")),
     path("health/", core_views.health_check, name="health-check"),
     path("list/", ui_views.ListDestinations.as_view(), name="list-destinations"),
+    path("list/data/", ui_views.list_destinations_data, name="list-destinations-data"),
 ]
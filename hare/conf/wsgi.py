@@ -31,8 +31,15 @@ https://docs.djangoproject.com/en/3.2/howto/deployment/wsgi/
 
 import os
 
+from django.conf import settings
 from django.core.wsgi import get_wsgi_application
 
 os.environ.setdefault("DJANGO_SETTINGS_MODULE", "hare.conf.settings")
 
 application = get_wsgi_application()
+
+# Answer redirect requests in front of the Django application, bypassing the middleware stack
+if settings.WSGI_FAST_REDIRECTS:
+    from hare.core.wsgi import RedirectApplication  # pylint: disable=wrong-import-position
+
+    application = RedirectApplication(application)
@@ -0,0 +1,106 @@
+## MIT License
+##
+## Copyright (c) 2021 conveen
+##
+## Permission is hereby granted, free of charge, to any person obtaining a copy
+## of this software and associated documentation files (the "Software"), to deal
+## in the Software without restriction, including without limitation the rights
+## to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+## copies of the Software, and to permit persons to whom the Software is
+## furnished to do so, subject to the following conditions:
+##
+## The above copyright notice and this permission notice shall be included in all
+## copies or substantial portions of the Software.
+##
+## THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+## IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+## FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+## AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+## LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+## OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+## SOFTWARE.
+
+import itertools
+import typing
+
+from django.db import connections, NotSupportedError
+from django.db.models import Aggregate, QuerySet, TextField, Value
+
+from hare.core import models
+
+
+# Separator of alias names aggregated by ``AliasNames`` (ASCII unit separator, which aliases can't be typed with)
+ALIAS_SEPARATOR = "\x1f"
+# Aggregate function that concatenates strings, for each database backend (by vendor) that has one
+STRING_AGGREGATE_FUNCTIONS = {
+    "postgresql": "STRING_AGG",
+    "sqlite": "GROUP_CONCAT",
+}
+# Number of rows fetched from the database at a time
+DEFAULT_CHUNK_SIZE = 2000
+
+
+class AliasNames(Aggregate):  # pylint: disable=abstract-method
+    """Aggregate the names of each destination's aliases into a single string separated by ``ALIAS_SEPARATOR``.
+
+    Compiles to ``GROUP_CONCAT`` on SQLite and ``STRING_AGG`` on Postgres (see: ``STRING_AGGREGATE_FUNCTIONS``),
+    and isn't supported on other backends. The order of the names isn't defined.
+    """
+
+    output_field = TextField()
+
+    def __init__(self, **extra) -> None:
+        super().__init__("alias__name", Value(ALIAS_SEPARATOR), **extra)
+
+    def as_sql(self, compiler, connection, **extra_context):  # pylint: disable=arguments-differ
+        function = STRING_AGGREGATE_FUNCTIONS.get(connection.vendor)
+        if function is None:
+            raise NotSupportedError(f"Aggregating alias names isn't supported on {connection.vendor}")
+        return super().as_sql(compiler, connection, function=function, **extra_context)
+
+
+def supports_alias_names(using: str) -> bool:
+    """Whether ``AliasNames`` is supported by the database connection ``using``."""
+    return connections[using].vendor in STRING_AGGREGATE_FUNCTIONS
+
+
+def split_alias_names(alias_names: typing.Optional[str]) -> typing.List[str]:
+    """Split names aggregated by ``AliasNames`` (``None`` for destinations without aliases), sorted by name."""
+    return sorted(alias_names.split(ALIAS_SEPARATOR)) if alias_names else []
+
+
+def iter_values_with_aliases(
+    queryset: QuerySet,
+    fields: typing.Sequence[str],
+    start: int = 0,
+    stop: typing.Optional[int] = None,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+) -> typing.Iterator[typing.Tuple[typing.Any, ...]]:
+    """Iterate over ``fields`` of the destinations in ``queryset[start:stop]``, followed by their sorted alias names.
+
+    Aliases are aggregated in the database with ``AliasNames`` where supported, so each destination is transferred
+    as a single row and no grouping is done in Python. Otherwise, the aliases of every ``chunk_size`` destinations
+    are fetched with a single query. Rows are streamed ``chunk_size`` at a time either way.
+    """
+    if supports_alias_names(queryset.db):
+        rows = queryset.annotate(alias_names=AliasNames()).values_list(*fields, "alias_names")[start:stop]
+        for row in rows.iterator(chunk_size=chunk_size):
+            yield (*row[:-1], split_alias_names(row[-1]))
+        return
+
+    # Portable fallback for backends without a string aggregate function
+    rows = queryset.values_list("id", *fields)[start:stop].iterator(chunk_size=chunk_size)
+    while True:
+        chunk = list(itertools.islice(rows, chunk_size))
+        if not chunk:
+            return
+
+        aliases: typing.Dict[int, typing.List[str]] = {row[0]: [] for row in chunk}
+        for name, destination_id in (
+            models.Alias.objects.filter(destination_id__in=list(aliases))
+            .order_by("name")
+            .values_list("name", "destination_id")
+        ):
+            aliases[destination_id].append(name)
+        for row in chunk:
+            yield (*row[1:], aliases[row[0]])
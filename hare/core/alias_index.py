@@ -0,0 +1,345 @@
+## MIT License
+##
+## Copyright (c) 2021 conveen
+##
+## Permission is hereby granted, free of charge, to any person obtaining a copy
+## of this software and associated documentation files (the "Software"), to deal
+## in the Software without restriction, including without limitation the rights
+## to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+## copies of the Software, and to permit persons to whom the Software is
+## furnished to do so, subject to the following conditions:
+##
+## The above copyright notice and this permission notice shall be included in all
+## copies or substantial portions of the Software.
+##
+## THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+## IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+## FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+## AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+## LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+## OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+## SOFTWARE.
+
+import logging
+import mmap
+import os
+from pathlib import Path
+import struct
+import threading
+import time
+import typing
+import zlib
+
+
+logger = logging.getLogger(__name__)
+
+# (id, url, url_segments, num_args, is_fallback, is_default_fallback), same layout as ``resolver.ResolvedDestination``
+DestinationEntry = typing.Tuple[int, str, typing.Tuple[str, ...], int, bool, bool]
+
+##########################
+##### File Format v1 #####
+##########################
+#
+# All integers are little-endian and all offsets are relative to the start of the file.
+#
+#   Header       magic, number of slots, aliases, and destinations, index of the default fallback
+#                destination (-1 if none), and the offsets of the four sections below
+#   Slots        open-addressing hash table (linear probing) of alias indices + 1 (0 is an empty slot),
+#                keyed by the CRC-32 of the UTF-8 encoded alias name
+#   Aliases      name offset and length in the string pool and destination index for each alias
+#   Destinations id, URL offset and length, URL segments offset and count, and flags for each destination
+#   String pool  UTF-8 encoded alias names and URLs, and URL segments (each prefixed by its u32 length)
+
+MAGIC = b"HAREIDX1"
+HEADER = struct.Struct("<8sIIIiIIII")
+SLOT = struct.Struct("<I")
+ALIAS = struct.Struct("<III")
+DESTINATION = struct.Struct("<qIIIIB")
+SEGMENT_LENGTH = struct.Struct("<I")
+IS_FALLBACK = 0x1
+IS_DEFAULT_FALLBACK = 0x2
+# URL couldn't be compiled into segments (see: ``models_utils.render_url``), so it has none
+IS_UNCOMPILED = 0x4
+
+
+def _gen_num_slots(num_aliases: int) -> int:
+    """Smallest power of two that keeps the hash table load factor at or below 0.5."""
+    num_slots = 1
+    while num_slots < num_aliases * 2:
+        num_slots <<= 1
+    return num_slots
+
+
+def _add_to_pool(pool: bytearray, content: bytes) -> int:
+    """Append ``content`` to the string pool and return its offset relative to the start of the pool."""
+    offset = len(pool)
+    pool.extend(content)
+    return offset
+
+
+def _pack_url_segments(url_segments: typing.Iterable[str]) -> bytes:
+    """Encode URL segments for the string pool, each prefixed by its length."""
+    encoded_segments = [segment.encode("utf-8") for segment in url_segments]
+    return b"".join(SEGMENT_LENGTH.pack(len(segment)) + segment for segment in encoded_segments)
+
+
+def _pack_destinations(
+    destinations: typing.Iterable[DestinationEntry], pool: bytearray
+) -> typing.Tuple[typing.Dict[int, int], typing.List[typing.Tuple[int, int, int, int, int, int]]]:
+    """Add destination URLs and URL segments to the string pool.
+
+    Returns the index of each destination by id and the packed destinations, with offsets relative to the start of
+    the string pool (see: ``_pack_header``).
+    """
+    destination_indices: typing.Dict[int, int] = {}
+    destination_entries = []
+    for id_, url, url_segments, num_args, is_fallback, is_default_fallback in destinations:
+        destination_indices[id_] = len(destination_entries)
+        url_bytes = url.encode("utf-8")
+        url_offset = _add_to_pool(pool, url_bytes)
+        segments_offset = _add_to_pool(pool, _pack_url_segments(url_segments))
+        flags = (
+            (IS_FALLBACK if is_fallback else 0)
+            | (IS_DEFAULT_FALLBACK if is_default_fallback else 0)
+            | (0 if url_segments else IS_UNCOMPILED)
+        )
+        destination_entries.append((id_, url_offset, len(url_bytes), segments_offset, num_args, flags))
+    return destination_indices, destination_entries
+
+
+def _pack_aliases(
+    aliases: typing.Iterable[typing.Tuple[str, int]], destination_indices: typing.Dict[int, int], pool: bytearray
+) -> typing.List[typing.Tuple[bytes, int, int]]:
+    """Add alias names to the string pool, skipping aliases pointing to destinations not in ``destination_indices``.
+
+    Returns the encoded name, name offset relative to the start of the string pool, and destination index of each
+    alias.
+    """
+    alias_entries = []
+    for name, destination_id in aliases:
+        if destination_id in destination_indices:
+            name_bytes = name.encode("utf-8")
+            alias_entries.append((name_bytes, _add_to_pool(pool, name_bytes), destination_indices[destination_id]))
+    return alias_entries
+
+
+def _build_hash_table(alias_entries: typing.Sequence[typing.Tuple[bytes, int, int]]) -> typing.List[int]:
+    """Build the open-addressing hash table of alias indices + 1 (see: File Format v1)."""
+    num_slots = _gen_num_slots(len(alias_entries))
+    slots = [0] * num_slots
+    for alias_index, (name_bytes, _, __) in enumerate(alias_entries):
+        slot = zlib.crc32(name_bytes) & (num_slots - 1)
+        while slots[slot]:
+            slot = (slot + 1) & (num_slots - 1)
+        slots[slot] = alias_index + 1
+    return slots
+
+
+def _pack_header(
+    num_slots: int, num_aliases: int, num_destinations: int, default_fallback: int
+) -> typing.Tuple[bytes, int]:
+    """Pack the header, laying the sections out back to back after it.
+
+    Returns the header and the offset of the string pool.
+    """
+    slots_offset = HEADER.size
+    aliases_offset = slots_offset + num_slots * SLOT.size
+    destinations_offset = aliases_offset + num_aliases * ALIAS.size
+    pool_offset = destinations_offset + num_destinations * DESTINATION.size
+    header = HEADER.pack(
+        MAGIC,
+        num_slots,
+        num_aliases,
+        num_destinations,
+        default_fallback,
+        slots_offset,
+        aliases_offset,
+        destinations_offset,
+        pool_offset,
+    )
+    return header, pool_offset
+
+
+def write_alias_index(
+    path: Path,
+    destinations: typing.Iterable[DestinationEntry],
+    aliases: typing.Iterable[typing.Tuple[str, int]],
+    default_fallback_id: typing.Optional[int],
+) -> None:
+    """Compile destinations, ``(alias name, destination id)`` pairs, and the default fallback into an alias index file.
+
+    The file is written next to ``path`` and then atomically moved into place, so processes that
+    have the previous file mapped keep using it until they reopen ``path`` (see: ``AliasIndexLoader``).
+    Aliases pointing to destinations not in ``destinations`` are skipped.
+    """
+    pool = bytearray()
+    destination_indices, destination_entries = _pack_destinations(destinations, pool)
+    alias_entries = _pack_aliases(aliases, destination_indices, pool)
+    default_fallback = destination_indices.get(default_fallback_id, -1) if default_fallback_id is not None else -1
+    slots = _build_hash_table(alias_entries)
+    header, pool_offset = _pack_header(len(slots), len(alias_entries), len(destination_entries), default_fallback)
+
+    temp_path = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+    with temp_path.open("wb") as index_file:
+        index_file.write(header)
+        index_file.write(b"".join(SLOT.pack(slot) for slot in slots))
+        index_file.write(
+            b"".join(
+                ALIAS.pack(pool_offset + name_offset, len(name_bytes), destination_index)
+                for name_bytes, name_offset, destination_index in alias_entries
+            )
+        )
+        index_file.write(
+            b"".join(
+                DESTINATION.pack(
+                    id_, pool_offset + url_offset, url_length, pool_offset + segments_offset, num_args, flags
+                )
+                for id_, url_offset, url_length, segments_offset, num_args, flags in destination_entries
+            )
+        )
+        index_file.write(pool)
+    os.replace(temp_path, path)
+
+
+class AliasIndex:
+    """Read-only, memory-mapped alias index file written by ``write_alias_index``.
+
+    Every process that opens the same file shares a single copy of it in the page cache, and opening
+    the file doesn't read it. Alias names are compared against the mapped file without copying.
+    Destinations are only decoded when returned by a lookup.
+
+    Raises:
+        OSError: if the file can't be opened or mapped.
+        ValueError: if the file isn't a valid alias index.
+    """
+
+    __slots__ = (
+        "_aliases_offset",
+        "_default_fallback",
+        "_destinations_offset",
+        "_map",
+        "_num_slots",
+        "_slots_offset",
+        "_view",
+        "num_aliases",
+        "num_destinations",
+    )
+
+    def __init__(self, path: Path) -> None:
+        with path.open("rb") as index_file:
+            self._map = mmap.mmap(index_file.fileno(), 0, access=mmap.ACCESS_READ)
+        if len(self._map) < HEADER.size:
+            raise ValueError("Alias index file is truncated")
+
+        (
+            magic,
+            self._num_slots,
+            self.num_aliases,
+            self.num_destinations,
+            self._default_fallback,
+            self._slots_offset,
+            self._aliases_offset,
+            self._destinations_offset,
+            _,
+        ) = HEADER.unpack_from(self._map, 0)
+        if magic != MAGIC:
+            raise ValueError("Not an alias index file (or unsupported version)")
+        self._view = memoryview(self._map)
+
+    def _read_str(self, offset: int, length: int) -> str:
+        return str(self._view[offset : offset + length], "utf-8")
+
+    def _read_destination(self, destination_index: int) -> DestinationEntry:
+        id_, url_offset, url_length, segments_offset, num_args, flags = DESTINATION.unpack_from(
+            self._map, self._destinations_offset + destination_index * DESTINATION.size
+        )
+        url_segments = []
+        for _ in range(0 if flags & IS_UNCOMPILED else num_args + 1):
+            (segment_length,) = SEGMENT_LENGTH.unpack_from(self._map, segments_offset)
+            segments_offset += SEGMENT_LENGTH.size
+            url_segments.append(self._read_str(segments_offset, segment_length))
+            segments_offset += segment_length
+        return (
+            id_,
+            self._read_str(url_offset, url_length),
+            tuple(url_segments),
+            num_args,
+            bool(flags & IS_FALLBACK),
+            bool(flags & IS_DEFAULT_FALLBACK),
+        )
+
+    def lookup(self, alias: str) -> typing.Optional[DestinationEntry]:
+        """Look up destination for ``alias``, if it exists."""
+        name_bytes = alias.encode("utf-8")
+        mask = self._num_slots - 1
+        slot = zlib.crc32(name_bytes) & mask
+        while True:
+            (alias_index,) = SLOT.unpack_from(self._map, self._slots_offset + slot * SLOT.size)
+            if not alias_index:
+                return None
+
+            name_offset, name_length, destination_index = ALIAS.unpack_from(
+                self._map, self._aliases_offset + (alias_index - 1) * ALIAS.size
+            )
+            if name_length == len(name_bytes) and self._view[name_offset : name_offset + name_length] == name_bytes:
+                return self._read_destination(destination_index)
+            slot = (slot + 1) & mask
+
+    def default_fallback(self) -> typing.Optional[DestinationEntry]:
+        """Get default fallback destination, if one exists."""
+        if self._default_fallback < 0:
+            return None
+        return self._read_destination(self._default_fallback)
+
+
+class AliasIndexLoader:
+    """Open alias index file and reopen it when it's replaced.
+
+    The file's identity is checked at most once every ``check_interval`` seconds, so the index
+    can be recompiled (see: ``write_alias_index``) while processes are using it. Indices that
+    have been replaced are unmapped once the last lookup using them finishes.
+    """
+
+    __slots__ = (
+        "_checked_at",
+        "_index",
+        "_lock",
+        "_stat",
+        "check_interval",
+        "path",
+    )
+
+    def __init__(self, path: Path, check_interval: float = 1.0) -> None:
+        self.path = path
+        self.check_interval = check_interval
+        self._checked_at = float("-inf")
+        self._index: typing.Optional[AliasIndex] = None
+        self._lock = threading.Lock()
+        self._stat: typing.Optional[typing.Tuple[int, int, int]] = None
+
+    def get(self) -> typing.Optional[AliasIndex]:
+        """Get the current index, or ``None`` if the file doesn't exist or isn't valid."""
+        if time.monotonic() - self._checked_at >= self.check_interval:
+            self.reload()
+        return self._index
+
+    def reload(self, force: bool = False) -> None:
+        """Reopen the index file if it was replaced since it was last opened (or if ``force``)."""
+        with self._lock:
+            self._checked_at = time.monotonic()
+            try:
+                stat = os.stat(self.path)
+            except FileNotFoundError:
+                self._index = self._stat = None
+                return
+
+            identity = (stat.st_ino, stat.st_size, stat.st_mtime_ns)
+            if not force and identity == self._stat:
+                return
+
+            try:
+                self._index = AliasIndex(self.path)
+                self._stat = identity
+            except (OSError, ValueError) as exc:
+                logger.warning("Failed to open alias index {}", self.path, exc_info=exc)
+                self._index = self._stat = None
@@ -21,8 +21,42 @@
 ## SOFTWARE.
 
 from django.apps import AppConfig
+from django.db.models.signals import post_delete, post_save
 
 
 class CoreConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "hare.core"
+
+    def ready(self) -> None:
+        # pylint: disable=import-outside-toplevel
+        from hare.core import models, resolver, search, signals
+
+        # Shortcuts version and change log must be connected first, so the version is bumped before it's read
+        for model in (models.Destination, models.Alias):
+            post_save.connect(
+                models.record_shortcuts_change, sender=model, dispatch_uid=f"version_save_{model.__name__}"
+            )
+            post_delete.connect(
+                models.record_shortcuts_change, sender=model, dispatch_uid=f"version_delete_{model.__name__}"
+            )
+        signals.shortcuts_changed.connect(models.record_shortcuts_change, dispatch_uid="version_shortcuts_changed")
+
+        # Search index is updated in the same transaction as the write
+        for model in (models.Destination, models.Alias):
+            post_save.connect(search.update_search_index, sender=model, dispatch_uid=f"search_save_{model.__name__}")
+            post_delete.connect(
+                search.update_search_index, sender=model, dispatch_uid=f"search_delete_{model.__name__}"
+            )
+        signals.shortcuts_changed.connect(search.update_search_index, dispatch_uid="search_shortcuts_changed")
+
+        for model in (models.Destination, models.Alias):
+            post_save.connect(
+                resolver.invalidate_resolver, sender=model, dispatch_uid=f"resolver_save_{model.__name__}"
+            )
+            post_delete.connect(
+                resolver.invalidate_resolver, sender=model, dispatch_uid=f"resolver_delete_{model.__name__}"
+            )
+        signals.shortcuts_changed.connect(resolver.invalidate_resolver, dispatch_uid="resolver_shortcuts_changed")
+
+        resolver.resolver.load_snapshot()
@@ -0,0 +1,93 @@
+## MIT License
+##
+## Copyright (c) 2021 conveen
+##
+## Permission is hereby granted, free of charge, to any person obtaining a copy
+## of this software and associated documentation files (the "Software"), to deal
+## in the Software without restriction, including without limitation the rights
+## to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+## copies of the Software, and to permit persons to whom the Software is
+## furnished to do so, subject to the following conditions:
+##
+## The above copyright notice and this permission notice shall be included in all
+## copies or substantial portions of the Software.
+##
+## THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+## IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+## FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+## AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+## LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+## OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+## SOFTWARE.
+
+import logging
+import typing
+from urllib.parse import parse_qs
+
+from django.conf import settings
+from django.urls import set_script_prefix
+from django.utils.encoding import iri_to_uri
+
+from hare.core import redirect
+
+
+logger = logging.getLogger(__name__)
+Scope = typing.Dict[str, typing.Any]
+Receive = typing.Callable[[], typing.Awaitable[typing.Dict[str, typing.Any]]]
+Send = typing.Callable[[typing.Dict[str, typing.Any]], typing.Awaitable[None]]
+ASGIApplication = typing.Callable[[Scope, Receive, Send], typing.Awaitable[None]]
+
+
+class RedirectApplication:
+    """ASGI application that answers redirect requests before they reach Django.
+
+    Django 3.2 runs every synchronous middleware in a thread, so even the asynchronous index view
+    costs several thread hops per request. Redirect requests
+    (``GET /?query=<alias(+arg_1+...+arg_N)?>(&fallback=<fallback_alias>)?``) that can be resolved from memory
+    (see: ``redirect.gen_redirect_url_from_memory``) are answered on the event loop instead, without
+    going through the Django middleware stack. Every other request, including redirects that would
+    query the database or show alias suggestions (see: ``hare.ui.views.index``), and any redirect request
+    that fails with an unexpected error, falls through to ``application`` so that Django handles it as usual.
+    """
+
+    __slots__ = ("application",)
+
+    def __init__(self, application: ASGIApplication) -> None:
+        self.application = application
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or scope["method"] not in {"GET", "HEAD"}:
+            await self.application(scope, receive, send)
+            return
+
+        root_path = scope.get("root_path", "")
+        path = scope["path"][len(root_path) :] if root_path and scope["path"].startswith(root_path) else scope["path"]
+        params = parse_qs(scope.get("query_string", b"").decode("utf-8", "replace"))
+        if path not in {"", "/"} or "query" not in params:
+            await self.application(scope, receive, send)
+            return
+
+        set_script_prefix(settings.FORCE_SCRIPT_NAME or root_path or "/")
+        try:
+            url = redirect.gen_redirect_url_from_memory(
+                params["query"][0],
+                params.get("fallback", [None])[0],
+                # Fallbacks may need to show alias suggestions
+                allow_fallback=settings.ALIAS_SUGGESTION_DISTANCE is None,
+            )
+        except ValueError:
+            await self.send_empty_response(send, 400, [(b"content-type", b"text/plain")])
+            return
+        except Exception:  # pylint: disable=broad-except
+            logger.debug("Failed to resolve redirect, falling through to Django", exc_info=True)
+            url = None
+
+        if url is None:
+            await self.application(scope, receive, send)
+        else:
+            await self.send_empty_response(send, 302, [(b"location", iri_to_uri(url).encode("ascii"))])
+
+    @staticmethod
+    async def send_empty_response(send: Send, status: int, headers: typing.List[typing.Tuple[bytes, bytes]]) -> None:
+        await send({"type": "http.response.start", "status": status, "headers": [*headers, (b"content-length", b"0")]})
+        await send({"type": "http.response.body", "body": b""})
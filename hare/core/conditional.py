@@ -0,0 +1,62 @@
+## MIT License
+##
+## Copyright (c) 2021 conveen
+##
+## Permission is hereby granted, free of charge, to any person obtaining a copy
+## of this software and associated documentation files (the "Software"), to deal
+## in the Software without restriction, including without limitation the rights
+## to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+## copies of the Software, and to permit persons to whom the Software is
+## furnished to do so, subject to the following conditions:
+##
+## The above copyright notice and this permission notice shall be included in all
+## copies or substantial portions of the Software.
+##
+## THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+## IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+## FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+## AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+## LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+## OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+## SOFTWARE.
+
+import logging
+import typing
+import zlib
+
+from django.conf import settings
+from django.db import DatabaseError
+from django.http import HttpRequest
+
+from hare.core import models
+
+
+logger = logging.getLogger(__name__)
+
+# Request headers (as ``HttpRequest.META`` keys) the representation of a response may depend on
+VARY_HEADERS = ("HTTP_ACCEPT", "HTTP_ACCEPT_LANGUAGE")
+
+
+def gen_shortcuts_etag(request: HttpRequest, *_args, **_kwargs) -> typing.Optional[str]:
+    """Generate strong ETag for a response rendered from the shortcut tables.
+
+    For use with ``django.views.decorators.http.condition``, which answers ``If-None-Match``
+    with 304 before the view runs. The ETag is derived from the shortcuts version (see:
+    ``models.ShortcutsVersion``), so it changes on every write and costs a single query.
+    It also covers the request headers the response may vary by, and the CSRF cookie
+    (so cached forms never carry a stale token). Returns ``None`` (no ETag) if the
+    version can't be read.
+    """
+    try:
+        version = models.ShortcutsVersion.objects.current()
+    except DatabaseError as exc:
+        logger.warning("Failed to read shortcuts version for ETag", exc_info=exc)
+        return None
+
+    variant = "\n".join(
+        [
+            *(request.META.get(header, "") for header in VARY_HEADERS),
+            request.COOKIES.get(settings.CSRF_COOKIE_NAME, ""),
+        ]
+    )
+    return f'"{version}-{zlib.crc32(variant.encode()):08x}"'
@@ -0,0 +1,56 @@
+## MIT License
+##
+## Copyright (c) 2021 conveen
+##
+## Permission is hereby granted, free of charge, to any person obtaining a copy
+## of this software and associated documentation files (the "Software"), to deal
+## in the Software without restriction, including without limitation the rights
+## to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+## copies of the Software, and to permit persons to whom the Software is
+## furnished to do so, subject to the following conditions:
+##
+## The above copyright notice and this permission notice shall be included in all
+## copies or substantial portions of the Software.
+##
+## THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+## IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+## FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+## AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+## LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+## OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+## SOFTWARE.
+
+import logging
+from pathlib import Path
+import typing
+
+from django.conf import settings
+from django.core.management import base as command
+
+from hare.core.resolver import ResolverSnapshot
+
+
+logger = logging.getLogger(__name__)
+
+
+class Command(command.BaseCommand):
+    help = "Compile the destination and alias tables into a memory-mapped alias index file."
+
+    def add_arguments(self, parser: command.CommandParser):
+        parser.add_argument(
+            "-o",
+            "--output",
+            type=Path,
+            default=settings.RESOLVER_ALIAS_INDEX_PATH,
+            help="Path to alias index file (defaults to the HARE_RESOLVER_ALIAS_INDEX_PATH setting)",
+            dest="output_path",
+        )
+
+    def handle(self, *args, **options) -> None:
+        output_path: typing.Optional[Path] = options["output_path"]
+        if output_path is None:
+            raise command.CommandError("Must supply alias index path")
+
+        snapshot = ResolverSnapshot.from_database()
+        snapshot.compile_alias_index(output_path)
+        logger.info("Compiled {} aliases to {}", len(snapshot.aliases), output_path)
@@ -0,0 +1,71 @@
+## MIT License
+##
+## Copyright (c) 2021 conveen
+##
+## Permission is hereby granted, free of charge, to any person obtaining a copy
+## of this software and associated documentation files (the "Software"), to deal
+## in the Software without restriction, including without limitation the rights
+## to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+## copies of the Software, and to permit persons to whom the Software is
+## furnished to do so, subject to the following conditions:
+##
+## The above copyright notice and this permission notice shall be included in all
+## copies or substantial portions of the Software.
+##
+## THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+## IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+## FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+## AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+## LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+## OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+## SOFTWARE.
+
+import logging
+from pathlib import Path
+import sys
+import typing
+
+from django.core.management import base as command
+
+from hare.core import shortcuts_io
+
+
+logger = logging.getLogger(__name__)
+
+
+class Command(command.BaseCommand):
+    help = "Export shortcuts to a JSON Lines or CSV file."
+
+    def add_arguments(self, parser: command.CommandParser):
+        parser.add_argument(
+            "-o",
+            "--output",
+            type=Path,
+            default=None,
+            help="Path to file to export shortcuts to (defaults to stdout)",
+            dest="output_path",
+        )
+        parser.add_argument(
+            "-f",
+            "--format",
+            choices=shortcuts_io.FORMATS,
+            default=None,
+            help="Format of the file (defaults to csv for files with the .csv suffix, jsonl otherwise)",
+            dest="file_format",
+        )
+
+    def handle(self, *args, **options) -> None:
+        output_path: typing.Optional[Path] = options["output_path"]
+        file_format: typing.Optional[str] = options["file_format"]
+
+        if file_format is None:
+            is_csv = output_path is not None and output_path.suffix == ".csv"
+            file_format = shortcuts_io.CSV_FORMAT if is_csv else shortcuts_io.JSONL_FORMAT
+
+        if output_path is None:
+            sys.stdout.writelines(shortcuts_io.export_shortcuts(file_format))
+            return
+
+        with output_path.open("w", newline="", encoding="utf-8") as output_file:
+            output_file.writelines(shortcuts_io.export_shortcuts(file_format))
+        logger.info("Exported shortcuts to {}", output_path)
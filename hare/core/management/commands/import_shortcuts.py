@@ -0,0 +1,84 @@
+## MIT License
+##
+## Copyright (c) 2021 conveen
+##
+## Permission is hereby granted, free of charge, to any person obtaining a copy
+## of this software and associated documentation files (the "Software"), to deal
+## in the Software without restriction, including without limitation the rights
+## to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+## copies of the Software, and to permit persons to whom the Software is
+## furnished to do so, subject to the following conditions:
+##
+## The above copyright notice and this permission notice shall be included in all
+## copies or substantial portions of the Software.
+##
+## THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+## IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+## FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+## AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+## LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+## OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+## SOFTWARE.
+
+import logging
+from pathlib import Path
+import sys
+import typing
+
+from django.core.management import base as command
+
+from hare.core import shortcuts_io
+
+
+logger = logging.getLogger(__name__)
+
+
+class Command(command.BaseCommand):
+    help = "Import shortcuts from a JSON Lines or CSV file."
+
+    def add_arguments(self, parser: command.CommandParser):
+        parser.add_argument(
+            "input_path",
+            type=Path,
+            help="Path to file to import shortcuts from ('-' for stdin)",
+        )
+        parser.add_argument(
+            "-f",
+            "--format",
+            choices=shortcuts_io.FORMATS,
+            default=None,
+            help="Format of the file (defaults to csv for files with the .csv suffix, jsonl otherwise)",
+            dest="file_format",
+        )
+        parser.add_argument(
+            "-b",
+            "--batch-size",
+            type=int,
+            default=shortcuts_io.DEFAULT_BATCH_SIZE,
+            help="Number of rows validated and inserted per transaction",
+            dest="batch_size",
+        )
+
+    def handle(self, *args, **options) -> None:
+        input_path: Path = options["input_path"]
+        file_format: typing.Optional[str] = options["file_format"]
+        batch_size: int = options["batch_size"]
+
+        if file_format is None:
+            file_format = shortcuts_io.CSV_FORMAT if input_path.suffix == ".csv" else shortcuts_io.JSONL_FORMAT
+        if batch_size < 1:
+            raise command.CommandError("Batch size must be positive")
+
+        if str(input_path) == "-":
+            result = shortcuts_io.import_shortcuts(shortcuts_io.parse_shortcuts(sys.stdin, file_format), batch_size)
+        else:
+            if not input_path.is_file():
+                raise command.CommandError(f"{input_path} either does not exist or is not a file")
+            with input_path.open(newline="", encoding="utf-8") as input_file:
+                result = shortcuts_io.import_shortcuts(
+                    shortcuts_io.parse_shortcuts(input_file, file_format), batch_size
+                )
+
+        for error in result.errors:
+            logger.warning("Line {}: {}", error.line, error.error)
+        logger.info("Imported {} shortcuts ({} errors) from {}", result.num_created, len(result.errors), input_path)
@@ -0,0 +1,53 @@
+## MIT License
+##
+## Copyright (c) 2021 conveen
+##
+## Permission is hereby granted, free of charge, to any person obtaining a copy
+## of this software and associated documentation files (the "Software"), to deal
+## in the Software without restriction, including without limitation the rights
+## to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+## copies of the Software, and to permit persons to whom the Software is
+## furnished to do so, subject to the following conditions:
+##
+## The above copyright notice and this permission notice shall be included in all
+## copies or substantial portions of the Software.
+##
+## THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+## IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+## FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+## AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+## LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+## OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+## SOFTWARE.
+
+import logging
+
+from django.core.management import base as command
+
+from hare.core import models
+
+
+logger = logging.getLogger(__name__)
+
+
+class Command(command.BaseCommand):
+    help = "Delete the shortcut change log of all but the most recent versions."
+
+    def add_arguments(self, parser: command.CommandParser):
+        parser.add_argument(
+            "-k",
+            "--keep-versions",
+            type=int,
+            default=10000,
+            help="Number of most recent versions to keep changes for (default: 10000). "
+            "Clients that last synced before them must sync every shortcut again.",
+            dest="keep_versions",
+        )
+
+    def handle(self, *args, **options) -> None:
+        keep_versions: int = options["keep_versions"]
+        if keep_versions < 0:
+            raise command.CommandError("Number of versions to keep must not be negative")
+
+        num_deleted = models.ShortcutChange.objects.prune(keep_versions)
+        logger.info("Pruned {} shortcut changes, keeping the last {} versions", num_deleted, keep_versions)
@@ -0,0 +1,51 @@
+# Generated by Django 3.2.25 on 2026-10-17 06:46
+
+import django.core.validators
+from django.db import migrations, models
+
+from hare.core import models_utils
+
+
+def compile_url_segments(apps, schema_editor):
+    Destination = apps.get_model("core", "Destination")
+    destinations = list(Destination.objects.only("id", "url"))
+    for destination in destinations:
+        # URLs with conversions or format specifications are left uncompiled, and rendered with str.format
+        try:
+            destination.url_segments = models_utils.compile_url_template(destination.url)
+        except ValueError:
+            destination.url_segments = []
+    Destination.objects.bulk_update(destinations, ["url_segments"], batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("core", "0001_initial"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="destination",
+            name="url_segments",
+            field=models.JSONField(default=list),
+        ),
+        migrations.AlterField(
+            model_name="destination",
+            name="description",
+            field=models.TextField(default=None),
+        ),
+        migrations.AlterField(
+            model_name="destination",
+            name="is_fallback",
+            field=models.BooleanField(db_index=True, default=False),
+        ),
+        migrations.AlterField(
+            model_name="destination",
+            name="url",
+            field=models.CharField(
+                default=None, max_length=2000, unique=True, validators=[django.core.validators.URLValidator()]
+            ),
+        ),
+        migrations.RunPython(compile_url_segments, migrations.RunPython.noop),
+    ]
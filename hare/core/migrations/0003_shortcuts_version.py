@@ -0,0 +1,29 @@
+# Generated by Django 3.2.25 on 2026-10-17 06:54
+
+from django.db import migrations, models
+
+
+def create_shortcuts_version(apps, schema_editor):
+    ShortcutsVersion = apps.get_model("core", "ShortcutsVersion")
+    ShortcutsVersion.objects.get_or_create(id=1, defaults={"version": 0})
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("core", "0002_destination_url_segments"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="ShortcutsVersion",
+            fields=[
+                ("id", models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name="ID")),
+                ("version", models.BigIntegerField(default=0)),
+            ],
+            options={
+                "db_table": "shortcuts_version",
+            },
+        ),
+        migrations.RunPython(create_shortcuts_version, migrations.RunPython.noop),
+    ]
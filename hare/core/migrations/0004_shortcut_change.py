@@ -0,0 +1,24 @@
+# Generated by Django 3.2.25 on 2026-10-17 07:08
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("core", "0003_shortcuts_version"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="ShortcutChange",
+            fields=[
+                ("id", models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name="ID")),
+                ("version", models.BigIntegerField(db_index=True)),
+                ("destination_id", models.BigIntegerField()),
+            ],
+            options={
+                "db_table": "shortcut_change",
+            },
+        ),
+    ]
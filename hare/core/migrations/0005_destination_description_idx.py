@@ -0,0 +1,17 @@
+# Generated by Django 3.2.25 on 2026-10-17 07:11
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("core", "0004_shortcut_change"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="destination",
+            index=models.Index(fields=["description", "id"], name="destination_description_idx"),
+        ),
+    ]
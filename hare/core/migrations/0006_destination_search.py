@@ -0,0 +1,39 @@
+# Generated by Django 3.2.25 on 2026-10-17 07:40
+
+from django.db import migrations
+
+from hare.core import search
+
+
+def create_search_index(apps, schema_editor):
+    Destination = apps.get_model("core", "Destination")
+    Alias = apps.get_model("core", "Alias")
+    db_alias = schema_editor.connection.alias
+
+    aliases = {}
+    for name, destination_id in Alias.objects.using(db_alias).order_by("name").values_list("name", "destination_id"):
+        aliases.setdefault(destination_id, []).append(name)
+    search.create_index(
+        schema_editor.connection,
+        (
+            (id_, description, url, aliases.get(id_, []))
+            for id_, description, url in Destination.objects.using(db_alias).values_list("id", "description", "url")
+        ),
+    )
+
+
+def drop_search_index(apps, schema_editor):
+    backend = search.BACKENDS.get(schema_editor.connection.vendor)
+    if backend is not None:
+        backend.drop_index(schema_editor.connection)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("core", "0005_destination_description_idx"),
+    ]
+
+    operations = [
+        migrations.RunPython(create_search_index, drop_search_index),
+    ]
@@ -25,8 +25,9 @@ import typing
 
 from django.core.validators import URLValidator
 from django.db import models, transaction
+from django.db.models import Case, F, Min, Q, Value, When
 
-from hare.core import models_utils
+from hare.core import models_utils, signals
 
 
 logger = logging.getLogger(__name__)
@@ -37,12 +38,27 @@ logger = logging.getLogger(__name__)
 ########################
 
 
+class NewShortcut(typing.NamedTuple):
+    """Arguments for creating a destination with aliases (see: ``DestinationManager.create_many_with_aliases``)."""
+
+    url: str
+    description: str
+    aliases: typing.List[str]
+    is_fallback: bool = False
+    is_default_fallback: bool = False
+
+
 class DestinationManager(models.Manager):
     """Destination objects manager."""
 
     def clear_default_fallbacks(self) -> None:
         """Remove the ``is_default_fallback`` flag (set to ``False``) for all destinations."""
-        self.filter(is_default_fallback=True).update(is_default_fallback=False)
+        with transaction.atomic():
+            destination_ids = list(self.filter(is_default_fallback=True).values_list("id", flat=True))
+            if not destination_ids:
+                return
+            self.filter(id__in=destination_ids).update(is_default_fallback=False)
+            signals.shortcuts_changed.send(sender=Destination, destination_ids=destination_ids)
 
     def create_with_aliases(
         self,
@@ -69,34 +85,205 @@ class DestinationManager(models.Manager):
                         if the URL contains keyword format arguments (see: ``models_utils.gen_num_args_from_url``) or
                         if the URL is a (default) fallback destination and doesn't have exactly one argument.
         """
+        destination, unique_aliases = self._build_with_aliases(
+            NewShortcut(url, description, aliases, is_fallback, is_default_fallback)
+        )
+
+        # Must wrap this block in a transaction so that the existing default fallback is maintained
+        # if the destination can't be created. The destination and aliases are created in the same
+        # transaction so that the shortcuts version is bumped along with them (see: ``ShortcutsVersion``),
+        # and so that a duplicate alias doesn't leave an orphaned destination.
+        with transaction.atomic():
+            if destination.is_default_fallback:
+                # Clear all existing default fallbacks so new destination is the only one
+                self.clear_default_fallbacks()
+
+            destination.save()
+            Alias.objects.bulk_create([Alias(name=name, destination=destination) for name in unique_aliases])
+            signals.shortcuts_changed.send(sender=Destination, destination_ids=[destination.id])
+        return destination
+
+    @staticmethod
+    def _validate_aliases(aliases: typing.Iterable[str]) -> typing.Set[str]:
+        """Dedupe non-empty aliases.
+
+        Raises:
+            ValueError: if an alias is too long.
+        """
         unique_aliases = {name for name in aliases if name}
+        max_length = typing.cast(int, Alias._meta.get_field("name").max_length)
+        if any(len(name) > max_length for name in unique_aliases):
+            raise ValueError(f"Aliases must be at most {max_length} characters long")
+        return unique_aliases
+
+    def _build_with_aliases(self, shortcut: NewShortcut) -> typing.Tuple["Destination", typing.Set[str]]:
+        """Validate shortcut (see: ``create_with_aliases``) and build its unsaved destination and unique aliases.
+
+        Raises:
+            ValueError: if the shortcut fails validation.
+        """
+        unique_aliases = self._validate_aliases(shortcut.aliases)
         if not unique_aliases:
             raise ValueError("Must provide one or more non-empty aliases")
 
-        url = models_utils.validate_netloc_url(url)
-        num_args = models_utils.gen_num_args_from_url(url)
+        is_fallback = shortcut.is_fallback or shortcut.is_default_fallback
+        destination = self.model(
+            url=models_utils.validate_netloc_url(shortcut.url),
+            is_fallback=is_fallback,
+            is_default_fallback=shortcut.is_default_fallback,
+            description=shortcut.description,
+        )
+        destination.compile_url()
+        if is_fallback and destination.num_args != 1:
+            raise ValueError("Fallback destinations must have exactly one argument")
+
+        return (destination, unique_aliases)
+
+    def _check_conflicts(
+        self,
+        candidates: typing.Sequence[typing.Tuple[int, "Destination", typing.Set[str]]],
+        results: typing.List[typing.Union["Destination", ValueError]],
+    ) -> typing.Tuple[typing.List[typing.Tuple["Destination", typing.Set[str]]], bool]:
+        """Check ``(index, destination, aliases)`` candidates against existing shortcuts and each other.
+
+        Collisions with existing URLs and aliases are checked with a single query per table, and
+        candidates that collide or are a second default fallback destination are replaced in
+        ``results`` (at their index) by the ``ValueError`` explaining why.
+
+        Returns the accepted destinations and aliases, and whether one of them is a default fallback destination.
+        """
+        existing_urls = set(
+            self.filter(url__in=[destination.url for _, destination, _ in candidates]).values_list("url", flat=True)
+        )
+        existing_aliases = set(
+            Alias.objects.filter(
+                name__in=[name for _, _, aliases in candidates for name in aliases],
+            ).values_list("name", flat=True)
+        )
 
-        # Must wrap this block in a transaction so that if the destination is a default fallback
-        # and doesn't have exactly one argument, the transaction will be rolled back and
-        # the existing default fallback will be maintained.
-        # May explore alternative implementations later on to avoid the transaction overhead.
+        accepted: typing.List[typing.Tuple[Destination, typing.Set[str]]] = []
+        has_default_fallback = False
+        for index, destination, aliases in candidates:
+            duplicate_aliases = sorted(name for name in aliases if name in existing_aliases)
+            if destination.url in existing_urls:
+                results[index] = ValueError("Destination with URL already exists")
+            elif duplicate_aliases:
+                results[index] = ValueError(f"Aliases already exist: {', '.join(duplicate_aliases)}")
+            elif destination.is_default_fallback and has_default_fallback:
+                results[index] = ValueError("Only one default fallback destination may be created")
+            else:
+                existing_urls.add(destination.url)
+                existing_aliases.update(aliases)
+                has_default_fallback = has_default_fallback or destination.is_default_fallback
+                accepted.append((destination, aliases))
+        return (accepted, has_default_fallback)
+
+    def create_many_with_aliases(
+        self,
+        shortcuts: typing.Sequence[NewShortcut],
+    ) -> typing.List[typing.Union["Destination", ValueError]]:
+        """Add many destinations with one or more aliases each, in a handful of queries.
+
+        Each shortcut is validated like ``create_with_aliases``. The whole batch is validated up front, and
+        collisions with existing URLs and aliases are checked with a single query per table. Shortcuts
+        that fail validation, collide with an existing shortcut or an earlier shortcut in the batch,
+        or are a second default fallback destination, are skipped. The rest are inserted in a single
+        transaction, with one bulk insert per table.
+
+        Returns the created destination, or the ``ValueError`` explaining why it was skipped,
+        for each shortcut (in the same order).
+
+        Raises:
+            django.db.IntegrityError: if a concurrent write created a conflicting shortcut,
+                                      in which case none of the shortcuts are created.
+        """
+        results: typing.List[typing.Union[Destination, ValueError]] = []
+        candidates: typing.List[typing.Tuple[int, Destination, typing.Set[str]]] = []
+        for index, shortcut in enumerate(shortcuts):
+            try:
+                candidates.append((index, *self._build_with_aliases(shortcut)))
+                results.append(candidates[-1][1])
+            except ValueError as exc:
+                results.append(exc)
+
+        # Conflicts are checked in the same transaction as the inserts they guard
         with transaction.atomic():
-            if is_default_fallback:
-                is_fallback = True
-                # Clear all existing default fallbacks so new destination is the only one
+            accepted, has_default_fallback = self._check_conflicts(candidates, results)
+            if not accepted:
+                return results
+
+            if has_default_fallback:
                 self.clear_default_fallbacks()
-            if is_fallback and num_args != 1:
-                raise ValueError("Fallback destinations must have exactly one argument")
 
-        destination = self.create(
-            url=url,
-            num_args=num_args,
-            is_fallback=is_fallback,
-            is_default_fallback=is_default_fallback,
-            description=description,
-        )
-        Alias.objects.bulk_create([Alias(name=name, destination=destination) for name in unique_aliases])
-        return destination
+            destinations = self.bulk_create([destination for destination, _ in accepted])
+            if any(destination.pk is None for destination in destinations):
+                # Not every database backend returns primary keys from bulk inserts (i.e., SQLite)
+                ids = dict(
+                    self.filter(url__in=[destination.url for destination in destinations]).values_list("url", "id")
+                )
+                for destination in destinations:
+                    destination.pk = ids[destination.url]
+
+            Alias.objects.bulk_create(
+                [
+                    Alias(name=name, destination=destination)
+                    for destination, aliases in accepted
+                    for name in sorted(aliases)
+                ]
+            )
+            signals.shortcuts_changed.send(
+                sender=Destination, destination_ids=[destination.id for destination in destinations]
+            )
+        return results
+
+    def update_aliases(
+        self,
+        destination: "Destination",
+        add: typing.Iterable[str] = (),
+        remove: typing.Iterable[str] = (),
+        aliases: typing.Optional[typing.Iterable[str]] = None,
+    ) -> typing.List[str]:
+        """Add and remove aliases of ``destination``, or replace them with ``aliases`` (if provided).
+
+        Only the difference against the stored aliases is applied, with one bulk insert and one filtered
+        delete in a single transaction, and the final aliases are returned (sorted by name). The change is
+        signalled once with ``signals.shortcuts_changed``, so the number of queries doesn't depend on the
+        number of aliases added or removed.
+
+        Raises:
+            ValueError: if an alias to add is too long or belongs to another destination, or if
+                        the destination would be left without any aliases.
+        """
+        with transaction.atomic():
+            current = set(Alias.objects.filter(destination=destination).values_list("name", flat=True))
+            if aliases is not None:
+                desired = self._validate_aliases(aliases)
+                to_add = desired - current
+                to_remove = current - desired
+            else:
+                # Aliases in both lists are kept
+                unique_add = self._validate_aliases(add)
+                to_add = unique_add - current
+                to_remove = (current & set(remove)) - unique_add
+
+            final = (current - to_remove) | to_add
+            if not final:
+                raise ValueError("Destinations must have one or more aliases")
+            if not to_add and not to_remove:
+                return sorted(final)
+
+            if to_add:
+                existing_aliases = sorted(Alias.objects.filter(name__in=to_add).values_list("name", flat=True))
+                if existing_aliases:
+                    raise ValueError(f"Aliases already exist: {', '.join(existing_aliases)}")
+                Alias.objects.bulk_create([Alias(name=name, destination=destination) for name in sorted(to_add)])
+            if to_remove:
+                # Handled by the single shortcuts_changed signal below, rather than bumping the shortcuts
+                # version and updating the search index once per alias
+                with signals.collapse_row_signals():
+                    Alias.objects.filter(destination=destination, name__in=to_remove).delete()
+            signals.shortcuts_changed.send(sender=Alias, destination_ids=[destination.id])
+        return sorted(final)
 
     def default_fallback(self) -> "Destination":
         """Get default fallback destination.
@@ -130,6 +317,95 @@ class DestinationManager(models.Manager):
             logger.warning("Multiple destinations returned for alias {}", alias)
             raise
 
+    def resolve(
+        self,
+        alias: typing.Optional[str],
+        fallback_alias: typing.Optional[str] = None,
+    ) -> typing.Tuple["Destination", bool]:
+        """Resolve destination for ``alias``, ``fallback_alias``, or the default fallback in a single query.
+
+        Candidates are ranked in the following order (see: ``Destination.resolved_priority``):
+            0) Destination for ``alias``
+            1) Destination for ``fallback_alias``
+            2) Default fallback destination (lowest ``id`` first)
+        Returns the highest ranked destination and whether it's a fallback (i.e., ``alias`` did not resolve).
+
+        Raises:
+            Destination.DoesNotExist: if neither alias resolves and no default fallback destination found.
+        """
+        candidates = Q(is_default_fallback=True)
+        priorities = []
+        for priority, name in enumerate((alias, fallback_alias)):
+            if name:
+                candidates |= Q(alias__name=name)
+                priorities.append(When(alias__name=name, then=Value(priority)))
+
+        destination = (
+            self.filter(candidates)
+            .annotate(
+                resolved_priority=Case(
+                    *priorities,
+                    default=Value(Destination.DEFAULT_FALLBACK_PRIORITY),
+                    output_field=models.IntegerField(),
+                )
+            )
+            .order_by("resolved_priority", "id")
+            .first()
+        )
+        if not destination:
+            raise Destination.DoesNotExist()
+
+        return (destination, destination.resolved_priority > 0)  # type: ignore
+
+
+class ShortcutsVersionManager(models.Manager):
+    """ShortcutsVersion objects manager."""
+
+    def bump(self) -> int:
+        """Increment the shortcuts version and return the new version.
+
+        Must be called in the same transaction as the write to the ``destination`` or ``alias`` table,
+        so that the new version is visible if and only if the write is. The update locks the row until
+        the transaction ends, so concurrent writes commit their versions in order.
+        """
+        if not self.filter(id=ShortcutsVersion.SINGLETON_ID).update(version=F("version") + 1):
+            self.get_or_create(id=ShortcutsVersion.SINGLETON_ID, defaults={"version": 1})
+        return self.current()
+
+    def current(self) -> int:
+        """Get the current shortcuts version."""
+        return self.filter(id=ShortcutsVersion.SINGLETON_ID).values_list("version", flat=True).first() or 0
+
+
+class ShortcutChangeManager(models.Manager):
+    """ShortcutChange objects manager."""
+
+    def changed_since(self, version: int) -> typing.List[int]:
+        """Get IDs of destinations whose shortcuts changed after ``version`` (sorted by ID)."""
+        return list(
+            self.filter(version__gt=version)
+            .order_by("destination_id")
+            .values_list("destination_id", flat=True)
+            .distinct()
+        )
+
+    def oldest_version(self, current_version: int) -> int:
+        """Oldest version that changes can still be listed since, given the ``current_version``.
+
+        Changes of versions up to the returned one may have been deleted by ``prune``.
+        """
+        oldest = self.aggregate(oldest=Min("version"))["oldest"]
+        return current_version if oldest is None else oldest - 1
+
+    def prune(self, keep_versions: int) -> int:
+        """Delete the changes of every version but the last ``keep_versions`` and return the number of rows deleted.
+
+        Clients that last synced before the pruned versions must sync every shortcut again
+        (see: ``oldest_version``).
+        """
+        num_deleted, _ = self.filter(version__lte=ShortcutsVersion.objects.current() - keep_versions).delete()
+        return num_deleted
+
 
 ######################################
 ##### Database Schema Definition #####
@@ -148,6 +424,48 @@ class HealthCheck(models.Model):
         db_table = "database_health_check"
 
 
+class ShortcutsVersion(models.Model):
+    """shortcuts_version table.
+
+    Single row holding a monotonically increasing version of the ``destination`` and ``alias`` tables.
+    The version is bumped in the same transaction as every write to either table (see: ``hare.core.apps``),
+    so that processes on other nodes can cheaply poll it to detect changes (see: ``hare.core.resolver``).
+    """
+
+    version = models.BigIntegerField(default=0)
+
+    objects = ShortcutsVersionManager()
+
+    # Primary key of the only row in the table
+    SINGLETON_ID = 1
+
+    class Meta:
+        db_table = "shortcuts_version"
+
+
+class ShortcutChange(models.Model):
+    """shortcut_change table.
+
+    Change log of the ``destination`` and ``alias`` tables, with a row for each destination
+    whose shortcut (the destination or any of its aliases) was created, updated, or deleted,
+    and the shortcuts version (see: ``ShortcutsVersion``) after the write. Written in the same
+    transaction as the write, so clients can sync just the shortcuts changed since the version
+    they last synced (see: ``hare.api.views.ListChanges``).
+
+    Grows with every write, so old versions should be pruned periodically with the ``prune_shortcut_changes``
+    management command, once clients have synced past them.
+    """
+
+    version = models.BigIntegerField(db_index=True)
+    # Not a foreign key, since the destination may have been deleted
+    destination_id = models.BigIntegerField()
+
+    objects = ShortcutChangeManager()
+
+    class Meta:
+        db_table = "shortcut_change"
+
+
 class Destination(models.Model):
     """destination table.
 
@@ -159,9 +477,13 @@ class Destination(models.Model):
     Fallback destinations are URLs with a single parameter, and are used if the specified
     destination does not exist, or there is otherwise an error in redirecting an a destination.
     Common choices could be DuckDuckGo, Wikipedia, or Google.
+
+    The URL is compiled into ``url_segments`` (see: ``models_utils.compile_url_template``) and
+    ``num_args`` on every save, so that redirects can be rendered without parsing the URL.
     """
 
     url = models.CharField(max_length=2000, default=None, unique=True, validators=[URLValidator()])
+    url_segments = models.JSONField(default=list)
     num_args = models.IntegerField()
     is_fallback = models.BooleanField(db_index=True, default=False)
     is_default_fallback = models.BooleanField(db_index=True, default=False)
@@ -169,8 +491,40 @@ class Destination(models.Model):
 
     objects = DestinationManager()
 
+    # Rank of the default fallback destination in ``DestinationManager.resolve``
+    DEFAULT_FALLBACK_PRIORITY = 2
+
+    def compile_url(self) -> None:
+        """Compile ``url`` into ``url_segments`` and ``num_args``.
+
+        URLs with conversions or format specifications can't be compiled, so ``url_segments`` is left
+        empty and they're rendered with ``str.format`` instead (see: ``models_utils.render_url``).
+
+        Raises:
+            ValueError: if the URL contains keyword arguments (see: ``models_utils.gen_num_args_from_url``).
+        """
+        try:
+            self.url_segments = models_utils.compile_url_template(self.url)
+        except ValueError:
+            self.url_segments = []
+            self.num_args = models_utils.gen_num_args_from_url(self.url)
+        else:
+            self.num_args = len(self.url_segments) - 1
+
+    def render_url(self, arguments: typing.Sequence[str]) -> str:
+        """Render URL with exactly ``num_args`` arguments (see: ``models_utils.render_url``)."""
+        return models_utils.render_url(self.url, self.url_segments, arguments)
+
+    def save(self, *args, **kwargs) -> None:  # pylint: disable=signature-differs
+        self.compile_url()
+        # Save in a transaction so the shortcuts version is bumped atomically with the write
+        with transaction.atomic(savepoint=False):
+            super().save(*args, **kwargs)
+
     class Meta:
         db_table = "destination"
+        # Directory is ordered and paginated by description (see: ``hare.ui.directory``)
+        indexes = [models.Index(fields=["description", "id"], name="destination_description_idx")]
 
 
 class Alias(models.Model):
@@ -193,5 +547,83 @@ class Alias(models.Model):
     )
     name = models.CharField(max_length=100, unique=True)
 
+    def save(self, *args, **kwargs) -> None:  # pylint: disable=signature-differs
+        # Save in a transaction so the shortcuts version is bumped atomically with the write
+        with transaction.atomic(savepoint=False):
+            super().save(*args, **kwargs)
+
     class Meta:
         db_table = "alias"
+
+
+def gen_changed_destination_ids(
+    sender: typing.Type[models.Model],
+    instance: typing.Optional[models.Model] = None,
+    destination_ids: typing.Optional[typing.Iterable[int]] = None,
+) -> typing.List[int]:
+    """IDs of the destinations changed by a write signal, from either the ``destination`` or ``alias``
+    instance written (``post_save`` and ``post_delete``) or ``destination_ids`` (``signals.shortcuts_changed``).
+
+    Instances written in a ``signals.collapse_row_signals`` block are ignored, since ``signals.shortcuts_changed``
+    is sent for them instead.
+    """
+    if instance is not None:
+        if signals.row_signals_collapsed():
+            return []
+        return [instance.destination_id if sender is Alias else instance.id]  # type: ignore
+    return list(destination_ids or ())
+
+
+class _RecordedChanges:
+    """Shortcuts version bumped, and destinations recorded in the change log, by an atomic block.
+
+    Registered as a no-op ``transaction.on_commit`` callback, so it's discarded along with the writes
+    it recorded if the block is rolled back (see: ``record_shortcuts_change``).
+    """
+
+    __slots__ = ("destination_ids", "version")
+
+    def __init__(self, version: int, destination_ids: typing.Set[int]) -> None:
+        self.version = version
+        self.destination_ids = destination_ids
+
+    def __call__(self) -> None:
+        pass
+
+
+def record_shortcuts_change(
+    sender: typing.Type[models.Model],
+    instance: typing.Optional[models.Model] = None,
+    destination_ids: typing.Optional[typing.Iterable[int]] = None,
+    **_kwargs,
+) -> None:
+    """Signal receiver that bumps the shortcuts version and records the change on every write
+    to ``destination`` or ``alias``.
+
+    Writes in the same transaction or savepoint share a version, and each destination is recorded once,
+    so a cascading delete (which sends ``post_delete`` for every alias) bumps the version and writes
+    a change row once. Atomic blocks without a savepoint (i.e., ``Model.save``) belong to the enclosing one.
+    """
+    changed_ids = set(gen_changed_destination_ids(sender, instance, destination_ids))
+    connection = transaction.get_connection()
+    savepoint_ids = set(connection.savepoint_ids) - {None}
+    recorded = next(
+        (
+            entry[1]
+            for entry in connection.run_on_commit
+            if isinstance(entry[1], _RecordedChanges) and entry[0] - {None} == savepoint_ids
+        ),
+        None,
+    )
+    if recorded is not None:
+        changed_ids -= recorded.destination_ids
+    if not changed_ids:
+        return
+
+    if recorded is None:
+        recorded = _RecordedChanges(ShortcutsVersion.objects.bump(), set())
+        transaction.on_commit(recorded)
+    recorded.destination_ids.update(changed_ids)
+    ShortcutChange.objects.bulk_create(
+        [ShortcutChange(version=recorded.version, destination_id=destination_id) for destination_id in changed_ids]
+    )
@@ -22,6 +22,7 @@
 
 import logging
 from string import Formatter
+import typing
 from urllib.parse import urlsplit, urlunsplit
 
 
@@ -67,24 +68,82 @@ def validate_netloc_url(url: str) -> str:
     return url
 
 
+def compile_url_template(url: str) -> typing.List[str]:
+    """Compile URL format string into its literal segments.
+
+    Uses the built-in ``string.Formatter`` class to parse the format string. Each positional
+    argument sits between two consecutive segments, so a URL with N arguments compiles to
+    N + 1 segments (see: ``render_url_template``). Escaped braces (``"{{"`` and ``"}}"``)
+    are unescaped in the segments. Does not support keyword arguments, conversions (``"{!r}"``),
+    or format specifications (``"{:>10}"``), which are rendered with ``str.format`` instead (see: ``render_url``).
+
+    Raises:
+        ValueError: if URL contains keyword arguments, conversions, or format specifications.
+    """
+    segments = [""]
+    # Each entry is 4-tuple with (literal_text, field_name, format_spec, conversion)
+    # See: https://docs.python.org/3.6/library/string.html#string.Formatter.parse
+    for literal_text, field_name, format_spec, conversion in Formatter().parse(url):
+        segments[-1] += literal_text
+        if field_name is None:
+            continue
+        if field_name:
+            raise ValueError(f'must not have keyword arguments ("{field_name}")')
+        if format_spec or conversion:
+            raise ValueError("must not have conversions or format specifications")
+        segments.append("")
+    return segments
+
+
+def render_url_template(segments: typing.Sequence[str], arguments: typing.Sequence[str]) -> str:
+    """Render URL compiled with ``compile_url_template``.
+
+    Raises:
+        ValueError: if the number of arguments doesn't match the number of placeholders.
+    """
+    if len(arguments) != len(segments) - 1:
+        raise ValueError(f"Expected {len(segments) - 1} argument(s), got {len(arguments)}")
+
+    parts = [segments[0]]
+    for argument, segment in zip(arguments, segments[1:]):
+        parts.append(argument)
+        parts.append(segment)
+    return "".join(parts)
+
+
+def render_url(url: str, segments: typing.Sequence[str], arguments: typing.Sequence[str]) -> str:
+    """Render URL from its compiled ``segments``, or with ``str.format`` if it couldn't be compiled
+    (i.e., ``segments`` is empty because the URL has conversions or format specifications).
+
+    Raises:
+        ValueError: if the number of arguments doesn't match the number of placeholders,
+                    or an argument doesn't match its format specification.
+    """
+    if segments:
+        return render_url_template(segments, arguments)
+
+    num_args = gen_num_args_from_url(url)
+    if len(arguments) != num_args:
+        raise ValueError(f"Expected {num_args} argument(s), got {len(arguments)}")
+    return url.format(*arguments)
+
+
 def gen_num_args_from_url(url: str) -> int:
     """Parse number of position arguments from URL format string.
 
     Uses the built-in ``string.Formatter`` class to parse the number of
-    positional arguments. Does not support keyword arguments.
+    positional arguments, which may have conversions or format specifications
+    (see: ``render_url``). Does not support keyword arguments.
 
     Raises:
         ValueError: if URL contains keyword arguments.
     """
-    format_args = list(Formatter().parse(url))
     num_args = 0
-    # If only one entry and field_name is None, then doesn't have any format args
-    # Each entry in format_args is 4-tuple with (iteral_text, field_name, format_spec, conversion)
+    # Each entry is 4-tuple with (literal_text, field_name, format_spec, conversion)
     # See: https://docs.python.org/3.6/library/string.html#string.Formatter.parse
-    if len(format_args) != 1 or format_args[0][1] is not None:
-        for _, field_name, __, ___ in format_args:
-            if field_name:
-                raise ValueError(f'must not have keyword arguments ("{field_name}")')
-            if field_name == "":
-                num_args += 1
+    for _, field_name, __, ___ in Formatter().parse(url):
+        if field_name:
+            raise ValueError(f'must not have keyword arguments ("{field_name}")')
+        if field_name == "":
+            num_args += 1
     return num_args
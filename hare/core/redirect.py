@@ -0,0 +1,182 @@
+## MIT License
+##
+## Copyright (c) 2021 conveen
+##
+## Permission is hereby granted, free of charge, to any person obtaining a copy
+## of this software and associated documentation files (the "Software"), to deal
+## in the Software without restriction, including without limitation the rights
+## to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+## copies of the Software, and to permit persons to whom the Software is
+## furnished to do so, subject to the following conditions:
+##
+## The above copyright notice and this permission notice shall be included in all
+## copies or substantial portions of the Software.
+##
+## THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+## IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+## FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+## AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+## LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+## OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+## SOFTWARE.
+
+import logging
+import typing
+from urllib.parse import quote_plus
+
+from django.urls import reverse
+
+from hare.core.resolver import ResolvedDestination, resolver
+from hare.core.suggestions import suggester
+
+
+logger = logging.getLogger(__name__)
+
+# Alias reserved for the shortcut directory (see: ``hare.ui.views.ListDestinations``)
+LIST_ALIAS = "list"
+
+
+def parse_query(query: str) -> typing.Tuple[typing.Optional[str], typing.List[str]]:
+    """Parse alias and arguments (if any) from ``query`` URL parameter.
+
+    The alias and arguments are separated by one or more spaces.
+    If the query doesn't contain any non-whitespace characters, the alias is ``None``.
+    """
+    words = [word for word in query.split(" ") if word]
+    if not words:
+        return (None, [])
+
+    return (words[0], words[1:])
+
+
+def gen_redirect_url(query: str, fallback_alias: typing.Optional[str] = None) -> str:
+    """Resolve alias and apply arguments from ``query`` to the destination URL.
+
+    If the destination does not accept arguments, they will be ignored. If the destination
+    accepts N arguments, and N+k arguments are supplied, then will combine the Nth and k arguments
+    into a single, Nth argument. If no alias provided, or the alias provided does not exist,
+    then will use the fallback destination with the entire query as its argument
+    (see: ``hare.core.models.DestinationManager.resolve``).
+
+    Raises:
+        ValueError: if fewer arguments than the destination accepts are provided.
+        hare.core.models.Destination.DoesNotExist: if no default fallback destination found.
+    """
+    alias, arguments = parse_query(query)
+    if alias == LIST_ALIAS:
+        return reverse("list-destinations")
+
+    destination, as_fallback = resolver.resolve(alias, fallback_alias)
+    return _render_destination_url(destination, as_fallback, alias, arguments)
+
+
+def gen_redirect_url_if_allowed(
+    query: str,
+    fallback_alias: typing.Optional[str] = None,
+    allow_fallback: bool = True,
+) -> typing.Optional[str]:
+    """Version of ``gen_redirect_url`` that returns ``None`` if ``query`` resolves to a fallback destination
+    and ``allow_fallback`` is false.
+
+    Raises:
+        ValueError: if fewer arguments than the destination accepts are provided.
+        hare.core.models.Destination.DoesNotExist: if no default fallback destination found.
+    """
+    alias, arguments = parse_query(query)
+    if alias == LIST_ALIAS:
+        return reverse("list-destinations")
+
+    destination, as_fallback = resolver.resolve(alias, fallback_alias)
+    if as_fallback and not allow_fallback:
+        return None
+    return _render_destination_url(destination, as_fallback, alias, arguments)
+
+
+async def gen_redirect_url_async(query: str, fallback_alias: typing.Optional[str] = None) -> str:
+    """Asynchronous version of ``gen_redirect_url``.
+
+    Raises:
+        ValueError: if fewer arguments than the destination accepts are provided.
+        hare.core.models.Destination.DoesNotExist: if no default fallback destination found.
+    """
+    alias, arguments = parse_query(query)
+    if alias == LIST_ALIAS:
+        return reverse("list-destinations")
+
+    destination, as_fallback = await resolver.resolve_async(alias, fallback_alias)
+    return _render_destination_url(destination, as_fallback, alias, arguments)
+
+
+def gen_redirect_url_from_memory(
+    query: str,
+    fallback_alias: typing.Optional[str] = None,
+    allow_fallback: bool = True,
+) -> typing.Optional[str]:
+    """Version of ``gen_redirect_url`` that never queries the database (see: ``resolver.resolve_from_memory``).
+
+    Returns ``None`` if the destination can't be resolved from memory, or if it resolves
+    to a fallback destination and ``allow_fallback`` is false.
+
+    Raises:
+        ValueError: if fewer arguments than the destination accepts are provided.
+        hare.core.models.Destination.DoesNotExist: if no default fallback destination found.
+    """
+    alias, arguments = parse_query(query)
+    if alias == LIST_ALIAS:
+        return reverse("list-destinations")
+
+    resolved = resolver.resolve_from_memory(alias, fallback_alias)
+    if resolved is None or (resolved[1] and not allow_fallback):
+        return None
+    return _render_destination_url(resolved[0], resolved[1], alias, arguments)
+
+
+def gen_alias_suggestions(query: str, max_distance: int) -> typing.List[str]:
+    """Suggest aliases within ``max_distance`` edits of the alias in ``query``, if it doesn't exist.
+
+    Most queries that don't start with an alias are search text for the fallback destination,
+    so aliases are only suggested if their destination accepts exactly as many arguments as the query
+    has (i.e., "gihtub django" suggests "github" if it accepts one argument, but "how to cook rice"
+    doesn't suggest "go" unless it accepts three). Returns an empty list if the query has no alias
+    or the alias exists (see: ``suggestions.AliasSuggester``).
+
+    Raises:
+        django.db.DatabaseError: if the alias can't be resolved or the suggestions refreshed.
+    """
+    alias, arguments = parse_query(query)
+    if alias is None or alias == LIST_ALIAS or resolver.from_alias(alias) is not None:
+        return []
+
+    suggestions = []
+    for name in suggester.suggest(alias, max_distance):
+        destination = resolver.from_alias(name)
+        if destination is not None and destination.num_args == len(arguments):
+            suggestions.append(name)
+    return suggestions
+
+
+def _render_destination_url(
+    destination: ResolvedDestination,
+    as_fallback: bool,
+    alias: typing.Optional[str],
+    arguments: typing.List[str],
+) -> str:
+    """Apply arguments from query to resolved destination URL (see: ``gen_redirect_url``).
+
+    Raises:
+        ValueError: if fewer arguments than the destination accepts are provided.
+    """
+    if not destination.num_args:
+        return destination.url
+
+    # If destination is fallback, combine all arguments (including parsed alias) into single
+    if as_fallback:
+        arguments = [" ".join([alias] + arguments)] if alias else [""]
+    elif len(arguments) < destination.num_args:
+        raise ValueError(f"Expected {destination.num_args} argument(s), got {len(arguments)}")
+    # If number of arguments is more than expected, merge remainder into last argument
+    elif len(arguments) > destination.num_args:
+        last = destination.num_args - 1
+        arguments = arguments[:last] + [" ".join(arguments[last:])]
+
+    return destination.render_url([quote_plus(argument) for argument in arguments])
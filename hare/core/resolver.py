@@ -0,0 +1,914 @@
+## MIT License
+##
+## Copyright (c) 2021 conveen
+##
+## Permission is hereby granted, free of charge, to any person obtaining a copy
+## of this software and associated documentation files (the "Software"), to deal
+## in the Software without restriction, including without limitation the rights
+## to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+## copies of the Software, and to permit persons to whom the Software is
+## furnished to do so, subject to the following conditions:
+##
+## The above copyright notice and this permission notice shall be included in all
+## copies or substantial portions of the Software.
+##
+## THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+## IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+## FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+## AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+## LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+## OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+## SOFTWARE.
+
+from collections import OrderedDict
+from concurrent import futures
+from hashlib import blake2b
+import json
+import logging
+import math
+import os
+from pathlib import Path
+import threading
+import time
+import typing
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.db import close_old_connections, Error as DatabaseError, transaction
+
+from hare.core import alias_index, models, models_utils
+
+
+logger = logging.getLogger(__name__)
+KeyType = typing.TypeVar("KeyType")
+ValueType = typing.TypeVar("ValueType")
+
+
+class ResolvedDestination(typing.NamedTuple):
+    """Immutable snapshot of a ``models.Destination`` used to serve redirects.
+
+    Records are shared between threads by the resolver cache and thus must never be mutated.
+    """
+
+    id: int
+    url: str
+    url_segments: typing.Tuple[str, ...]
+    num_args: int
+    is_fallback: bool
+    is_default_fallback: bool
+
+    @classmethod
+    def from_destination(cls, destination: models.Destination) -> "ResolvedDestination":
+        """Create record from ``models.Destination`` instance."""
+        return cls(
+            destination.id,
+            destination.url,
+            tuple(destination.url_segments),
+            destination.num_args,
+            destination.is_fallback,
+            destination.is_default_fallback,
+        )
+
+    def render_url(self, arguments: typing.Sequence[str]) -> str:
+        """Render URL with exactly ``num_args`` arguments (see: ``models_utils.render_url``)."""
+        return models_utils.render_url(self.url, self.url_segments, arguments)
+
+
+class ResolverSnapshot:
+    """Immutable snapshot of every destination and alias, used to serve redirects when the database is unavailable.
+
+    Snapshots can be persisted to (and loaded from) a JSON file with ``save`` and ``load``,
+    so that freshly started processes can serve redirects before the database is reachable.
+    """
+
+    __slots__ = (
+        "aliases",
+        "default_fallback",
+    )
+
+    # Bump when the file format written by ``save`` changes
+    FORMAT_VERSION = 1
+
+    def __init__(
+        self,
+        aliases: typing.Dict[str, ResolvedDestination],
+        default_fallback: typing.Optional[ResolvedDestination],
+    ) -> None:
+        self.aliases = aliases
+        self.default_fallback = default_fallback
+
+    @classmethod
+    def from_records(
+        cls,
+        destinations: typing.Iterable[ResolvedDestination],
+        aliases: typing.Iterable[typing.Tuple[str, int]],
+    ) -> "ResolverSnapshot":
+        """Create snapshot from destination records and ``(alias name, destination id)`` pairs."""
+        destinations_by_id = {destination.id: destination for destination in destinations}
+        default_fallbacks = [
+            destination for destination in destinations_by_id.values() if destination.is_default_fallback
+        ]
+        return cls(
+            # Destinations may be deleted in between loading destinations and aliases
+            {
+                name: destinations_by_id[destination_id]
+                for name, destination_id in aliases
+                if destination_id in destinations_by_id
+            },
+            min(default_fallbacks, key=lambda destination: destination.id) if default_fallbacks else None,
+        )
+
+    @classmethod
+    def from_database(cls) -> "ResolverSnapshot":
+        """Load snapshot of the ``destination`` and ``alias`` tables."""
+        return cls.from_records(
+            [
+                ResolvedDestination(id_, url, tuple(url_segments), num_args, is_fallback, is_default_fallback)
+                for id_, url, url_segments, num_args, is_fallback, is_default_fallback in (
+                    models.Destination.objects.values_list(*ResolvedDestination._fields)  # pylint: disable=no-member
+                )
+            ],
+            models.Alias.objects.values_list("name", "destination_id"),
+        )
+
+    @classmethod
+    def load(cls, path: Path) -> "ResolverSnapshot":
+        """Load snapshot from file written by ``save``.
+
+        Raises:
+            OSError: if the file can't be read.
+            ValueError: if the file isn't a valid snapshot.
+        """
+        content = json.loads(path.read_text())
+        if content.get("version") != cls.FORMAT_VERSION:
+            raise ValueError(f"Unsupported snapshot version {content.get('version')}")
+
+        return cls.from_records(
+            [
+                ResolvedDestination(id_, url, tuple(url_segments), num_args, is_fallback, is_default_fallback)
+                for id_, url, url_segments, num_args, is_fallback, is_default_fallback in content["destinations"]
+            ],
+            content["aliases"].items(),
+        )
+
+    def save(self, path: Path) -> None:
+        """Write snapshot to file, atomically replacing any existing file."""
+        destinations = {destination.id: destination for destination in self.aliases.values()}
+        if self.default_fallback is not None:
+            destinations[self.default_fallback.id] = self.default_fallback
+
+        temp_path = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+        temp_path.write_text(
+            json.dumps(
+                {
+                    "version": self.FORMAT_VERSION,
+                    "destinations": list(destinations.values()),
+                    "aliases": {name: destination.id for name, destination in self.aliases.items()},
+                }
+            )
+        )
+        os.replace(temp_path, path)
+
+    def compile_alias_index(self, path: Path) -> None:
+        """Compile snapshot into memory-mapped alias index file (see: ``alias_index.write_alias_index``)."""
+        destinations = {destination.id: destination for destination in self.aliases.values()}
+        if self.default_fallback is not None:
+            destinations[self.default_fallback.id] = self.default_fallback
+
+        alias_index.write_alias_index(
+            path,
+            destinations.values(),
+            ((name, destination.id) for name, destination in self.aliases.items()),
+            self.default_fallback.id if self.default_fallback is not None else None,
+        )
+
+    def resolve(
+        self,
+        alias: typing.Optional[str],
+        fallback_alias: typing.Optional[str] = None,
+    ) -> typing.Tuple[ResolvedDestination, bool]:
+        """Resolve destination like ``models.Destination.objects.resolve``.
+
+        Raises:
+            models.Destination.DoesNotExist: if neither alias resolves and no default fallback destination found.
+        """
+        if alias and alias in self.aliases:
+            return (self.aliases[alias], False)
+        if fallback_alias and fallback_alias in self.aliases:
+            return (self.aliases[fallback_alias], True)
+        if self.default_fallback is not None:
+            return (self.default_fallback, True)
+        raise models.Destination.DoesNotExist()
+
+
+class LRUCache(typing.Generic[KeyType, ValueType]):
+    """Thread-safe, fixed-size cache with least-recently-used eviction."""
+
+    __slots__ = (
+        "_lock",
+        "_records",
+        "max_size",
+    )
+
+    def __init__(self, max_size: int) -> None:
+        if max_size < 1:
+            raise ValueError("Cache must hold at least one record")
+
+        self.max_size = max_size
+        self._lock = threading.Lock()
+        self._records: "OrderedDict[KeyType, ValueType]" = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._records)
+
+    def __contains__(self, key: KeyType) -> bool:
+        return key in self._records
+
+    def get(self, key: KeyType) -> typing.Optional[ValueType]:
+        """Get record for ``key`` (if it exists) and mark it as most recently used."""
+        with self._lock:
+            try:
+                self._records.move_to_end(key)
+            except KeyError:
+                return None
+            return self._records[key]
+
+    def set(self, key: KeyType, value: ValueType) -> None:
+        """Add or replace record for ``key``, evicting the least recently used record if full."""
+        with self._lock:
+            self._records[key] = value
+            self._records.move_to_end(key)
+            if len(self._records) > self.max_size:
+                self._records.popitem(last=False)
+
+    def clear(self) -> None:
+        """Remove all records."""
+        with self._lock:
+            self._records.clear()
+
+
+class BloomFilter:
+    """Fixed-size, probabilistic set of strings.
+
+    Membership tests never return false negatives, and return false positives at roughly ``error_rate``
+    when the filter holds ``capacity`` keys. Bit positions are derived from a single BLAKE2b digest
+    per key with double hashing, so a lookup costs one hash and ``num_hashes`` bit probes.
+    """
+
+    __slots__ = (
+        "_bits",
+        "num_bits",
+        "num_hashes",
+    )
+
+    def __init__(self, capacity: int, error_rate: float = 0.01) -> None:
+        if not 0 < error_rate < 1:
+            raise ValueError("Error rate must be between 0 and 1")
+
+        capacity = max(capacity, 1)
+        self.num_bits = max(8, math.ceil(-capacity * math.log(error_rate) / math.log(2) ** 2))
+        self.num_hashes = max(1, round(self.num_bits / capacity * math.log(2)))
+        self._bits = bytearray((self.num_bits + 7) // 8)
+
+    @classmethod
+    def from_keys(cls, keys: typing.Collection[str], error_rate: float = 0.01) -> "BloomFilter":
+        """Create filter sized for and containing ``keys``."""
+        bloom_filter = cls(len(keys), error_rate)
+        for key in keys:
+            bloom_filter.add(key)
+        return bloom_filter
+
+    def _positions(self, key: str) -> typing.Iterator[int]:
+        digest = blake2b(key.encode("utf-8"), digest_size=16).digest()
+        first_hash = int.from_bytes(digest[:8], "little")
+        # Second hash must be odd so that it cycles through every position
+        second_hash = int.from_bytes(digest[8:], "little") | 1
+        for index in range(self.num_hashes):
+            yield (first_hash + index * second_hash) % self.num_bits
+
+    def add(self, key: str) -> None:
+        """Add ``key`` to the filter."""
+        for position in self._positions(key):
+            self._bits[position >> 3] |= 1 << (position & 7)
+
+    def __contains__(self, key: object) -> bool:
+        if not isinstance(key, str):
+            return False
+        return all(self._bits[position >> 3] & (1 << (position & 7)) for position in self._positions(key))
+
+
+class SingleFlight:
+    """Coalesce concurrent calls for the same key into a single call.
+
+    The first thread to call ``do`` for a key (the leader) runs the function, while any other
+    thread that calls ``do`` for the same key before the leader finishes waits for, and shares,
+    its result (or exception). Once the leader finishes the key is released, so later calls run again.
+    """
+
+    class _Call:
+        __slots__ = (
+            "done",
+            "exception",
+            "result",
+        )
+
+        def __init__(self) -> None:
+            self.done = threading.Event()
+            self.exception: typing.Optional[BaseException] = None
+            self.result: typing.Any = None
+
+    __slots__ = (
+        "_calls",
+        "_lock",
+    )
+
+    def __init__(self) -> None:
+        self._calls: typing.Dict[typing.Hashable, "SingleFlight._Call"] = {}
+        self._lock = threading.Lock()
+
+    def do(self, key: typing.Hashable, function: typing.Callable[[], ValueType]) -> ValueType:
+        """Call ``function``, or wait for the result of the in-flight call for ``key``."""
+        with self._lock:
+            call = self._calls.get(key)
+            is_leader = call is None
+            if call is None:
+                call = self._calls[key] = SingleFlight._Call()
+
+        if not is_leader:
+            call.done.wait()
+            if call.exception is not None:
+                raise call.exception
+            return call.result
+
+        try:
+            call.result = function()
+            return call.result
+        except BaseException as exc:
+            call.exception = exc
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+
+
+class DestinationResolver:
+    """Resolve aliases to destinations through an in-process LRU cache.
+
+    Cache misses are resolved with ``models.Destination.objects.from_alias``. The cache is
+    invalidated on every write to the ``destination`` and ``alias`` tables (see: ``invalidate_resolver``).
+    Because a lookup can race with a write, each invalidation bumps a generation counter and
+    records resolved under a previous generation are discarded instead of being cached.
+
+    Writes made by other processes don't call ``invalidate`` in this one, so unless the alias index
+    is enabled (see below), at most once every ``version_check_interval`` seconds (and on the first
+    lookup after an invalidation), a lookup reads the shortcuts version (see: ``models.ShortcutsVersion``)
+    and invalidates the cache if it changed since the cache was filled. Records are thus never served
+    for longer than that after a write.
+
+    The resolver also keeps a ``BloomFilter`` of every alias name and the default fallback destination,
+    so that queries that don't start with an alias (i.e., search text) are resolved without querying
+    the database. The default fallback is cached by the first database lookup after an invalidation,
+    which also starts rebuilding the alias filter in a background thread, so that loading every alias
+    name doesn't hold up the request. Until the filter is rebuilt, every alias may exist.
+
+    Concurrent database lookups for the same aliases are coalesced with ``SingleFlight``, so that a popular
+    alias being invalidated doesn't cause a burst of identical queries.
+
+    If ``stale_while_error`` is enabled, the resolver keeps a last-known-good ``ResolverSnapshot`` of the entire
+    table, which is refreshed by the first successful database lookup after an invalidation. Lookups that fail
+    with a database error, or take longer than ``query_timeout`` seconds (if set), are served from the snapshot
+    instead. Lookups made while all ``max_query_workers`` worker threads are busy with timed out queries
+    are served from the snapshot right away. If ``snapshot_path`` is set, the snapshot is also written
+    to that file and loaded from it on startup (see: ``load_snapshot``).
+
+    If ``alias_index_path`` is set, lookups that miss the cache are resolved from the memory-mapped
+    alias index file (see: ``alias_index.AliasIndex``) shared by every process on the host, and only
+    reach the database if the file doesn't exist. The file is recompiled by the process that writes
+    to the shortcut tables (see: ``compile_alias_index``), or with the ``compile_alias_index`` command.
+
+    If ``version_poll_interval`` is set, every lookup is served from an immutable ``ResolverSnapshot``
+    held in memory instead. At most once every ``version_poll_interval`` seconds, a lookup reads the
+    shortcuts version (see: ``models.ShortcutsVersion``), and if it changed since the snapshot was loaded,
+    loads a new snapshot and swaps it in. This lets every node detect writes made by other nodes
+    with a single cheap query, rather than relying on ``invalidate`` being called in-process.
+    """
+
+    __slots__ = (
+        "_alias_filter",
+        "_alias_filter_lock",
+        "_alias_index",
+        "_cache",
+        "_cache_version",
+        "_default_fallback",
+        "_executor",
+        "_flights",
+        "_generation",
+        "_next_version_check",
+        "_next_version_poll",
+        "_query_slots",
+        "_snapshot",
+        "_snapshot_generation",
+        "_version_check_lock",
+        "_version_poll_lock",
+        "_versioned_snapshot",
+        "alias_filter_error_rate",
+        "max_query_workers",
+        "query_timeout",
+        "snapshot_path",
+        "stale_while_error",
+        "version_check_interval",
+        "version_poll_interval",
+    )
+
+    def __init__(  # pylint: disable=too-many-arguments
+        self,
+        max_size: int,
+        alias_filter_error_rate: float = 0.01,
+        stale_while_error: bool = False,
+        snapshot_path: typing.Optional[Path] = None,
+        query_timeout: typing.Optional[float] = None,
+        alias_index_path: typing.Optional[Path] = None,
+        version_poll_interval: typing.Optional[float] = None,
+        max_query_workers: int = 4,
+        version_check_interval: float = 1.0,
+    ) -> None:
+        self._cache: LRUCache[str, ResolvedDestination] = LRUCache(max_size)
+        self._cache_version: typing.Optional[int] = None
+        self._alias_filter: typing.Optional[BloomFilter] = None
+        self._alias_filter_lock = threading.Lock()
+        self._alias_index = alias_index.AliasIndexLoader(alias_index_path) if alias_index_path else None
+        self._default_fallback: typing.Optional[ResolvedDestination] = None
+        self._executor: typing.Optional[futures.ThreadPoolExecutor] = None
+        self._flights = SingleFlight()
+        self._generation = 0
+        self._next_version_check = 0.0
+        self._next_version_poll = 0.0
+        self._query_slots = threading.BoundedSemaphore(max_query_workers)
+        self._snapshot: typing.Optional[ResolverSnapshot] = None
+        self._snapshot_generation = -1
+        self._version_check_lock = threading.Lock()
+        self._version_poll_lock = threading.Lock()
+        self._versioned_snapshot: typing.Optional[typing.Tuple[int, ResolverSnapshot]] = None
+        self.alias_filter_error_rate = alias_filter_error_rate
+        self.max_query_workers = max_query_workers
+        self.query_timeout = query_timeout
+        self.snapshot_path = snapshot_path
+        self.stale_while_error = stale_while_error
+        self.version_check_interval = version_check_interval
+        self.version_poll_interval = version_poll_interval
+
+    def _run_query(self, query: typing.Callable[[], ValueType]) -> ValueType:
+        """Run database query, in a worker thread with a deadline if ``query_timeout`` is set.
+
+        A query holds its worker until it finishes, even after the deadline passes, so while the database hangs
+        every worker may be busy. Rather than queueing behind them, the query is then skipped.
+
+        Raises:
+            concurrent.futures.TimeoutError: if the query doesn't finish before the deadline,
+                or every worker is busy.
+        """
+        if self.query_timeout is None:
+            return query()
+
+        if not self._query_slots.acquire(blocking=False):
+            raise futures.TimeoutError(f"All {self.max_query_workers} resolver query workers are busy")
+        try:
+            if self._executor is None:
+                self._executor = futures.ThreadPoolExecutor(self.max_query_workers, thread_name_prefix="hare-resolver")
+            future = self._executor.submit(_run_in_worker, query)
+        except BaseException:
+            self._query_slots.release()
+            raise
+        future.add_done_callback(lambda _future: self._query_slots.release())
+        return future.result(timeout=self.query_timeout)
+
+    def compile_alias_index(self) -> None:
+        """Recompile the alias index file from the database, if ``alias_index_path`` is set."""
+        if self._alias_index is None:
+            return
+
+        # Runs after the write committed (see: ``invalidate_resolver``), so failures are logged rather than raised
+        try:
+            ResolverSnapshot.from_database().compile_alias_index(self._alias_index.path)
+        except (DatabaseError, OSError) as exc:
+            logger.warning("Failed to compile alias index {}", self._alias_index.path, exc_info=exc)
+            return
+        self._alias_index.reload(force=True)
+
+    def _get_alias_index(self) -> typing.Optional[alias_index.AliasIndex]:
+        return self._alias_index.get() if self._alias_index is not None else None
+
+    def load_snapshot(self) -> None:
+        """Load snapshot from ``snapshot_path``, if it exists.
+
+        The loaded snapshot is only used as a last resort, and is replaced by the first
+        successful database lookup.
+        """
+        if not self.stale_while_error or self.snapshot_path is None or not self.snapshot_path.is_file():
+            return
+
+        try:
+            self._snapshot = ResolverSnapshot.load(self.snapshot_path)
+        except (OSError, ValueError, KeyError, TypeError) as exc:
+            logger.warning("Failed to load resolver snapshot from {}", self.snapshot_path, exc_info=exc)
+
+    def _refresh_snapshot(self) -> None:
+        """Reload snapshot from the database, if it was invalidated (and persist it, if configured)."""
+        if not self.stale_while_error or self._snapshot_generation == self._generation:
+            return
+
+        self._flights.do(("snapshot",), self._query_snapshot)
+
+    def _query_snapshot(self) -> None:
+        generation = self._generation
+        snapshot = self._run_query(ResolverSnapshot.from_database)
+        if generation != self._generation:
+            return
+
+        self._snapshot = snapshot
+        self._snapshot_generation = generation
+        if self.snapshot_path is not None:
+            try:
+                snapshot.save(self.snapshot_path)
+            except OSError as exc:
+                logger.warning("Failed to save resolver snapshot to {}", self.snapshot_path, exc_info=exc)
+
+    def _resolve_from_snapshot(
+        self,
+        alias: typing.Optional[str],
+        fallback_alias: typing.Optional[str],
+        exc: Exception,
+    ) -> typing.Tuple[ResolvedDestination, bool]:
+        """Resolve destination from the last-known-good snapshot after ``exc`` was raised by the database.
+
+        Raises:
+            exc: if there's no snapshot to resolve from.
+            models.Destination.DoesNotExist: if neither alias resolves and no default fallback destination found.
+        """
+        snapshot = self._snapshot
+        if not self.stale_while_error or snapshot is None:
+            raise exc
+
+        logger.warning("Failed to resolve destination from database, resolving from snapshot", exc_info=exc)
+        return snapshot.resolve(alias, fallback_alias)
+
+    def _version_poll_due(self) -> bool:
+        return self.version_poll_interval is not None and (
+            self._versioned_snapshot is None or time.monotonic() >= self._next_version_poll
+        )
+
+    def _poll_version(self) -> None:
+        """Reload the versioned snapshot if the shortcuts version changed since it was loaded.
+
+        Only one thread polls at a time. Other threads keep serving the current snapshot
+        rather than waiting, unless there's no snapshot to serve yet. If the database is
+        unavailable the current snapshot is kept until the next poll.
+        """
+        if not self._version_poll_due():
+            return
+
+        blocking = self._versioned_snapshot is None
+        if not self._version_poll_lock.acquire(blocking=blocking):  # pylint: disable=consider-using-with
+            return
+        try:
+            if not self._version_poll_due():
+                return
+            self._next_version_poll = time.monotonic() + typing.cast(float, self.version_poll_interval)
+
+            # Version must be read before the snapshot, so that a write committed in between
+            # is picked up by the next poll rather than being labelled with the new version.
+            version = self._run_query(models.ShortcutsVersion.objects.current)
+            versioned_snapshot = self._versioned_snapshot
+            if versioned_snapshot is None or versioned_snapshot[0] != version:
+                self._versioned_snapshot = (version, self._run_query(ResolverSnapshot.from_database))
+        except (DatabaseError, futures.TimeoutError) as exc:
+            if self._versioned_snapshot is None:
+                self._next_version_poll = 0.0
+                raise
+            logger.warning("Failed to poll shortcuts version, serving current snapshot", exc_info=exc)
+        finally:
+            self._version_poll_lock.release()
+
+    def _get_versioned_snapshot(self) -> typing.Optional[ResolverSnapshot]:
+        """Get the versioned snapshot, polling the shortcuts version first if due."""
+        if self.version_poll_interval is None:
+            return None
+
+        self._poll_version()
+        return typing.cast(typing.Tuple[int, ResolverSnapshot], self._versioned_snapshot)[1]
+
+    def _version_check_due(self) -> bool:
+        # The alias index is kept up to date by checking the file's identity instead (see: ``alias_index``)
+        return (
+            self.version_poll_interval is None
+            and self._alias_index is None
+            and time.monotonic() >= self._next_version_check
+        )
+
+    def _check_version(self) -> None:
+        """Invalidate the cache if the shortcuts version changed since it was filled, i.e., by another process.
+
+        Only one thread checks at a time, and other threads keep serving the cache rather than waiting.
+        If the database is unavailable the cache is kept until the next check.
+        """
+        if not self._version_check_due():
+            return
+        if not self._version_check_lock.acquire(blocking=False):  # pylint: disable=consider-using-with
+            return
+        try:
+            if not self._version_check_due():
+                return
+            # Version must be read before the cache is refilled, so that a write committed in between
+            # is picked up by the next check rather than being labelled with the new version.
+            version = self._run_query(models.ShortcutsVersion.objects.current)
+            if version != self._cache_version:
+                self.invalidate()
+                self._cache_version = version
+            self._next_version_check = time.monotonic() + self.version_check_interval
+        except (DatabaseError, futures.TimeoutError) as exc:
+            logger.warning("Failed to check shortcuts version, serving cached records", exc_info=exc)
+        finally:
+            self._version_check_lock.release()
+
+    def _may_exist(self, alias: str) -> bool:
+        """Whether ``alias`` may exist, according to the alias filter (if built)."""
+        alias_filter = self._alias_filter
+        return alias_filter is None or alias in alias_filter
+
+    def _rebuild_alias_filter(self) -> None:
+        """Start rebuilding the alias filter from the database in the background, if it was invalidated."""
+        if self._alias_filter is not None:
+            return
+        if self._alias_filter_lock.acquire(blocking=False):  # pylint: disable=consider-using-with
+            _run_in_background(self._query_alias_filter, "hare-resolver-alias-filter")
+
+    def _query_alias_filter(self) -> None:
+        try:
+            generation = self._generation
+            alias_filter = BloomFilter.from_keys(
+                list(models.Alias.objects.values_list("name", flat=True)), self.alias_filter_error_rate
+            )
+            if generation == self._generation:
+                self._alias_filter = alias_filter
+        except DatabaseError as exc:
+            logger.warning("Failed to rebuild resolver alias filter", exc_info=exc)
+        finally:
+            self._alias_filter_lock.release()
+
+    def from_alias(self, alias: str) -> typing.Optional[ResolvedDestination]:
+        """Resolve destination for ``alias``, if it exists."""
+        snapshot = self._get_versioned_snapshot()
+        if snapshot is not None:
+            return snapshot.aliases.get(alias)
+
+        self._check_version()
+        record = self._cache.get(alias)
+        if record is not None:
+            return record
+        index = self._get_alias_index()
+        if index is not None:
+            entry = index.lookup(alias)
+            return ResolvedDestination._make(entry) if entry is not None else None
+        if not self._may_exist(alias):
+            return None
+
+        try:
+            return self._flights.do(("from_alias", alias), lambda: self._query_from_alias(alias))
+        except (DatabaseError, futures.TimeoutError) as exc:
+            snapshot = self._snapshot
+            if not self.stale_while_error or snapshot is None:
+                raise
+            logger.warning("Failed to resolve destination from database, resolving from snapshot", exc_info=exc)
+            return snapshot.aliases.get(alias)
+
+    def _query_from_alias(self, alias: str) -> typing.Optional[ResolvedDestination]:
+        generation = self._generation
+        destination = self._run_query(lambda: models.Destination.objects.from_alias(alias))
+        if destination is None:
+            return None
+
+        record = ResolvedDestination.from_destination(destination)
+        if generation == self._generation:
+            self._cache.set(alias, record)
+        return record
+
+    def resolve(
+        self,
+        alias: typing.Optional[str],
+        fallback_alias: typing.Optional[str] = None,
+    ) -> typing.Tuple[ResolvedDestination, bool]:
+        """Resolve destination for ``alias``, ``fallback_alias``, or the default fallback.
+
+        Returns the destination and whether it's a fallback, like ``models.Destination.objects.resolve``.
+        A cache hit for ``alias`` is served without querying the database, otherwise all candidates
+        are fetched in a single query and the winning one is cached under the alias it resolved from.
+
+        Raises:
+            models.Destination.DoesNotExist: if neither alias resolves and no default fallback destination found.
+        """
+        snapshot = self._get_versioned_snapshot()
+        if snapshot is not None:
+            return snapshot.resolve(alias, fallback_alias)
+
+        self._check_version()
+        resolved = self._resolve_from_cache(alias, fallback_alias)
+        if resolved is not None:
+            return resolved
+
+        return self._resolve_from_database(alias, fallback_alias)
+
+    async def resolve_async(
+        self,
+        alias: typing.Optional[str],
+        fallback_alias: typing.Optional[str] = None,
+    ) -> typing.Tuple[ResolvedDestination, bool]:
+        """Asynchronous version of ``resolve``.
+
+        Cache hits (or the versioned snapshot, if enabled) are served directly on the event loop,
+        and only lookups that need the database, including checking or polling the shortcuts version,
+        are handed off to a thread (Django 3.2 doesn't provide an asynchronous ORM).
+
+        Raises:
+            models.Destination.DoesNotExist: if neither alias resolves and no default fallback destination found.
+        """
+        resolved = self.resolve_from_memory(alias, fallback_alias)
+        if resolved is not None:
+            return resolved
+        return await sync_to_async(self.resolve)(alias, fallback_alias)
+
+    def resolve_from_memory(
+        self,
+        alias: typing.Optional[str],
+        fallback_alias: typing.Optional[str] = None,
+    ) -> typing.Optional[typing.Tuple[ResolvedDestination, bool]]:
+        """Resolve destination from the cache, alias index, or versioned snapshot, if it doesn't require
+        querying the database (see: ``resolve``), or ``None`` if it does.
+
+        Raises:
+            models.Destination.DoesNotExist: if neither alias resolves and no default fallback destination found.
+        """
+        if self.version_poll_interval is not None:
+            if self._version_poll_due():
+                return None
+            return typing.cast(typing.Tuple[int, ResolverSnapshot], self._versioned_snapshot)[1].resolve(
+                alias, fallback_alias
+            )
+        if self._version_check_due():
+            return None
+        return self._resolve_from_cache(alias, fallback_alias)
+
+    def _resolve_from_cache(
+        self,
+        alias: typing.Optional[str],
+        fallback_alias: typing.Optional[str],
+    ) -> typing.Optional[typing.Tuple[ResolvedDestination, bool]]:
+        """Resolve destination without querying the database, if possible.
+
+        Follows the same order as ``models.Destination.objects.resolve``, using the alias index (if set)
+        or the alias filter to rule out aliases that definitely don't exist. Returns ``None`` if any
+        candidate may exist in the database but isn't cached.
+        """
+        index = self._get_alias_index()
+        if index is not None:
+            return self._resolve_from_alias_index(index, alias, fallback_alias)
+
+        for name, as_fallback in ((alias, False), (fallback_alias, True)):
+            if not name:
+                continue
+            record = self._cache.get(name)
+            if record is not None:
+                return (record, as_fallback)
+            if self._may_exist(name):
+                return None
+
+        default_fallback = self._default_fallback
+        if default_fallback is not None:
+            return (default_fallback, True)
+        return None
+
+    def _resolve_from_alias_index(
+        self,
+        index: alias_index.AliasIndex,
+        alias: typing.Optional[str],
+        fallback_alias: typing.Optional[str],
+    ) -> typing.Optional[typing.Tuple[ResolvedDestination, bool]]:
+        """Resolve destination from the alias index, or return ``None`` if there's no default fallback."""
+        for name, as_fallback in ((alias, False), (fallback_alias, True)):
+            if not name:
+                continue
+            record = self._cache.get(name)
+            if record is not None:
+                return (record, as_fallback)
+            entry = index.lookup(name)
+            if entry is not None:
+                return (ResolvedDestination._make(entry), as_fallback)
+
+        entry = index.default_fallback()
+        return (ResolvedDestination._make(entry), True) if entry is not None else None
+
+    def _resolve_from_database(
+        self,
+        alias: typing.Optional[str],
+        fallback_alias: typing.Optional[str],
+    ) -> typing.Tuple[ResolvedDestination, bool]:
+        """Resolve destination with ``models.Destination.objects.resolve`` and cache the result.
+
+        Concurrent calls for the same aliases are coalesced into a single query.
+        If the query fails, the destination is resolved from the snapshot (if enabled).
+        """
+        try:
+            resolved = self._flights.do(
+                ("resolve", alias, fallback_alias),
+                lambda: self._query_resolve(alias, fallback_alias),
+            )
+        except (DatabaseError, futures.TimeoutError) as exc:
+            return self._resolve_from_snapshot(alias, fallback_alias, exc)
+
+        # The query succeeded, so the alias filter and snapshot are rebuilt on a best effort basis
+        self._rebuild_alias_filter()
+        try:
+            self._refresh_snapshot()
+        except (DatabaseError, futures.TimeoutError) as exc:
+            logger.warning("Failed to refresh resolver snapshot", exc_info=exc)
+        return resolved
+
+    def _query_resolve(
+        self,
+        alias: typing.Optional[str],
+        fallback_alias: typing.Optional[str],
+    ) -> typing.Tuple[ResolvedDestination, bool]:
+        generation = self._generation
+        destination, as_fallback = self._run_query(lambda: models.Destination.objects.resolve(alias, fallback_alias))
+        record = ResolvedDestination.from_destination(destination)
+        priority = destination.resolved_priority  # type: ignore
+        if generation == self._generation:
+            if priority == models.Destination.DEFAULT_FALLBACK_PRIORITY:
+                self._default_fallback = record
+            else:
+                self._cache.set(typing.cast(str, fallback_alias if priority else alias), record)
+        return (record, as_fallback)
+
+    def invalidate(self) -> None:
+        """Remove all cached records and the alias filter, and read the shortcuts version on the next lookup."""
+        self._generation += 1
+        self._next_version_check = 0.0
+        self._next_version_poll = 0.0
+        self._cache.clear()
+        self._alias_filter = None
+        self._default_fallback = None
+
+
+def _run_in_worker(query: typing.Callable[[], ValueType]) -> ValueType:
+    """Run database query in a resolver worker thread.
+
+    Worker threads aren't part of the request/response cycle, so connections must be
+    cleaned up here (like Django does at the end of every request).
+    """
+    try:
+        return query()
+    finally:
+        close_old_connections()
+
+
+def _run_in_background(function: typing.Callable[[], None], name: str) -> None:
+    """Run ``function`` in a new daemon thread named ``name``, cleaning up like ``_run_in_worker``."""
+    threading.Thread(target=_run_in_worker, args=(function,), name=name, daemon=True).start()
+
+
+resolver = DestinationResolver(
+    settings.RESOLVER_CACHE_SIZE,
+    settings.RESOLVER_ALIAS_FILTER_ERROR_RATE,
+    settings.RESOLVER_STALE_WHILE_ERROR,
+    settings.RESOLVER_SNAPSHOT_PATH,
+    settings.RESOLVER_QUERY_TIMEOUT,
+    settings.RESOLVER_ALIAS_INDEX_PATH,
+    settings.RESOLVER_VERSION_POLL_INTERVAL,
+    settings.RESOLVER_MAX_QUERY_WORKERS,
+    settings.RESOLVER_VERSION_CHECK_INTERVAL,
+)
+
+
+def invalidate_resolver(**_kwargs) -> None:
+    """Signal receiver that invalidates the resolver cache.
+
+    The cache is cleared immediately _and_ after the current transaction commits (if any),
+    so that lookups made by other threads before the commit can't leave stale records behind.
+    The alias index (if enabled) is recompiled once the transaction commits, however many
+    writes the transaction made.
+    """
+    resolver.invalidate()
+    on_commit_once(resolver.invalidate)
+    on_commit_once(resolver.compile_alias_index)
+
+
+def on_commit_once(function: typing.Callable[[], None]) -> None:
+    """Like ``transaction.on_commit``, but ``function`` is registered at most once per transaction.
+
+    Every write in a transaction sends a signal (i.e., once per alias removed), while the callbacks
+    only need to run once after the transaction commits.
+    """
+    connection = transaction.get_connection()
+    if connection.in_atomic_block and any(entry[1] == function for entry in connection.run_on_commit):
+        return
+    transaction.on_commit(function)
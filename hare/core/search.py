@@ -0,0 +1,355 @@
+## MIT License
+##
+## Copyright (c) 2021 conveen
+##
+## Permission is hereby granted, free of charge, to any person obtaining a copy
+## of this software and associated documentation files (the "Software"), to deal
+## in the Software without restriction, including without limitation the rights
+## to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+## copies of the Software, and to permit persons to whom the Software is
+## furnished to do so, subject to the following conditions:
+##
+## The above copyright notice and this permission notice shall be included in all
+## copies or substantial portions of the Software.
+##
+## THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+## IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+## FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+## AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+## LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+## OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+## SOFTWARE.
+
+import logging
+import re
+import typing
+
+from django.db import connection as default_connection, DatabaseError
+from django.db.backends.base.base import BaseDatabaseWrapper
+from django.db.models import Model, Q, QuerySet
+from django.db.models.expressions import RawSQL
+
+from hare.core import aggregates, models
+
+
+logger = logging.getLogger(__name__)
+
+# Table the search index is stored in, keyed by destination ID
+INDEX_TABLE = "destination_search"
+# Default and maximum number of search results
+DEFAULT_LIMIT = 20
+MAX_LIMIT = 100
+# Number of destinations indexed at a time when rebuilding the index
+CHUNK_SIZE = 2000
+# Relative weight of matches in aliases, descriptions, and URLs when ranking results
+ALIASES_WEIGHT = 10.0
+DESCRIPTION_WEIGHT = 5.0
+URL_WEIGHT = 1.0
+# Documents and queries are split into runs of word characters, so that URLs are searchable
+# by their host and path segments, and query syntax of the index can't be injected
+TOKEN_PATTERN = re.compile(r"\w+")
+
+# (destination ID, description, URL, aliases)
+Document = typing.Tuple[int, str, str, typing.List[str]]
+
+
+def tokenize(text: str) -> typing.List[str]:
+    """Split ``text`` into lowercase tokens (see: ``TOKEN_PATTERN``)."""
+    return TOKEN_PATTERN.findall(text.lower())
+
+
+def iter_documents(destination_ids: typing.Optional[typing.Iterable[int]] = None) -> typing.Iterator[Document]:
+    """Iterate over the documents of destinations in ``destination_ids`` (or every destination), ordered by ID."""
+    destinations = models.Destination.objects.order_by("id")
+    if destination_ids is not None:
+        destinations = destinations.filter(id__in=list(destination_ids))
+    return aggregates.iter_values_with_aliases(destinations, ("id", "description", "url"), chunk_size=CHUNK_SIZE)
+
+
+class SearchBackend:
+    """Search index maintained in the database, ranked by the database.
+
+    Subclasses implement the index for a single database backend (see: ``BACKENDS``). Documents
+    are tokenized in Python before they're indexed, so every backend matches the same tokens.
+    """
+
+    __slots__ = ()
+
+    def create_index(self, connection: BaseDatabaseWrapper) -> None:
+        """Create the index table (and any indexes on it) if it doesn't exist."""
+        raise NotImplementedError
+
+    def drop_index(self, connection: BaseDatabaseWrapper) -> None:
+        """Drop the index table if it exists."""
+        with connection.cursor() as cursor:
+            cursor.execute(f"DROP TABLE IF EXISTS {INDEX_TABLE}")
+
+    def delete(self, connection: BaseDatabaseWrapper, destination_ids: typing.Sequence[int]) -> None:
+        """Remove destinations in ``destination_ids`` from the index."""
+        raise NotImplementedError
+
+    def insert(self, connection: BaseDatabaseWrapper, documents: typing.Iterable[Document]) -> None:
+        """Add ``documents`` to the index, which must not already be indexed."""
+        raise NotImplementedError
+
+    def search(self, connection: BaseDatabaseWrapper, tokens: typing.Sequence[str], limit: int) -> typing.List[int]:
+        """IDs of the ``limit`` best matching destinations, where every token prefixes a token of the destination."""
+        raise NotImplementedError
+
+    def filter(self, destinations: QuerySet, tokens: typing.Sequence[str]) -> QuerySet:
+        """Filter ``destinations`` to those where every token prefixes a token of the destination, unranked."""
+        raise NotImplementedError
+
+    @staticmethod
+    def gen_fields(document: Document) -> typing.Tuple[str, str, str]:
+        """Tokenized aliases, description, and URL of ``document``, each joined by spaces."""
+        _, description, url, aliases = document
+        return (
+            " ".join(token for alias in aliases for token in tokenize(alias)),
+            " ".join(tokenize(description or "")),
+            " ".join(tokenize(url)),
+        )
+
+
+class SQLiteSearchBackend(SearchBackend):
+    """Search index stored in an FTS5 virtual table (rowid is the destination ID), ranked by BM25."""
+
+    __slots__ = ()
+
+    def create_index(self, connection: BaseDatabaseWrapper) -> None:
+        with connection.cursor() as cursor:
+            cursor.execute(f"CREATE VIRTUAL TABLE IF NOT EXISTS {INDEX_TABLE} USING fts5(aliases, description, url)")
+
+    def delete(self, connection: BaseDatabaseWrapper, destination_ids: typing.Sequence[int]) -> None:
+        with connection.cursor() as cursor:
+            cursor.executemany(f"DELETE FROM {INDEX_TABLE} WHERE rowid = %s", [(id_,) for id_ in destination_ids])
+
+    def insert(self, connection: BaseDatabaseWrapper, documents: typing.Iterable[Document]) -> None:
+        with connection.cursor() as cursor:
+            cursor.executemany(
+                f"INSERT INTO {INDEX_TABLE} (rowid, aliases, description, url) VALUES (%s, %s, %s, %s)",
+                [(document[0], *self.gen_fields(document)) for document in documents],
+            )
+
+    @staticmethod
+    def gen_query(tokens: typing.Sequence[str]) -> str:
+        """Quoted prefix queries, which are implicitly ANDed."""
+        return " ".join(f'"{token}"*' for token in tokens)
+
+    def search(self, connection: BaseDatabaseWrapper, tokens: typing.Sequence[str], limit: int) -> typing.List[int]:
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f"SELECT rowid FROM {INDEX_TABLE} WHERE {INDEX_TABLE} MATCH %s "
+                f"ORDER BY bm25({INDEX_TABLE}, %s, %s, %s), rowid LIMIT %s",
+                [self.gen_query(tokens), ALIASES_WEIGHT, DESCRIPTION_WEIGHT, URL_WEIGHT, limit],
+            )
+            return [row[0] for row in cursor.fetchall()]
+
+    def filter(self, destinations: QuerySet, tokens: typing.Sequence[str]) -> QuerySet:
+        return destinations.filter(
+            id__in=RawSQL(f"SELECT rowid FROM {INDEX_TABLE} WHERE {INDEX_TABLE} MATCH %s", [self.gen_query(tokens)])
+        )
+
+
+class PostgresSearchBackend(SearchBackend):
+    """Search index stored as a weighted ``tsvector`` per destination with a GIN index, ranked by ``ts_rank``."""
+
+    __slots__ = ()
+
+    def create_index(self, connection: BaseDatabaseWrapper) -> None:
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f"CREATE TABLE IF NOT EXISTS {INDEX_TABLE} "
+                "(destination_id bigint PRIMARY KEY, document tsvector NOT NULL)"
+            )
+            cursor.execute(
+                f"CREATE INDEX IF NOT EXISTS {INDEX_TABLE}_document_idx ON {INDEX_TABLE} USING GIN (document)"
+            )
+
+    def delete(self, connection: BaseDatabaseWrapper, destination_ids: typing.Sequence[int]) -> None:
+        with connection.cursor() as cursor:
+            cursor.execute(f"DELETE FROM {INDEX_TABLE} WHERE destination_id = ANY(%s)", [list(destination_ids)])
+
+    def insert(self, connection: BaseDatabaseWrapper, documents: typing.Iterable[Document]) -> None:
+        with connection.cursor() as cursor:
+            cursor.executemany(
+                f"INSERT INTO {INDEX_TABLE} (destination_id, document) VALUES (%s, "
+                "setweight(to_tsvector('simple', %s), 'A') || setweight(to_tsvector('simple', %s), 'B') "
+                "|| setweight(to_tsvector('simple', %s), 'C'))",
+                [(document[0], *self.gen_fields(document)) for document in documents],
+            )
+
+    @staticmethod
+    def gen_query(tokens: typing.Sequence[str]) -> str:
+        """ANDed prefix queries."""
+        return " & ".join(f"{token}:*" for token in tokens)
+
+    def search(self, connection: BaseDatabaseWrapper, tokens: typing.Sequence[str], limit: int) -> typing.List[int]:
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f"SELECT destination_id FROM {INDEX_TABLE}, to_tsquery('simple', %s) query WHERE document @@ query "
+                "ORDER BY ts_rank(document, query) DESC, destination_id LIMIT %s",
+                [self.gen_query(tokens), limit],
+            )
+            return [row[0] for row in cursor.fetchall()]
+
+    def filter(self, destinations: QuerySet, tokens: typing.Sequence[str]) -> QuerySet:
+        return destinations.filter(
+            id__in=RawSQL(
+                f"SELECT destination_id FROM {INDEX_TABLE} WHERE document @@ to_tsquery('simple', %s)",
+                [self.gen_query(tokens)],
+            )
+        )
+
+
+class PythonSearchBackend(SearchBackend):
+    """Fallback for database backends without full-text search, which maintains no index.
+
+    Destinations that contain every token are filtered in the database (see: ``filter``), and are ranked in Python
+    by the weight of the fields (see: ``ALIASES_WEIGHT``) that have a token prefixed by each query token.
+    """
+
+    __slots__ = ()
+
+    def create_index(self, connection: BaseDatabaseWrapper) -> None:
+        pass
+
+    def drop_index(self, connection: BaseDatabaseWrapper) -> None:
+        pass
+
+    def delete(self, connection: BaseDatabaseWrapper, destination_ids: typing.Sequence[int]) -> None:
+        pass
+
+    def insert(self, connection: BaseDatabaseWrapper, documents: typing.Iterable[Document]) -> None:
+        pass
+
+    def search(self, connection: BaseDatabaseWrapper, tokens: typing.Sequence[str], limit: int) -> typing.List[int]:
+        scores = []
+        for document in aggregates.iter_values_with_aliases(
+            self.filter(models.Destination.objects.order_by("id"), tokens),
+            ("id", "description", "url"),
+            chunk_size=CHUNK_SIZE,
+        ):
+            fields = [set(field.split()) for field in self.gen_fields(document)]
+            score = 0.0
+            for token in tokens:
+                matches = [any(word.startswith(token) for word in words) for words in fields]
+                if not any(matches):
+                    break
+                score += max(
+                    weight for weight, match in zip((ALIASES_WEIGHT, DESCRIPTION_WEIGHT, URL_WEIGHT), matches) if match
+                )
+            else:
+                scores.append((-score, document[0]))
+        return [id_ for _, id_ in sorted(scores)[:limit]]
+
+    def filter(self, destinations: QuerySet, tokens: typing.Sequence[str]) -> QuerySet:
+        """Filter ``destinations`` to those that contain every token, a superset of those that match."""
+        for token in tokens:
+            destinations = destinations.filter(
+                Q(description__icontains=token)
+                | Q(url__icontains=token)
+                | Q(id__in=models.Alias.objects.filter(name__icontains=token).values("destination_id"))
+            )
+        return destinations
+
+
+# Search backend for each database backend (by vendor) with full-text search
+BACKENDS: typing.Dict[str, SearchBackend] = {
+    "postgresql": PostgresSearchBackend(),
+    "sqlite": SQLiteSearchBackend(),
+}
+FALLBACK_BACKEND = PythonSearchBackend()
+# Whether the index table exists, by database, so that introspection only runs once per database
+_index_exists: typing.Dict[typing.Tuple[str, str], bool] = {}
+
+
+def get_backend(connection: BaseDatabaseWrapper = default_connection) -> SearchBackend:
+    """Search backend of ``connection``, or the fallback if it has none or its index wasn't created.
+
+    The index table isn't created if the database doesn't support it (i.e., SQLite without FTS5).
+    """
+    backend = BACKENDS.get(connection.vendor)
+    if backend is None:
+        return FALLBACK_BACKEND
+
+    key = (connection.alias, str(connection.settings_dict["NAME"]))
+    if key not in _index_exists:
+        _index_exists[key] = INDEX_TABLE in connection.introspection.table_names()
+    return backend if _index_exists[key] else FALLBACK_BACKEND
+
+
+def create_index(connection: BaseDatabaseWrapper, documents: typing.Iterable[Document]) -> None:
+    """Create the index of ``connection`` (if it has a search backend) and add ``documents`` to it.
+
+    Databases that don't support their backend's index are left to the fallback backend.
+    """
+    backend = BACKENDS.get(connection.vendor)
+    if backend is None:
+        return
+
+    try:
+        backend.create_index(connection)
+    except DatabaseError as exc:
+        logger.warning("Failed to create search index, falling back to unindexed search", exc_info=exc)
+        return
+    backend.insert(connection, documents)
+    _index_exists.pop((connection.alias, str(connection.settings_dict["NAME"])), None)
+
+
+def update_index(destination_ids: typing.Collection[int], connection: BaseDatabaseWrapper = default_connection) -> None:
+    """Reindex destinations in ``destination_ids``, which removes the ones that were deleted."""
+    if not destination_ids:
+        return
+
+    backend = get_backend(connection)
+    backend.delete(connection, list(destination_ids))
+    backend.insert(connection, iter_documents(destination_ids))
+
+
+def rebuild_index(connection: BaseDatabaseWrapper = default_connection) -> None:
+    """Drop and recreate the index from every destination (see: ``create_index``)."""
+    backend = BACKENDS.get(connection.vendor)
+    if backend is not None:
+        backend.drop_index(connection)
+    create_index(connection, iter_documents())
+
+
+def search(
+    query: str, limit: int = DEFAULT_LIMIT, connection: BaseDatabaseWrapper = default_connection
+) -> typing.List[int]:
+    """Search descriptions, URLs, and aliases for ``query``, and return IDs of the best matching destinations.
+
+    Every token of the query must prefix a token of the destination, i.e., ``"red sub"`` matches
+    a destination with the alias ``subreddit`` and the URL ``https://www.reddit.com/r/{}``.
+    Results are ranked best first, where matches in aliases rank above matches in descriptions,
+    and matches in descriptions above matches in URLs.
+    """
+    tokens = tokenize(query)
+    if not tokens:
+        return []
+    return get_backend(connection).search(connection, tokens, min(limit, MAX_LIMIT))
+
+
+def filter_destinations(
+    destinations: QuerySet, query: str, connection: BaseDatabaseWrapper = default_connection
+) -> QuerySet:
+    """Filter ``destinations`` to those that match ``query`` (see: ``search``) with the index, leaving them unranked.
+
+    Unlike ``search``, every match is kept, so the queryset can be ordered, counted, and paginated in the database.
+    Queries without tokens match nothing.
+    """
+    tokens = tokenize(query)
+    if not tokens:
+        return destinations.none()
+    return get_backend(connection).filter(destinations, tokens)
+
+
+def update_search_index(
+    sender: typing.Type[Model],
+    instance: typing.Optional[Model] = None,
+    destination_ids: typing.Optional[typing.Iterable[int]] = None,
+    **_kwargs,
+) -> None:
+    """Signal receiver that reindexes the changed destinations on every write to ``destination`` or ``alias``."""
+    update_index(set(models.gen_changed_destination_ids(sender, instance, destination_ids)))
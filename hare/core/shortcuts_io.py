@@ -0,0 +1,293 @@
+## MIT License
+##
+## Copyright (c) 2021 conveen
+##
+## Permission is hereby granted, free of charge, to any person obtaining a copy
+## of this software and associated documentation files (the "Software"), to deal
+## in the Software without restriction, including without limitation the rights
+## to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+## copies of the Software, and to permit persons to whom the Software is
+## furnished to do so, subject to the following conditions:
+##
+## The above copyright notice and this permission notice shall be included in all
+## copies or substantial portions of the Software.
+##
+## THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+## IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+## FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+## AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+## LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+## OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+## SOFTWARE.
+
+import csv
+import io
+import itertools
+import json
+import logging
+import typing
+
+from django.db import IntegrityError
+
+from hare.core import aggregates, models
+
+
+logger = logging.getLogger(__name__)
+
+# Supported file formats (JSON Lines and CSV)
+JSONL_FORMAT = "jsonl"
+CSV_FORMAT = "csv"
+FORMATS = (JSONL_FORMAT, CSV_FORMAT)
+
+# Fields of each shortcut record (and the CSV header)
+FIELDS = ("url", "description", "aliases", "is_fallback", "is_default_fallback")
+# Separator of aliases in the CSV aliases column
+CSV_ALIAS_SEPARATOR = " "
+# CSV values parsed as ``True`` for the boolean columns
+CSV_TRUE_VALUES = frozenset(("1", "true", "yes"))
+
+# Number of rows validated and inserted per transaction
+DEFAULT_BATCH_SIZE = 500
+# Number of destinations fetched from the database at a time when exporting
+DEFAULT_CHUNK_SIZE = 2000
+
+Record = typing.Dict[str, typing.Any]
+
+
+class ShortcutRow(typing.NamedTuple):
+    """Shortcut parsed from a single line (or CSV row) of an import file."""
+
+    line: int
+    url: str
+    description: str
+    aliases: typing.List[str]
+    is_fallback: bool
+    is_default_fallback: bool
+
+
+class RowError(typing.NamedTuple):
+    """Error for a single line (or CSV row) of an import file that wasn't imported."""
+
+    line: int
+    error: str
+
+
+class ImportResult:
+    """Number of shortcuts imported and errors for rows that weren't."""
+
+    __slots__ = (
+        "errors",
+        "num_created",
+    )
+
+    def __init__(self) -> None:
+        self.errors: typing.List[RowError] = []
+        self.num_created = 0
+
+
+def _row_from_record(line: int, record: Record) -> ShortcutRow:
+    """Convert parsed record to shortcut row.
+
+    Raises:
+        ValueError: if a field is missing or has the wrong type.
+    """
+    if not isinstance(record, dict):
+        raise ValueError("Record must be an object")
+
+    url = record.get("url")
+    if not isinstance(url, str):
+        raise ValueError("URL must be a string")
+    description = record.get("description", "")
+    if not isinstance(description, str):
+        raise ValueError("Description must be a string")
+    aliases = record.get("aliases")
+    if not isinstance(aliases, list) or not all(isinstance(name, str) for name in aliases):
+        raise ValueError("Aliases must be a list of strings")
+    is_fallback = record.get("is_fallback", False)
+    is_default_fallback = record.get("is_default_fallback", False)
+    if not isinstance(is_fallback, bool) or not isinstance(is_default_fallback, bool):
+        raise ValueError("Fallback flags must be booleans")
+
+    return ShortcutRow(line, url, description, aliases, is_fallback, is_default_fallback)
+
+
+def parse_jsonl(lines: typing.Iterable[str]) -> typing.Iterator[typing.Union[ShortcutRow, RowError]]:
+    """Parse shortcuts from JSON Lines, one object with the fields in ``FIELDS`` per line.
+
+    Blank lines are skipped, and lines that can't be parsed are yielded as ``RowError``.
+    """
+    for line, content in enumerate(lines, start=1):
+        if not content.strip():
+            continue
+        try:
+            yield _row_from_record(line, json.loads(content))
+        except ValueError as exc:
+            yield RowError(line, str(exc))
+
+
+def parse_csv(lines: typing.Iterable[str]) -> typing.Iterator[typing.Union[ShortcutRow, RowError]]:
+    """Parse shortcuts from CSV with a header row of (a subset of) the fields in ``FIELDS``.
+
+    Aliases are separated by ``CSV_ALIAS_SEPARATOR``, and boolean columns accept any of ``CSV_TRUE_VALUES``.
+    Rows that can't be parsed are yielded as ``RowError``.
+    """
+    reader = csv.DictReader(lines)
+    while True:
+        # The reader raises csv.Error itself (e.g. for a field over csv.field_size_limit), so it has to be advanced
+        # inside the try. The offending line is consumed either way, so parsing resumes with the next one.
+        try:
+            record = next(reader)
+        except StopIteration:
+            return
+        except csv.Error as exc:
+            # DictReader only updates line_num after a row parses, so take it from the underlying reader
+            yield RowError(reader.reader.line_num, str(exc))
+            continue
+        line = reader.line_num
+        try:
+            yield _row_from_record(
+                line,
+                {
+                    "url": record.get("url"),
+                    "description": record.get("description") or "",
+                    "aliases": (record.get("aliases") or "").split(CSV_ALIAS_SEPARATOR),
+                    "is_fallback": (record.get("is_fallback") or "").strip().lower() in CSV_TRUE_VALUES,
+                    "is_default_fallback": (
+                        (record.get("is_default_fallback") or "").strip().lower() in CSV_TRUE_VALUES
+                    ),
+                },
+            )
+        except ValueError as exc:
+            yield RowError(line, str(exc))
+
+
+def parse_shortcuts(
+    lines: typing.Iterable[str],
+    file_format: str,
+) -> typing.Iterator[typing.Union[ShortcutRow, RowError]]:
+    """Parse shortcuts from lines of a file in ``file_format`` (one of ``FORMATS``).
+
+    Raises:
+        ValueError: if the format isn't supported.
+    """
+    if file_format == JSONL_FORMAT:
+        return parse_jsonl(lines)
+    if file_format == CSV_FORMAT:
+        return parse_csv(lines)
+    raise ValueError(f"Unsupported format {file_format}, must be one of {', '.join(FORMATS)}")
+
+
+def _import_batch(batch: typing.Sequence[typing.Union[ShortcutRow, RowError]], result: ImportResult) -> None:
+    """Create shortcuts for a batch of rows with ``models.DestinationManager.create_many_with_aliases``."""
+    rows: typing.List[ShortcutRow] = []
+    for row in batch:
+        if isinstance(row, RowError):
+            result.errors.append(row)
+        else:
+            rows.append(row)
+    if not rows:
+        return
+
+    try:
+        created = models.Destination.objects.create_many_with_aliases(
+            [
+                models.NewShortcut(row.url, row.description, row.aliases, row.is_fallback, row.is_default_fallback)
+                for row in rows
+            ]
+        )
+    except IntegrityError as exc:
+        # Another writer created a conflicting shortcut after the batch was validated
+        logger.warning("Failed to insert batch of shortcuts", exc_info=exc)
+        result.errors.extend(RowError(row.line, f"Failed to insert: {exc}") for row in rows)
+        return
+
+    for row, destination in zip(rows, created):
+        if isinstance(destination, ValueError):
+            result.errors.append(RowError(row.line, str(destination)))
+        else:
+            result.num_created += 1
+
+
+def import_shortcuts(
+    rows: typing.Iterable[typing.Union[ShortcutRow, RowError]],
+    batch_size: int = DEFAULT_BATCH_SIZE,
+) -> ImportResult:
+    """Import shortcuts parsed by ``parse_shortcuts``.
+
+    Rows are validated and inserted in batches of ``batch_size``, each in a single transaction
+    (see: ``models.DestinationManager.create_many_with_aliases``). Rows that are invalid or collide
+    with existing (or previously imported) shortcuts are reported as errors in the result,
+    and the rest of the file is still imported.
+    """
+    result = ImportResult()
+    iterator = iter(rows)
+    while True:
+        batch = list(itertools.islice(iterator, batch_size))
+        if not batch:
+            return result
+        _import_batch(batch, result)
+
+
+def iter_shortcuts(chunk_size: int = DEFAULT_CHUNK_SIZE) -> typing.Iterator[Record]:
+    """Iterate over every shortcut as a record with the fields in ``FIELDS``, ordered by destination ID.
+
+    Destinations are streamed from the database ``chunk_size`` rows at a time with their aliases
+    (see: ``aggregates.iter_values_with_aliases``), so memory use doesn't depend on the size of the table.
+    """
+    rows = aggregates.iter_values_with_aliases(
+        models.Destination.objects.order_by("id"),
+        ("url", "description", "is_fallback", "is_default_fallback"),
+        chunk_size=chunk_size,
+    )
+    for url, description, is_fallback, is_default_fallback, aliases in rows:
+        yield {
+            "url": url,
+            "description": description,
+            "aliases": aliases,
+            "is_fallback": is_fallback,
+            "is_default_fallback": is_default_fallback,
+        }
+
+
+def format_jsonl(records: typing.Iterable[Record]) -> typing.Iterator[str]:
+    """Format records as JSON Lines (the inverse of ``parse_jsonl``)."""
+    for record in records:
+        yield f"{json.dumps(record)}\n"
+
+
+def format_csv(records: typing.Iterable[Record]) -> typing.Iterator[str]:
+    """Format records as CSV with a header row (the inverse of ``parse_csv``)."""
+    buffer = io.StringIO()
+    writer = csv.DictWriter(buffer, FIELDS)
+
+    def flush() -> str:
+        content = buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate()
+        return content
+
+    writer.writeheader()
+    yield flush()
+    for record in records:
+        writer.writerow(
+            {
+                **record,
+                "aliases": CSV_ALIAS_SEPARATOR.join(record["aliases"]),
+                "is_fallback": str(record["is_fallback"]).lower(),
+                "is_default_fallback": str(record["is_default_fallback"]).lower(),
+            }
+        )
+        yield flush()
+
+
+def export_shortcuts(file_format: str, chunk_size: int = DEFAULT_CHUNK_SIZE) -> typing.Iterator[str]:
+    """Export every shortcut as lines of a file in ``file_format`` (one of ``FORMATS``).
+
+    Raises:
+        ValueError: if the format isn't supported.
+    """
+    if file_format == JSONL_FORMAT:
+        return format_jsonl(iter_shortcuts(chunk_size))
+    if file_format == CSV_FORMAT:
+        return format_csv(iter_shortcuts(chunk_size))
+    raise ValueError(f"Unsupported format {file_format}, must be one of {', '.join(FORMATS)}")
@@ -0,0 +1,56 @@
+## MIT License
+##
+## Copyright (c) 2021 conveen
+##
+## Permission is hereby granted, free of charge, to any person obtaining a copy
+## of this software and associated documentation files (the "Software"), to deal
+## in the Software without restriction, including without limitation the rights
+## to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+## copies of the Software, and to permit persons to whom the Software is
+## furnished to do so, subject to the following conditions:
+##
+## The above copyright notice and this permission notice shall be included in all
+## copies or substantial portions of the Software.
+##
+## THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+## IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+## FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+## AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+## LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+## OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+## SOFTWARE.
+
+import contextlib
+import threading
+import typing
+
+from django.dispatch import Signal
+
+
+# Sent after writes that bypass the model post_save/post_delete signals,
+# such as ``QuerySet.bulk_create`` and ``QuerySet.update``, so that
+# receivers (like the resolver cache) can react to changes in the shortcut tables.
+# Must be sent with the IDs of the destinations whose shortcuts changed (``destination_ids``).
+shortcuts_changed = Signal()
+
+_collapsed = threading.local()
+
+
+@contextlib.contextmanager
+def collapse_row_signals() -> typing.Iterator[None]:
+    """Have receivers ignore the per-row ``post_save`` and ``post_delete`` signals of writes made in the block
+    (see: ``row_signals_collapsed``), such as the rows deleted by ``QuerySet.delete``.
+
+    The caller must send ``shortcuts_changed`` once for the writes instead.
+    """
+    depth = getattr(_collapsed, "depth", 0)
+    _collapsed.depth = depth + 1
+    try:
+        yield
+    finally:
+        _collapsed.depth = depth
+
+
+def row_signals_collapsed() -> bool:
+    """Whether the current thread is in a ``collapse_row_signals`` block."""
+    return getattr(_collapsed, "depth", 0) > 0
@@ -0,0 +1,264 @@
+## MIT License
+##
+## Copyright (c) 2021 conveen
+##
+## Permission is hereby granted, free of charge, to any person obtaining a copy
+## of this software and associated documentation files (the "Software"), to deal
+## in the Software without restriction, including without limitation the rights
+## to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+## copies of the Software, and to permit persons to whom the Software is
+## furnished to do so, subject to the following conditions:
+##
+## The above copyright notice and this permission notice shall be included in all
+## copies or substantial portions of the Software.
+##
+## THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+## IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+## FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+## AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+## LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+## OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+## SOFTWARE.
+
+import logging
+import threading
+import time
+import typing
+
+from django.conf import settings
+from django.db import DatabaseError
+
+from hare.core import models
+
+
+logger = logging.getLogger(__name__)
+
+# Default maximum edit distance of suggestions, and maximum number of suggestions
+DEFAULT_MAX_DISTANCE = 2
+DEFAULT_LIMIT = 5
+# Default seconds between checks of the shortcuts version for changes to aliases
+DEFAULT_REFRESH_INTERVAL = 5.0
+
+
+def gen_deletes(word: str, max_distance: int) -> typing.Set[str]:
+    """Every string formed by deleting up to ``max_distance`` characters from ``word`` (including ``word``).
+
+    Two words within ``max_distance`` edits of each other (see: ``gen_edit_distance``) always share one
+    of these strings, since an insertion, substitution, or transposition is undone by deleting
+    a character from one word or each word.
+    """
+    deletes = {word}
+    frontier = {word}
+    for _ in range(max_distance):
+        frontier = {variant[:index] + variant[index + 1 :] for variant in frontier for index in range(len(variant))}
+        deletes |= frontier
+    return deletes
+
+
+def gen_edit_distance(source: str, target: str, max_distance: int) -> typing.Optional[int]:
+    """Edit distance between ``source`` and ``target``, or ``None`` if it's more than ``max_distance``.
+
+    Insertions, deletions, substitutions, and transpositions of adjacent characters each count
+    as one edit (optimal string alignment distance). Stops as soon as every alignment exceeds
+    ``max_distance``, so distant words are rejected after a few rows.
+    """
+    if abs(len(source) - len(target)) > max_distance:
+        return None
+
+    previous_row: typing.List[int] = []
+    row = list(range(len(target) + 1))
+    for i, source_char in enumerate(source, 1):
+        previous_row, before_row, row = row, previous_row, [i] + [0] * len(target)
+        for j, target_char in enumerate(target, 1):
+            cost = 0 if source_char == target_char else 1
+            row[j] = min(previous_row[j] + 1, row[j - 1] + 1, previous_row[j - 1] + cost)
+            if i > 1 and j > 1 and source_char == target[j - 2] and source[i - 2] == target_char:
+                row[j] = min(row[j], before_row[j - 2] + 1)
+        if min(row) > max_distance:
+            return None
+    return row[-1] if row[-1] <= max_distance else None
+
+
+def gen_max_distance(alias: str, max_distance: int) -> int:
+    """Edit distance budget for suggestions for ``alias``: ``max_distance``, but at most a third of its length.
+
+    Short words are within a couple of edits of most short aliases (i.e., "how" of "go" and "so"),
+    so the budget shrinks with the length of the alias, and words shorter than three characters
+    get no suggestions.
+    """
+    return min(max_distance, len(alias) // 3)
+
+
+class AliasSuggester:
+    """In-memory index over alias names for "did you mean" suggestions of mistyped aliases.
+
+    Aliases are indexed by every string formed by deleting up to ``max_distance`` characters from them
+    (see: ``gen_deletes``), so the candidates for a mistyped alias are found with a few dictionary
+    lookups, regardless of the number of aliases, and only candidates are compared by edit distance.
+    Aliases are compared case-insensitively.
+
+    The index is built from the database on first use, and then kept up to date incrementally
+    from the shortcut change log (see: ``models.ShortcutChange``): at most once every ``refresh_interval``
+    seconds, a lookup reads the shortcuts version, and only the aliases of the destinations that changed
+    since are reloaded, so changes made by any process are picked up. Only one thread refreshes at a time,
+    and other threads keep using the current index rather than waiting on the database.
+    """
+
+    __slots__ = (
+        "_deletes",
+        "_destination_aliases",
+        "_lock",
+        "_next_refresh",
+        "_refresh_lock",
+        "_version",
+        "max_distance",
+        "refresh_interval",
+    )
+
+    def __init__(
+        self,
+        max_distance: int = DEFAULT_MAX_DISTANCE,
+        refresh_interval: float = DEFAULT_REFRESH_INTERVAL,
+    ) -> None:
+        self._deletes: typing.Dict[str, typing.Set[str]] = {}
+        self._destination_aliases: typing.Dict[int, typing.Set[str]] = {}
+        self._lock = threading.Lock()
+        self._next_refresh = 0.0
+        self._refresh_lock = threading.Lock()
+        self._version: typing.Optional[int] = None
+        self.max_distance = max_distance
+        self.refresh_interval = refresh_interval
+
+    def __len__(self) -> int:
+        return sum(len(names) for names in self._destination_aliases.values())
+
+    def _add(self, name: str) -> None:
+        for variant in gen_deletes(name.lower(), self.max_distance):
+            self._deletes.setdefault(variant, set()).add(name)
+
+    def _remove(self, name: str) -> None:
+        for variant in gen_deletes(name.lower(), self.max_distance):
+            names = self._deletes[variant]
+            names.discard(name)
+            if not names:
+                del self._deletes[variant]
+
+    def _set_aliases(self, destination_id: int, names: typing.Set[str]) -> None:
+        """Replace the aliases of destination ``destination_id`` with ``names``."""
+        current = self._destination_aliases.pop(destination_id, set())
+        for name in current - names:
+            self._remove(name)
+        for name in names - current:
+            self._add(name)
+        if names:
+            self._destination_aliases[destination_id] = names
+
+    @staticmethod
+    def _query_aliases(
+        destination_ids: typing.Optional[typing.List[int]] = None,
+    ) -> typing.Dict[int, typing.Set[str]]:
+        """Query the aliases of destinations in ``destination_ids`` (or every destination)."""
+        aliases: typing.Dict[int, typing.Set[str]] = {destination_id: set() for destination_id in destination_ids or ()}
+        queryset = models.Alias.objects.all()
+        if destination_ids is not None:
+            queryset = queryset.filter(destination_id__in=destination_ids)
+        for name, destination_id in queryset.values_list("name", "destination_id").iterator():
+            aliases.setdefault(destination_id, set()).add(name)
+        return aliases
+
+    def _refresh_due(self) -> bool:
+        return self._version is None or time.monotonic() >= self._next_refresh
+
+    def refresh(self) -> None:
+        """Apply changes to aliases since the index was last refreshed (or build it, if it hasn't been built),
+        if ``refresh_interval`` seconds have passed since the last refresh.
+
+        The database is queried without holding the index lock, which is only held to apply the changes.
+        The version is read before the aliases, so a write committed in between is applied again
+        by the next refresh rather than being skipped. If the database is unavailable, the current index
+        is kept until the next refresh.
+
+        Raises:
+            django.db.DatabaseError: if the index hasn't been built and can't be built from the database.
+        """
+        if not self._refresh_due():
+            return
+
+        blocking = self._version is None
+        if not self._refresh_lock.acquire(blocking=blocking):  # pylint: disable=consider-using-with
+            return
+        try:
+            if not self._refresh_due():
+                return
+            self._next_refresh = time.monotonic() + self.refresh_interval
+
+            version = models.ShortcutsVersion.objects.current()
+            if self._version is None:
+                aliases = self._query_aliases()
+            elif version > self._version:
+                aliases = self._query_aliases(models.ShortcutChange.objects.changed_since(self._version))
+            else:
+                return
+
+            with self._lock:
+                for destination_id, names in aliases.items():
+                    self._set_aliases(destination_id, names)
+                if self._version is None:
+                    logger.debug("Built alias suggestion index with {} aliases at version {}", len(self), version)
+                self._version = version
+        except DatabaseError as exc:
+            if self._version is None:
+                self._next_refresh = 0.0
+                raise
+            logger.warning("Failed to refresh alias suggestion index, using current index", exc_info=exc)
+        finally:
+            self._refresh_lock.release()
+
+    def suggest(
+        self,
+        alias: str,
+        max_distance: typing.Optional[int] = None,
+        limit: int = DEFAULT_LIMIT,
+    ) -> typing.List[str]:
+        """Aliases within ``max_distance`` edits (``self.max_distance`` by default, and at most a third
+        of the length of ``alias``, see: ``gen_max_distance``) of ``alias`` (other than ``alias`` itself),
+        closest first.
+
+        Raises:
+            ValueError: if ``max_distance`` is greater than the distance the index was built for.
+            django.db.DatabaseError: if the index hasn't been built and can't be built from the database.
+        """
+        if max_distance is None:
+            max_distance = self.max_distance
+        elif max_distance > self.max_distance:
+            raise ValueError(f"Max distance must be at most {self.max_distance}, got {max_distance}")
+        max_distance = gen_max_distance(alias, max_distance)
+        if max_distance < 1:
+            return []
+
+        self.refresh()
+        key = alias.lower()
+        with self._lock:
+            candidates = {name for variant in gen_deletes(key, max_distance) for name in self._deletes.get(variant, ())}
+
+        suggestions = []
+        for name in candidates:
+            if name == alias:
+                continue
+            distance = gen_edit_distance(key, name.lower(), max_distance)
+            if distance is not None:
+                suggestions.append((distance, name))
+        return [name for _, name in sorted(suggestions)[:limit]]
+
+    def clear(self) -> None:
+        """Clear the index, so it's rebuilt from the database on next use."""
+        with self._refresh_lock, self._lock:
+            self._deletes.clear()
+            self._destination_aliases.clear()
+            self._next_refresh = 0.0
+            self._version = None
+
+
+suggester = AliasSuggester(
+    settings.ALIAS_SUGGESTION_DISTANCE if settings.ALIAS_SUGGESTION_DISTANCE is not None else DEFAULT_MAX_DISTANCE
+)
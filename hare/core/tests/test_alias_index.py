@@ -0,0 +1,135 @@
+## MIT License
+##
+## Copyright (c) 2021 conveen
+##
+## Permission is hereby granted, free of charge, to any person obtaining a copy
+## of this software and associated documentation files (the "Software"), to deal
+## in the Software without restriction, including without limitation the rights
+## to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+## copies of the Software, and to permit persons to whom the Software is
+## furnished to do so, subject to the following conditions:
+##
+## The above copyright notice and this permission notice shall be included in all
+## copies or substantial portions of the Software.
+##
+## THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+## IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+## FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+## AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+## LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+## OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+## SOFTWARE.
+
+from pathlib import Path
+import tempfile
+from unittest import mock
+
+import django.test as django_unittest
+from django.core.management import call_command
+from django.db import connection
+
+from hare.core import alias_index, models, resolver
+from hare.core.tests_utils import run_background_tasks_inline
+
+
+class TestAliasIndex(django_unittest.TestCase):
+    """Tests for the memory-mapped alias index in ``alias_index``."""
+
+    def setUp(self) -> None:
+        run_background_tasks_inline(self)
+        temp_dir = tempfile.TemporaryDirectory()  # pylint: disable=consider-using-with
+        self.addCleanup(temp_dir.cleanup)
+        self.path = Path(temp_dir.name).joinpath("aliases.idx")
+
+    def test_write_lookup(self) -> None:
+        """Test that every alias written to the index can be looked up."""
+        destinations = [
+            (index, f"https://example.com/{index}/{{}}", (f"https://example.com/{index}/", ""), 1, False, False)
+            for index in range(1, 501)
+        ]
+        destinations.append((501, "https://ñ.example.com/", ("https://ñ.example.com/",), 0, True, True))
+        destinations.append((502, "https://example.com/{:>4}", (), 1, False, False))
+        aliases = [(f"alias{index}", index % 500 + 1) for index in range(2000)]
+        aliases += [("ñ", 501), ("uncompiled", 502), ("orphan", 999)]
+        alias_index.write_alias_index(self.path, destinations, aliases, 501)
+
+        index = alias_index.AliasIndex(self.path)
+        self.assertEqual(2002, index.num_aliases)
+        for name, destination_id in aliases[:-1]:
+            self.assertEqual(destinations[destination_id - 1], index.lookup(name))
+        for name in ("alias", "alias2000", "orphan", ""):
+            self.assertIsNone(index.lookup(name))
+        self.assertEqual(destinations[-2], index.default_fallback())
+
+    def test_empty(self) -> None:
+        """Test that an empty index doesn't contain any aliases."""
+        alias_index.write_alias_index(self.path, [], [], None)
+        index = alias_index.AliasIndex(self.path)
+        self.assertIsNone(index.lookup("ddg"))
+        self.assertIsNone(index.default_fallback())
+
+    def test_invalid_file(self) -> None:
+        """Test that files that aren't alias indices are rejected."""
+        self.path.write_bytes(b"not an alias index file")
+        self.assertRaises(ValueError, alias_index.AliasIndex, self.path)
+
+    def test_loader_reload(self) -> None:
+        """Test that ``AliasIndexLoader`` reopens the index file when it's replaced."""
+        loader = alias_index.AliasIndexLoader(self.path, check_interval=0)
+        self.assertIsNone(loader.get())
+
+        destination = (1, "https://time.is/", ("https://time.is/",), 0, False, False)
+        alias_index.write_alias_index(self.path, [destination], [("time", 1)], None)
+        self.assertEqual(destination, loader.get().lookup("time"))
+
+        alias_index.write_alias_index(self.path, [destination], [("now", 1)], None)
+        self.assertIsNone(loader.get().lookup("time"))
+        self.assertEqual(destination, loader.get().lookup("now"))
+
+    def test_resolver(self) -> None:
+        """Test that the resolver resolves destinations from the alias index without querying the database."""
+        reddit = resolver.ResolvedDestination.from_destination(
+            models.Destination.objects.create_with_aliases("https://www.reddit.com/r/{}", "Reddit", ["r"])
+        )
+        ddg = resolver.ResolvedDestination.from_destination(
+            models.Destination.objects.create_with_aliases(
+                "https://duckduckgo.com/?q={}", "DuckDuckGo", ["ddg"], True, True
+            )
+        )
+        call_command("compile_alias_index", "--output", f"{self.path}")
+
+        destination_resolver = resolver.DestinationResolver(16, alias_index_path=self.path)
+        with self.assertNumQueries(0):
+            self.assertEqual((reddit, False), destination_resolver.resolve("r", "ddg"))
+            self.assertEqual((ddg, True), destination_resolver.resolve("rr", "ddg"))
+            self.assertEqual((ddg, True), destination_resolver.resolve("rr", "rrr"))
+            self.assertEqual(reddit, destination_resolver.from_alias("r"))
+            self.assertIsNone(destination_resolver.from_alias("rr"))
+
+        models.Alias.objects.create(name="rr", destination_id=reddit.id)
+        destination_resolver.compile_alias_index()
+        self.assertEqual((reddit, False), destination_resolver.resolve("rr", "ddg"))
+
+    def test_compile_once_per_transaction(self) -> None:
+        """Test that the alias index is recompiled once per transaction, and failures don't fail the write."""
+        destination_resolver = resolver.DestinationResolver(16, alias_index_path=self.path)
+        with mock.patch.object(resolver, "resolver", destination_resolver), mock.patch.object(
+            resolver.ResolverSnapshot, "compile_alias_index", autospec=True
+        ) as compile_alias_index:
+            with self.captureOnCommitCallbacks(execute=True):
+                reddit = models.Destination.objects.create_with_aliases(
+                    "https://www.reddit.com/r/{}", "Reddit", [f"r{index}" for index in range(21)]
+                )
+            self.assertEqual(1, compile_alias_index.call_count)
+
+            # Callbacks aren't cleared since the test transaction never commits
+            connection.run_on_commit.clear()
+            with self.captureOnCommitCallbacks(execute=True):
+                models.Destination.objects.update_aliases(reddit, remove=[f"r{index}" for index in range(20)])
+            self.assertEqual(2, compile_alias_index.call_count)
+
+            connection.run_on_commit.clear()
+            compile_alias_index.side_effect = FileNotFoundError
+            with self.captureOnCommitCallbacks(execute=True):
+                models.Alias.objects.create(name="reddit", destination=reddit)
+            self.assertEqual(3, compile_alias_index.call_count)
@@ -0,0 +1,673 @@
+## MIT License
+##
+## Copyright (c) 2021 conveen
+##
+## Permission is hereby granted, free of charge, to any person obtaining a copy
+## of this software and associated documentation files (the "Software"), to deal
+## in the Software without restriction, including without limitation the rights
+## to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+## copies of the Software, and to permit persons to whom the Software is
+## furnished to do so, subject to the following conditions:
+##
+## The above copyright notice and this permission notice shall be included in all
+## copies or substantial portions of the Software.
+##
+## THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+## IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+## FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+## AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+## LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+## OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+## SOFTWARE.
+
+import typing
+import unittest
+from unittest import mock
+
+import django.test as django_unittest
+from django.test.utils import CaptureQueriesContext
+from django.core.management import call_command
+from django.db import connection, OperationalError, transaction
+
+from hare.core import aggregates, models, resolver
+from hare.core.tests_utils import run_test_units, TestUnit
+
+
+class TestDestinationManagerUtils(unittest.TestCase):
+    """Tests for DestinationManager util functions
+    models_utils.validate_netloc_url and models_utils.gen_num_args_from_url.
+    """
+
+    def test_models_utils_validate_netloc_url(self) -> None:
+        """Tests for ``models_utils.validate_netloc_url``.
+        See: ``hare.core.models.models_utils.validate_netloc_url`` for valid URL requirements.
+        """
+        tests = [
+            TestUnit(
+                "not_url",
+                ValueError,
+                models.models_utils.validate_netloc_url,
+                "This is not a URL",
+                assertion="assertRaises",
+            ),
+            TestUnit(
+                "unc_path",
+                ValueError,
+                models.models_utils.validate_netloc_url,
+                "\\\\fileshare02\\share_name",
+                assertion="assertRaises",
+            ),
+            TestUnit(
+                "domain_without_preceding_slashes",
+                ValueError,
+                models.models_utils.validate_netloc_url,
+                "www.python.org",
+                assertion="assertRaises",
+            ),
+            TestUnit(
+                "invalid_url_without_preceding_slashes",
+                ValueError,
+                models.models_utils.validate_netloc_url,
+                "www.python.org/downloads/",
+                assertion="assertRaises",
+            ),
+            TestUnit(
+                "invalid_url_without_domain",
+                ValueError,
+                models.models_utils.validate_netloc_url,
+                "/downloads/python3.6.9",
+                assertion="assertRaises",
+            ),
+            TestUnit(
+                "invalid_url_with_ip_address_without_preceding_slashes",
+                ValueError,
+                models.models_utils.validate_netloc_url,
+                "172.84.99.127:8080/g",
+                assertion="assertRaises",
+            ),
+            TestUnit(
+                "amazon_arn",
+                ValueError,
+                models.models_utils.validate_netloc_url,
+                "arn:aws:iam::123456789012:user/username@domain.com",
+                assertion="assertRaises",
+            ),
+            TestUnit(
+                "valid_url_without_scheme",
+                "http://www.python.org/downloads",
+                models.models_utils.validate_netloc_url("//www.python.org/downloads"),
+            ),
+            TestUnit(
+                "valid_url_without_scheme_with_argument",
+                "http://www.python.org/downloads/{}",
+                models.models_utils.validate_netloc_url("//www.python.org/downloads/{}"),
+            ),
+            TestUnit(
+                "valid_url_without_scheme_with_arguments",
+                "http://www.python.org/downloads/{}/{}",
+                models.models_utils.validate_netloc_url("//www.python.org/downloads/{}/{}"),
+            ),
+            TestUnit(
+                "valid_url_with_scheme",
+                "https://www.virustotal.com/gui/",
+                models.models_utils.validate_netloc_url("https://www.virustotal.com/gui/"),
+            ),
+            TestUnit(
+                "valid_url_with_scheme_with_argument",
+                "https://www.virustotal.com/gui/ip-address/{}/detection",
+                models.models_utils.validate_netloc_url("https://www.virustotal.com/gui/ip-address/{}/detection"),
+            ),
+            TestUnit(
+                "valid_url_with_scheme_with_arguments",
+                "https://www.virustotal.com/gui/ip-address/{}/{}",
+                models.models_utils.validate_netloc_url("https://www.virustotal.com/gui/ip-address/{}/{}"),
+            ),
+        ]
+
+        run_test_units(self, tests)
+
+    def test_models_utils_compile_url_template(self) -> None:
+        """Test that ``models_utils.compile_url_template`` splits format strings into literal segments
+        and that ``models_utils.render_url_template`` renders them like ``str.format``.
+        """
+        tests = [
+            ("no_arguments", "https://time.is/", ["https://time.is/"]),
+            ("single_argument", "https://www.reddit.com/r/{}", ["https://www.reddit.com/r/", ""]),
+            (
+                "two_arguments",
+                "https://www.worldtimebuddy.com/{}-to-{}-converter",
+                ["https://www.worldtimebuddy.com/", "-to-", "-converter"],
+            ),
+            ("adjacent_arguments", "https://time.is/{}{}", ["https://time.is/", "", ""]),
+            ("escaped_braces", "https://example.com/{{x}}?q={}", ["https://example.com/{x}?q=", ""]),
+        ]
+        for name, url, segments in tests:
+            with self.subTest(test_name=name):
+                self.assertEqual(segments, models.models_utils.compile_url_template(url))
+                arguments = [f"arg{index}" for index in range(len(segments) - 1)]
+                self.assertEqual(
+                    url.format(*arguments),
+                    models.models_utils.render_url_template(segments, arguments),
+                )
+
+        for name, url in (("conversion", "https://example.com/?q={!r}"), ("format_spec", "https://example.com/{:>4}")):
+            with self.subTest(test_name=name):
+                self.assertRaises(ValueError, models.models_utils.compile_url_template, url)
+
+        self.assertRaises(ValueError, models.models_utils.render_url_template, ["https://time.is/", ""], [])
+
+    def test_models_utils_gen_num_args_from_url(self) -> None:
+        """Test that ``models_utils.gen_num_args_from_url`` parses the correct
+        number of *positional* arguments from format strings.
+
+        Technically ``models_utils.gen_num_args_from_url`` can parse non-URL strings,
+        but it is only used after a call to ``models_utils.validate_netloc_url``
+        and thus only URL data are tested here.
+        """
+        tests = [
+            TestUnit(
+                "no_arguments_with_scheme",
+                0,
+                models.models_utils.gen_num_args_from_url("https//en.wikipedia.org/w/index.php"),
+            ),
+            TestUnit(
+                "no_arguments_without_scheme",
+                0,
+                models.models_utils.gen_num_args_from_url("//en.wikipedia.org/w/index.php"),
+            ),
+            TestUnit(
+                "single_positional_argument_in_path_with_scheme",
+                1,
+                models.models_utils.gen_num_args_from_url("https://www.reddit.com/r/{}"),
+            ),
+            TestUnit(
+                "single_positional_argument_in_path_without_scheme",
+                1,
+                models.models_utils.gen_num_args_from_url("//www.reddit.com/r/{}"),
+            ),
+            TestUnit(
+                "single_positional_argument_in_query_with_scheme",
+                1,
+                models.models_utils.gen_num_args_from_url("https://www.shodan.io/search?query={}"),
+            ),
+            TestUnit(
+                "single_positional_argument_in_query_without_scheme",
+                1,
+                models.models_utils.gen_num_args_from_url("//www.shodan.io/search?query={}"),
+            ),
+            TestUnit(
+                "two_positional_arguments_in_path",
+                2,
+                models.models_utils.gen_num_args_from_url("https://www.worldtimebuddy.com/{}-to-{}-converter"),
+            ),
+            TestUnit(
+                "ten_positional_arguments_in_path_and_query",
+                10,
+                models.models_utils.gen_num_args_from_url("https://time.is/{}#{}?query={}{}{}{}{}{}{}{}"),
+            ),
+            TestUnit(
+                "conversion_and_format_specification",
+                2,
+                models.models_utils.gen_num_args_from_url("https://time.is/{!r}/{:>10}"),
+            ),
+            TestUnit(
+                "single_keyword_argument",
+                ValueError,
+                models.models_utils.gen_num_args_from_url,
+                "https://en.wikipedia.org/w/index.php?search={search}",
+                assertion="assertRaises",
+            ),
+            TestUnit(
+                "two_keyword_arguments",
+                ValueError,
+                models.models_utils.gen_num_args_from_url,
+                "https://en.wikipedia.org/w/index.php?search={search}&title={title}",
+                assertion="assertRaises",
+            ),
+            TestUnit(
+                "single_keyword_argument_one_positional",
+                ValueError,
+                models.models_utils.gen_num_args_from_url,
+                "https://en.wikipedia.org/w/index.php?search={search}&title={}",
+                assertion="assertRaises",
+            ),
+        ]
+
+        run_test_units(self, tests)
+
+
+class TestDestinationManager(django_unittest.TestCase):
+    """Tests for the database API implemented in ``DestinationManager``."""
+
+    def setUp(self) -> None:
+        self.destinations: typing.Dict[str, models.Destination] = {}
+
+        for url, description, aliases, is_fallback, is_default_fallback in (
+            ("https://www.reddit.com/r/{}", "Reddit", ["r", "reddit"], False, False),
+            ("https://en.wikipedia.org/w/index.php?search={}", "Wikipedia", ["wp", "wikipedia"], False, False),
+            ("https://google.com/search/?q={}", "Google", ["g", "google"], True, False),
+            ("https://duckduckgo.com/?q={}", "DuckDuckGo", ["ddg", "duckduckgo"], True, True),
+        ):
+            destination = models.Destination.objects.create(
+                url=url,
+                num_args=1,
+                description=description,
+                is_fallback=is_fallback,
+                is_default_fallback=is_default_fallback,
+            )
+            models.Alias.objects.bulk_create([models.Alias(name=name, destination=destination) for name in aliases])
+            self.destinations[description] = destination
+
+    def test_clear_default_fallbacks(self) -> None:
+        """Test that ``DestinationManager.clear_default_fallbacks``
+        removes existing default fallback destinations.
+        """
+        models.Destination.objects.clear_default_fallbacks()
+        self.assertEqual(
+            0,
+            len(models.Destination.objects.filter(is_default_fallback=True).all()),
+        )
+
+        # Set all destinations as default fallbacks then clear them all
+        models.Destination.objects.update(is_default_fallback=True)
+        models.Destination.objects.clear_default_fallbacks()
+        self.assertEqual(
+            0,
+            len(models.Destination.objects.filter(is_default_fallback=True).all()),
+        )
+
+    def test_create_with_aliases_no_aliases(self) -> None:
+        """Test that ``DestinationManager.create_with_aliases`` raises a
+        ``ValueError`` when no aliases are provided.
+        """
+        aliases_list: typing.Tuple[typing.List[str], ...] = ([], [""], ["", ""], ["", "", ""])
+        tests = [
+            TestUnit(
+                f"{len(aliases)}_empty_aliases",
+                ValueError,
+                models.Destination.objects.create_with_aliases,
+                "https://www.youtube.com/results?search_query={}",
+                "Youtube",
+                aliases,
+                False,
+                False,
+                assertion="assertRaises",
+            )
+            for aliases in aliases_list
+        ]
+        run_test_units(self, tests)
+
+    def test_create_with_aliases_duplicate_aliases(self) -> None:
+        """Test that ``DestinationManager.create_with_aliases`` dedupes
+        aliases before insertion into the database.
+        """
+        youtube = models.Destination.objects.create_with_aliases(
+            "https://www.youtube.com/results?search_query={}",
+            "Youtube",
+            ["youtube", "youtube"],
+            False,
+            False,
+        )
+        aliases = {alias.name for alias in youtube.aliases.all()}
+        self.assertEqual({"youtube"}, aliases)
+
+        kaggle = models.Destination.objects.create_with_aliases(
+            "https://www.kaggle.com/search?q={}",
+            "Kaggle",
+            ["kgl", "kaggle", "kgl"],
+            False,
+            False,
+        )
+        aliases = {alias.name for alias in kaggle.aliases.all()}
+        self.assertEqual({"kgl", "kaggle"}, aliases)
+
+    def test_create_with_aliases_default_fallback_set_is_fallback(self) -> None:
+        """Test that ``DestinationManager.create_with_aliases`` sets ``is_fallback``
+        to ``True`` if ``is_default_fallback`` is ``True``.
+        """
+        destination = models.Destination.objects.create_with_aliases(
+            "https://scholar.google.com/scholar?q={}",
+            "Google Scholar",
+            ["gs", "scholar", "googlescholar"],
+            False,
+            True,
+        )
+        self.assertTrue(destination.is_fallback)
+
+    def test_create_with_aliases_default_fallback_invalid_arguments(self) -> None:
+        """Test that ``DestinationManager.create_with_aliases`` raises a
+        ValueError and retains the existing default fallback if the new destination
+        is a default fallback and the number of arguments isn't exactly one.
+        """
+        self.assertRaises(
+            ValueError,
+            models.Destination.objects.create_with_aliases,
+            "https://www.kaggle.com/search",
+            "Kaggle",
+            ["kgl", "kaggle"],
+            True,
+            True,
+        )
+        self.assertEqual(self.destinations["DuckDuckGo"], models.Destination.objects.default_fallback())
+
+    def test_create_with_aliases(self) -> None:
+        """Test that ``DestinationManager.create_with_aliases`` creates
+        a destination with the provided aliases if all conditions are met.
+        """
+        url = "https://search.yahoo.com/search?p={}"
+        description = "Yahoo Search"
+        aliases = ["yh", "yahoo"]
+        destination = models.Destination.objects.create_with_aliases(url, description, aliases, True, False)
+        self.assertEqual(url, destination.url)
+        self.assertEqual(description, destination.description)
+        self.assertEqual(set(aliases), {alias.name for alias in destination.aliases.all()})
+        self.assertTrue(destination.is_fallback)
+        self.assertFalse(destination.is_default_fallback)
+
+    def test_create_many_with_aliases(self) -> None:
+        """Test that ``DestinationManager.create_many_with_aliases`` creates valid shortcuts
+        and returns an error for each invalid or colliding one.
+        """
+        results = models.Destination.objects.create_many_with_aliases(
+            [
+                models.NewShortcut("https://www.python.org", "Python", ["py", "python"]),
+                models.NewShortcut("https://github.com", "GitHub", ["gh", "r"]),
+                models.NewShortcut("https://www.reddit.com/r/{}", "Reddit", ["subreddit"]),
+                models.NewShortcut("https://pypi.org", "PyPI", ["pypi", "py"]),
+                models.NewShortcut("https://pypi.org/search/?q={}", "PyPI", ["pip"], True, True),
+                models.NewShortcut("https://github.com/search?q={}", "GitHub", ["ghs"], True, True),
+                models.NewShortcut("https://docs.python.org", "Python Docs", []),
+            ]
+        )
+
+        self.assertEqual(
+            [True, False, False, False, True, False, False],
+            [isinstance(result, models.Destination) for result in results],
+        )
+        self.assertEqual("Python", models.Destination.objects.from_alias("py").description)  # type: ignore
+        self.assertEqual(results[4], models.Destination.objects.default_fallback())
+        self.assertEqual(["https://pypi.org/search/?q=", ""], results[4].url_segments)  # type: ignore
+        self.assertFalse(models.Alias.objects.filter(name__in=["gh", "subreddit", "pypi", "ghs"]).exists())
+
+    def test_create_many_with_aliases_num_queries(self) -> None:
+        """Test that ``DestinationManager.create_many_with_aliases`` doesn't query per shortcut."""
+        num_queries = []
+        for size in (2, 20):
+            shortcuts = [
+                models.NewShortcut(f"https://example.com/{size}/{index}", "Example", [f"ex{size}-{index}"])
+                for index in range(size)
+            ]
+            with CaptureQueriesContext(connection) as queries:
+                models.Destination.objects.create_many_with_aliases(shortcuts)
+            num_queries.append(len(queries))
+
+        self.assertEqual(num_queries[0], num_queries[1])
+
+    def test_update_aliases_num_queries(self) -> None:
+        """Test that ``DestinationManager.update_aliases`` doesn't query per alias removed."""
+        for size in (5, 50):
+            destination = models.Destination.objects.create_with_aliases(
+                f"https://example.com/{size}", "Example", [f"ex{size}-{index}" for index in range(size + 1)]
+            )
+            # Select, collect and delete, and the receivers of the single shortcuts_changed signal
+            with self.assertNumQueries(11):
+                models.Destination.objects.update_aliases(
+                    destination, remove=[f"ex{size}-{index}" for index in range(size)]
+                )
+            self.assertEqual([f"ex{size}-{size}"], list(destination.aliases.values_list("name", flat=True)))
+
+    def test_save_compiles_url(self) -> None:
+        """Test that saving a destination compiles ``url`` into ``url_segments`` and ``num_args``."""
+        destination = self.destinations["Reddit"]
+        self.assertEqual(["https://www.reddit.com/r/", ""], destination.url_segments)
+
+        destination.url = "https://www.reddit.com/r/{}/search?q={}"
+        destination.save()
+        destination.refresh_from_db()
+        self.assertEqual(["https://www.reddit.com/r/", "/search?q=", ""], destination.url_segments)
+        self.assertEqual(2, destination.num_args)
+        self.assertEqual(
+            "https://www.reddit.com/r/python/search?q=django", destination.render_url(["python", "django"])
+        )
+
+    def test_save_uncompiled_url(self) -> None:
+        """Test that URLs with conversions or format specifications are saved uncompiled and rendered with
+        ``str.format``, so that shortcuts created before URLs were compiled can still be saved.
+        """
+        destination = self.destinations["Reddit"]
+        destination.url = "https://www.reddit.com/r/{!s}/search?q={:>8}"
+        destination.save()
+        destination.refresh_from_db()
+        self.assertEqual(([], 2), (destination.url_segments, destination.num_args))
+        self.assertEqual(
+            "https://www.reddit.com/r/python/search?q=  django", destination.render_url(["python", "django"])
+        )
+        self.assertRaises(ValueError, destination.render_url, ["python"])
+
+        record = resolver.ResolvedDestination.from_destination(destination)
+        self.assertEqual(destination.render_url(["python", "django"]), record.render_url(["python", "django"]))
+
+    def test_default_fallback_single_destination(self) -> None:
+        """Test that ``DestinationManager.default_fallback`` returns the
+        correct destination when there's only one default fallback.
+        """
+        self.assertEqual(self.destinations["DuckDuckGo"], models.Destination.objects.default_fallback())
+
+    def test_default_fallback_multiple_destinations(self) -> None:
+        """Test that ``DestinationManager.default_fallback`` returns the
+        destination with the lowest ``id`` when there are multiple default fallbacks.
+        """
+        bing = models.Destination.objects.create(
+            url="https://www.bing.com/search?q={}",
+            num_args=1,
+            description="Bing",
+            is_fallback=True,
+            is_default_fallback=True,
+        )
+        models.Alias.objects.create(name="bing", destination=bing)
+
+        self.assertEqual(self.destinations["DuckDuckGo"], models.Destination.objects.default_fallback())
+
+        self.destinations["DuckDuckGo"].is_default_fallback = False
+        self.destinations["DuckDuckGo"].save()
+        self.assertEqual(bing, models.Destination.objects.default_fallback())
+
+    def test_default_fallback_not_exist(self) -> None:
+        """Test that ``DestinationManager.default_fallback`` raises
+        ``Destination.DoesNotExist`` error when there are no default fallbacks.
+        """
+        self.destinations["DuckDuckGo"].is_default_fallback = False
+        self.destinations["DuckDuckGo"].save()
+        self.assertRaises(models.Destination.DoesNotExist, models.Destination.objects.default_fallback)
+
+    def test_from_alias_correct_destination(self) -> None:
+        """Test that ``DestinationManager.from_alias`` returns the correct
+        destination by alias.
+        """
+        for description, alias in (("Reddit", "r"), ("Wikipedia", "wp"), ("Google", "g"), ("DuckDuckGo", "ddg")):
+            self.assertEqual(self.destinations[description], models.Destination.objects.from_alias(alias))
+
+    def test_resolve(self) -> None:
+        """Test that ``DestinationManager.resolve`` ranks the alias, then the fallback alias,
+        then the default fallback, using a single query.
+        """
+        tests = [
+            ("alias", ("r", "g"), "Reddit", False),
+            ("alias_without_fallback", ("wp", None), "Wikipedia", False),
+            ("fallback_alias", ("ddd", "g"), "Google", True),
+            ("invalid_fallback_alias", ("ddd", "ggg"), "DuckDuckGo", True),
+            ("default_fallback", ("ddd", None), "DuckDuckGo", True),
+            ("no_alias", (None, None), "DuckDuckGo", True),
+            ("default_fallback_alias", ("ddg", "g"), "DuckDuckGo", False),
+        ]
+        for name, args, description, as_fallback in tests:
+            with self.subTest(test_name=name), self.assertNumQueries(1):
+                self.assertEqual(
+                    (self.destinations[description], as_fallback),
+                    models.Destination.objects.resolve(*args),
+                )
+
+    def test_resolve_no_default_fallback(self) -> None:
+        """Test that ``DestinationManager.resolve`` raises ``Destination.DoesNotExist``
+        when nothing resolves and there are no default fallbacks.
+        """
+        models.Destination.objects.clear_default_fallbacks()
+        self.assertEqual((self.destinations["Reddit"], False), models.Destination.objects.resolve("r"))
+        self.assertRaises(models.Destination.DoesNotExist, models.Destination.objects.resolve, "ddd", "ggg")
+
+    def test_from_alias_invalid_alias(self) -> None:
+        """Test that ``DestinationManager.from_alias`` returns ``None`` for nonexistent aliases."""
+        self.assertIsNone(models.Destination.objects.from_alias("ddd"))
+
+        # Remove existing Destination then try to retrieve by alias
+        # Requires ON DELETE CASCADE to be enabled for aliases
+        models.Destination.objects.filter(id=self.destinations["Reddit"].id).delete()
+        self.assertIsNone(models.Destination.objects.from_alias("r"))
+
+
+class TestShortcutsVersion(django_unittest.TestCase):
+    """Tests for ``models.ShortcutsVersion`` and resolving from a versioned snapshot."""
+
+    def setUp(self) -> None:
+        self.reddit = models.Destination.objects.create_with_aliases(
+            "https://www.reddit.com/r/{}", "Reddit", ["r", "reddit"]
+        )
+
+    def test_bump_on_write(self) -> None:
+        """Test that every transaction writing to the shortcut tables bumps the version."""
+        version = models.ShortcutsVersion.objects.current()
+        models.Destination.objects.create_with_aliases("https://www.python.org", "Python", ["py"])
+        self.assertGreater(models.ShortcutsVersion.objects.current(), version)
+
+        # Each write is made in its own savepoint, since the test case runs in a single transaction
+        version = models.ShortcutsVersion.objects.current()
+        with transaction.atomic():
+            models.Alias.objects.create(name="subreddit", destination=self.reddit)
+        self.assertGreater(models.ShortcutsVersion.objects.current(), version)
+
+        version = models.ShortcutsVersion.objects.current()
+        with transaction.atomic():
+            self.reddit.delete()
+        self.assertGreater(models.ShortcutsVersion.objects.current(), version)
+
+    def test_cascade_delete_recorded_once(self) -> None:
+        """Test that deleting a destination with many aliases bumps the version and records the change once."""
+        models.Alias.objects.bulk_create(
+            [models.Alias(name=f"r{index}", destination=self.reddit) for index in range(5)]
+        )
+        reddit_id = self.reddit.id
+        version = models.ShortcutsVersion.objects.current()
+
+        with transaction.atomic():
+            self.reddit.delete()
+        self.assertEqual(version + 1, models.ShortcutsVersion.objects.current())
+        self.assertEqual(
+            [(version + 1, reddit_id)],
+            list(models.ShortcutChange.objects.filter(version__gt=version).values_list("version", "destination_id")),
+        )
+
+    def test_prune_changes(self) -> None:
+        """Test that all but the last versions are pruned, and that pruned versions can't be synced since."""
+        for index in range(3):
+            models.Destination.objects.create_with_aliases(f"https://example.com/{index}", "Example", [f"e{index}"])
+        version = models.ShortcutsVersion.objects.current()
+        self.assertEqual(0, models.ShortcutChange.objects.oldest_version(version))
+
+        call_command("prune_shortcut_changes", "--keep-versions", "1")
+        self.assertEqual(version - 1, models.ShortcutChange.objects.oldest_version(version))
+        self.assertEqual({version}, set(models.ShortcutChange.objects.values_list("version", flat=True)))
+
+        call_command("prune_shortcut_changes", "--keep-versions", "0")
+        self.assertEqual(version, models.ShortcutChange.objects.oldest_version(version))
+
+    def test_bump_rolled_back(self) -> None:
+        """Test that the version isn't bumped by a write that is rolled back."""
+        version = models.ShortcutsVersion.objects.current()
+        with self.assertRaises(ValueError):
+            models.Destination.objects.create_with_aliases("https://www.python.org", "Python", ["py"], True)
+        self.assertEqual(version, models.ShortcutsVersion.objects.current())
+
+    def test_resolve_versioned_snapshot(self) -> None:
+        """Test that the resolver only reloads the snapshot when the version changes."""
+        destination_resolver = resolver.DestinationResolver(16, version_poll_interval=0)
+        with self.assertNumQueries(3):
+            self.assertEqual(self.reddit.id, destination_resolver.resolve("r")[0].id)
+        # Only the version is read (once per lookup with a zero interval) while it's unchanged
+        with self.assertNumQueries(2):
+            self.assertEqual(self.reddit.id, destination_resolver.resolve("reddit")[0].id)
+            self.assertIsNone(destination_resolver.from_alias("py"))
+
+        # Writes are picked up by the next poll, without invalidating this resolver (like on another node)
+        python = models.Destination.objects.create_with_aliases("https://www.python.org", "Python", ["py"])
+        self.assertEqual(python.id, destination_resolver.from_alias("py").id)  # type: ignore
+
+    def test_resolve_versioned_snapshot_poll_interval(self) -> None:
+        """Test that the version is polled at most once per interval."""
+        destination_resolver = resolver.DestinationResolver(16, version_poll_interval=60)
+        destination_resolver.resolve("r")
+        with self.assertNumQueries(0):
+            self.assertEqual(self.reddit.id, destination_resolver.resolve("r")[0].id)
+            self.assertRaises(models.Destination.DoesNotExist, destination_resolver.resolve, "py")
+
+    def test_resolve_versioned_snapshot_database_error(self) -> None:
+        """Test that the current snapshot is served while the version can't be read."""
+        destination_resolver = resolver.DestinationResolver(16, version_poll_interval=0)
+        with mock.patch.object(models.ShortcutsVersionManager, "current", side_effect=OperationalError("down")):
+            self.assertRaises(OperationalError, destination_resolver.resolve, "r")
+
+        destination_resolver.resolve("r")
+        with mock.patch.object(models.ShortcutsVersionManager, "current", side_effect=OperationalError("down")):
+            with self.assertLogs("hare.core.resolver", "WARNING"):
+                self.assertEqual(self.reddit.id, destination_resolver.resolve("r")[0].id)
+
+
+class TestAggregates(django_unittest.TestCase):
+    """Tests for aggregating aliases per destination with ``aggregates``."""
+
+    def setUp(self) -> None:
+        self.reddit = models.Destination.objects.create_with_aliases(
+            "https://www.reddit.com/r/{}", "Reddit", ["reddit", "r", "subreddit"]
+        )
+        self.python = models.Destination.objects.create_with_aliases("https://www.python.org", "Python", ["py"])
+        # Destination without aliases
+        models.Destination.objects.create(url="https://www.example.com", description="Example")
+
+    def test_iter_values_with_aliases(self) -> None:
+        """Test that each destination is fetched as one row with its sorted aliases, in a single query."""
+        with CaptureQueriesContext(connection) as queries:
+            rows = list(
+                aggregates.iter_values_with_aliases(models.Destination.objects.order_by("id"), ("description",))
+            )
+        tests = [
+            TestUnit("reddit", ("Reddit", ["r", "reddit", "subreddit"]), rows[0]),
+            TestUnit("python", ("Python", ["py"]), rows[1]),
+            TestUnit("no_aliases", ("Example", []), rows[2]),
+            TestUnit("num_queries", 1, len(queries)),
+        ]
+        run_test_units(self, tests)
+
+    def test_iter_values_with_aliases_slice(self) -> None:
+        """Test that only the destinations in the slice are fetched."""
+        rows = list(
+            aggregates.iter_values_with_aliases(models.Destination.objects.order_by("description"), ("url",), 1, 2)
+        )
+        self.assertEqual([("https://www.python.org", ["py"])], rows)
+
+    def test_iter_values_with_aliases_fallback(self) -> None:
+        """Test that aliases are fetched with one query per chunk where aggregation isn't supported."""
+        with mock.patch.object(aggregates, "supports_alias_names", return_value=False):
+            with CaptureQueriesContext(connection) as queries:
+                rows = list(
+                    aggregates.iter_values_with_aliases(
+                        models.Destination.objects.order_by("id"), ("description",), chunk_size=2
+                    )
+                )
+        tests = [
+            TestUnit(
+                "rows",
+                [("Reddit", ["r", "reddit", "subreddit"]), ("Python", ["py"]), ("Example", [])],
+                rows,
+            ),
+            TestUnit("num_queries", 3, len(queries)),
+        ]
+        run_test_units(self, tests)
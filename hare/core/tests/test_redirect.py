@@ -0,0 +1,172 @@
+## MIT License
+##
+## Copyright (c) 2021 conveen
+##
+## Permission is hereby granted, free of charge, to any person obtaining a copy
+## of this software and associated documentation files (the "Software"), to deal
+## in the Software without restriction, including without limitation the rights
+## to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+## copies of the Software, and to permit persons to whom the Software is
+## furnished to do so, subject to the following conditions:
+##
+## The above copyright notice and this permission notice shall be included in all
+## copies or substantial portions of the Software.
+##
+## THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+## IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+## FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+## AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+## LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+## OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+## SOFTWARE.
+
+import typing
+
+from asgiref.sync import async_to_sync
+import django.test as django_unittest
+
+from hare.core import asgi, models, redirect, resolver, wsgi
+from hare.core.tests_utils import run_background_tasks_inline, run_test_units, TestUnit
+
+
+class TestRedirect(django_unittest.TestCase):
+    """Tests for redirect resolution in ``redirect.gen_redirect_url``, ``wsgi.RedirectApplication``,
+    and ``asgi.RedirectApplication``.
+    """
+
+    def setUp(self) -> None:
+        run_background_tasks_inline(self)
+        resolver.resolver.invalidate()
+        for url, description, aliases, is_fallback, is_default_fallback in (
+            ("https://time.is/", "Time", ["time"], False, False),
+            ("https://www.reddit.com/r/{}", "Reddit", ["r"], False, False),
+            ("https://www.worldtimebuddy.com/{}-to-{}-converter", "Time Zones", ["tz"], False, False),
+            ("https://google.com/search/?q={}", "Google", ["g"], True, False),
+            ("https://duckduckgo.com/?q={}", "DuckDuckGo", ["ddg"], True, True),
+        ):
+            models.Destination.objects.create_with_aliases(url, description, aliases, is_fallback, is_default_fallback)
+
+    def test_gen_redirect_url(self) -> None:
+        """Test that ``redirect.gen_redirect_url`` resolves aliases and applies arguments."""
+        tests = [
+            TestUnit("no_arguments", "https://time.is/", redirect.gen_redirect_url("time")),
+            TestUnit("ignored_arguments", "https://time.is/", redirect.gen_redirect_url("time utc now")),
+            TestUnit("single_argument", "https://www.reddit.com/r/python", redirect.gen_redirect_url("r python")),
+            TestUnit(
+                "merged_arguments",
+                "https://www.worldtimebuddy.com/est-to-pacific+time-converter",
+                redirect.gen_redirect_url("tz  est pacific time"),
+            ),
+            TestUnit(
+                "fallback_alias", "https://google.com/search/?q=rr+python", redirect.gen_redirect_url("rr python", "g")
+            ),
+            TestUnit("default_fallback", "https://duckduckgo.com/?q=rr+python", redirect.gen_redirect_url("rr python")),
+            TestUnit("empty_query", "https://duckduckgo.com/?q=", redirect.gen_redirect_url("  ")),
+            TestUnit("list", "/list/", redirect.gen_redirect_url("list")),
+            TestUnit("too_few_arguments", ValueError, redirect.gen_redirect_url, "tz est", assertion="assertRaises"),
+        ]
+        run_test_units(self, tests)
+
+    def test_redirect_application(self) -> None:
+        """Test that ``wsgi.RedirectApplication`` answers redirect requests and passes everything else through."""
+        passed_through = []
+
+        def application(environ, start_response):
+            passed_through.append(environ["PATH_INFO"])
+            start_response("200 OK", [])
+            return [b"django"]
+
+        def start_response(status, headers):
+            responses.append((status, dict(headers)))
+
+        redirect_application = wsgi.RedirectApplication(application)
+        tests = [
+            ("/", "query=r+python", "302 Found", "https://www.reddit.com/r/python"),
+            ("/", "fallback=g&query=rr%20python", "302 Found", "https://google.com/search/?q=rr+python"),
+            ("/", "query=tz+est", "400 Bad Request", None),
+            ("/", "", "200 OK", None),
+            ("/list/", "query=r+python", "200 OK", None),
+        ]
+        for path, query_string, status, location in tests:
+            responses: typing.List[typing.Tuple[str, typing.Dict[str, str]]] = []
+            with self.subTest(test_name=f"{path}?{query_string}"):
+                redirect_application(
+                    {"PATH_INFO": path, "QUERY_STRING": query_string, "REQUEST_METHOD": "GET"},
+                    start_response,
+                )
+                self.assertEqual(status, responses[0][0])
+                self.assertEqual(location, responses[0][1].get("Location"))
+
+        self.assertEqual(["/", "/list/"], passed_through)
+
+    def test_redirect_application_suggestions(self) -> None:
+        """Test that ``wsgi.RedirectApplication`` passes redirects to a fallback destination through to Django
+        when alias suggestions are enabled, so Django can suggest similar aliases.
+        """
+        passed_through = []
+
+        def application(environ, start_response):
+            passed_through.append(environ["QUERY_STRING"])
+            start_response("200 OK", [])
+            return [b"django"]
+
+        def start_response(status, headers):
+            responses.append((status, dict(headers)))
+
+        redirect_application = wsgi.RedirectApplication(application)
+        with self.settings(ALIAS_SUGGESTION_DISTANCE=2):
+            for query_string, status in (("query=r+python", "302 Found"), ("query=rr+python", "200 OK")):
+                responses: typing.List[typing.Tuple[str, typing.Dict[str, str]]] = []
+                with self.subTest(query_string=query_string):
+                    redirect_application(
+                        {"PATH_INFO": "/", "QUERY_STRING": query_string, "REQUEST_METHOD": "GET"}, start_response
+                    )
+                    self.assertEqual(status, responses[0][0])
+
+        self.assertEqual(["query=rr+python"], passed_through)
+
+    def test_asgi_redirect_application(self) -> None:
+        """Test that ``asgi.RedirectApplication`` answers redirects resolved from memory on the event loop,
+        and passes everything else through.
+        """
+        passed_through = []
+
+        async def application(scope, _receive, send):
+            passed_through.append(f"{scope['path']}?{scope['query_string'].decode()}")
+            await send({"type": "http.response.start", "status": 200, "headers": []})
+            await send({"type": "http.response.body", "body": b"django"})
+
+        async def receive():
+            return {"type": "http.request", "body": b""}
+
+        redirect_application = asgi.RedirectApplication(application)
+
+        def request(path: str, query_string: str) -> typing.Tuple[int, typing.Optional[bytes]]:
+            messages: typing.List[typing.Dict[str, typing.Any]] = []
+
+            async def send(message):
+                messages.append(message)
+
+            scope = {"type": "http", "method": "GET", "path": path, "query_string": query_string.encode()}
+            async_to_sync(redirect_application)(scope, receive, send)
+            return (messages[0]["status"], dict(messages[0]["headers"]).get(b"location"))
+
+        # Not cached yet, so resolved by Django
+        self.assertEqual((200, None), request("/", "query=r+python"))
+        resolver.resolver.resolve("r")
+        resolver.resolver.resolve("rr", "g")
+        with self.assertNumQueries(0):
+            tests = [
+                TestUnit("cached", (302, b"https://www.reddit.com/r/python"), request("/", "query=r+python")),
+                TestUnit(
+                    "fallback",
+                    (302, b"https://google.com/search/?q=rr+python"),
+                    request("/", "fallback=g&query=rr+python"),
+                ),
+                TestUnit("too_few_arguments", (400, None), request("/", "query=r")),
+                TestUnit("list", (302, b"/list/"), request("/", "query=list")),
+                TestUnit("no_query", (200, None), request("/", "")),
+                TestUnit("other_path", (200, None), request("/list/", "query=r+python")),
+            ]
+        run_test_units(self, tests)
+        self.assertEqual(["/?query=r+python", "/?", "/list/?query=r+python"], passed_through)
@@ -0,0 +1,370 @@
+## MIT License
+##
+## Copyright (c) 2021 conveen
+##
+## Permission is hereby granted, free of charge, to any person obtaining a copy
+## of this software and associated documentation files (the "Software"), to deal
+## in the Software without restriction, including without limitation the rights
+## to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+## copies of the Software, and to permit persons to whom the Software is
+## furnished to do so, subject to the following conditions:
+##
+## The above copyright notice and this permission notice shall be included in all
+## copies or substantial portions of the Software.
+##
+## THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+## IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+## FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+## AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+## LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+## OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+## SOFTWARE.
+
+# pylint: disable=protected-access
+
+from pathlib import Path
+import tempfile
+import threading
+import time
+import typing
+import unittest
+from unittest import mock
+
+import django.test as django_unittest
+from django.db import OperationalError
+
+from hare.core import models, resolver
+from hare.core.tests_utils import run_background_tasks_inline, run_test_units, TestUnit
+
+
+class TestLRUCache(unittest.TestCase):
+    """Tests for ``resolver.LRUCache``."""
+
+    def test_evicts_least_recently_used(self) -> None:
+        """Test that the least recently used record is evicted when the cache is full."""
+        cache: resolver.LRUCache[str, int] = resolver.LRUCache(2)
+        cache.set("a", 1)
+        cache.set("b", 2)
+        # Mark "a" as most recently used so that "b" is evicted
+        self.assertEqual(1, cache.get("a"))
+        cache.set("c", 3)
+
+        self.assertEqual(2, len(cache))
+        self.assertIsNone(cache.get("b"))
+        self.assertEqual(1, cache.get("a"))
+        self.assertEqual(3, cache.get("c"))
+
+    def test_clear(self) -> None:
+        """Test that ``LRUCache.clear`` removes all records."""
+        cache: resolver.LRUCache[str, int] = resolver.LRUCache(2)
+        cache.set("a", 1)
+        cache.clear()
+        self.assertEqual(0, len(cache))
+        self.assertIsNone(cache.get("a"))
+
+
+class TestBloomFilter(unittest.TestCase):
+    """Tests for ``resolver.BloomFilter``."""
+
+    def test_no_false_negatives(self) -> None:
+        """Test that every key added to the filter is reported as present."""
+        keys = [f"alias{index}" for index in range(10000)]
+        bloom_filter = resolver.BloomFilter.from_keys(keys)
+        self.assertTrue(all(key in bloom_filter for key in keys))
+
+    def test_false_positive_rate(self) -> None:
+        """Test that the false positive rate is close to the configured error rate."""
+        bloom_filter = resolver.BloomFilter.from_keys([f"alias{index}" for index in range(10000)], 0.01)
+        false_positives = sum(f"search{index}" in bloom_filter for index in range(10000))
+        self.assertLess(false_positives, 200)
+
+    def test_empty(self) -> None:
+        """Test that an empty filter doesn't contain any keys."""
+        bloom_filter = resolver.BloomFilter.from_keys([])
+        self.assertNotIn("", bloom_filter)
+        self.assertNotIn("ddg", bloom_filter)
+
+
+class TestSingleFlight(unittest.TestCase):
+    """Tests for ``resolver.SingleFlight``."""
+
+    def run_concurrently(
+        self,
+        flights: resolver.SingleFlight,
+        function: typing.Callable[[], typing.Any],
+        num_threads: int = 5,
+    ) -> typing.List[typing.Any]:
+        """Call ``flights.do`` with the same key from multiple threads and collect the results (or exceptions)."""
+        results: typing.List[typing.Any] = []
+
+        def target() -> None:
+            try:
+                results.append(flights.do("key", function))
+            except Exception as exc:  # pylint: disable=broad-except
+                results.append(exc)
+
+        threads = [threading.Thread(target=target) for _ in range(num_threads)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join(timeout=5)
+        return results
+
+    def test_coalesce_concurrent_calls(self) -> None:
+        """Test that concurrent calls for the same key run the function once and share its result."""
+        flights = resolver.SingleFlight()
+        calls = []
+        release = threading.Event()
+
+        def function() -> int:
+            calls.append(None)
+            release.wait(timeout=5)
+            return len(calls)
+
+        # Release the leader once every other thread is (most likely) waiting on it
+        threading.Timer(0.2, release.set).start()
+        self.assertEqual([1] * 5, self.run_concurrently(flights, function))
+        self.assertEqual(1, len(calls))
+
+        # Key is released once the leader finishes
+        self.assertEqual(2, flights.do("key", function))
+
+    def test_share_exception(self) -> None:
+        """Test that an exception raised by the leader is raised in every waiting thread."""
+        flights = resolver.SingleFlight()
+        release = threading.Event()
+
+        def function() -> None:
+            release.wait(timeout=5)
+            raise ValueError("failed")
+
+        threading.Timer(0.2, release.set).start()
+        results = self.run_concurrently(flights, function)
+        self.assertEqual(5, len(results))
+        self.assertTrue(all(isinstance(result, ValueError) for result in results))
+
+
+class TestDestinationResolver(django_unittest.TestCase):
+    """Tests for the resolver cache implemented in ``resolver.DestinationResolver``."""
+
+    def setUp(self) -> None:
+        run_background_tasks_inline(self)
+        resolver.resolver.invalidate()
+        self.reddit = models.Destination.objects.create_with_aliases(
+            "https://www.reddit.com/r/{}", "Reddit", ["r", "reddit"]
+        )
+
+    def test_from_alias_cached(self) -> None:
+        """Test that repeated lookups for an alias are served without querying the database."""
+        record = resolver.resolver.from_alias("r")
+        self.assertEqual(resolver.ResolvedDestination.from_destination(self.reddit), record)
+
+        with self.assertNumQueries(0):
+            self.assertEqual(record, resolver.resolver.from_alias("r"))
+
+    def test_from_alias_invalid_alias(self) -> None:
+        """Test that nonexistent aliases resolve to ``None``."""
+        self.assertIsNone(resolver.resolver.from_alias("ddd"))
+
+    def test_resolve_cached(self) -> None:
+        """Test that ``DestinationResolver.resolve`` serves cached aliases without querying the database."""
+        ddg = models.Destination.objects.create_with_aliases(
+            "https://duckduckgo.com/?q={}", "DuckDuckGo", ["ddg"], True, True
+        )
+        ddg_record = resolver.ResolvedDestination.from_destination(ddg)
+        reddit_record = resolver.ResolvedDestination.from_destination(self.reddit)
+
+        # First lookup after invalidation also reads the shortcuts version and rebuilds the alias filter
+        with self.assertNumQueries(3):
+            self.assertEqual((ddg_record, True), resolver.resolver.resolve("ddd", "ddg"))
+        with self.assertNumQueries(1):
+            self.assertEqual((reddit_record, False), resolver.resolver.resolve("r", "ddg"))
+        with self.assertNumQueries(0):
+            self.assertEqual((reddit_record, False), resolver.resolver.resolve("r"))
+            self.assertEqual((ddg_record, False), resolver.resolver.resolve("ddg"))
+            self.assertEqual((ddg_record, True), resolver.resolver.resolve("ddd", "ddg"))
+
+    def test_resolve_search_text(self) -> None:
+        """Test that queries that don't start with an alias are resolved to the default fallback
+        without querying the database once the alias filter is built.
+        """
+        ddg = models.Destination.objects.create_with_aliases(
+            "https://duckduckgo.com/?q={}", "DuckDuckGo", ["ddg"], True, True
+        )
+        ddg_record = resolver.ResolvedDestination.from_destination(ddg)
+
+        self.assertEqual((ddg_record, True), resolver.resolver.resolve("python"))
+        with self.assertNumQueries(0):
+            for word in ("how", "to", "exit", "vim", ""):
+                self.assertEqual((ddg_record, True), resolver.resolver.resolve(word))
+            self.assertEqual((ddg_record, True), resolver.resolver.resolve("python", "ggg"))
+            self.assertIsNone(resolver.resolver.from_alias("python"))
+
+        # New aliases must be resolvable immediately
+        models.Alias.objects.create(name="python", destination=self.reddit)
+        self.assertEqual(
+            (resolver.ResolvedDestination.from_destination(self.reddit), False),
+            resolver.resolver.resolve("python"),
+        )
+
+    def test_alias_filter_rebuilt_in_background(self) -> None:
+        """Test that the alias filter is rebuilt off the request path, and every alias may exist until then."""
+        with mock.patch.object(resolver, "_run_in_background") as run_in_background:
+            with self.assertNumQueries(2):
+                resolver.resolver.resolve("r")
+            self.assertTrue(resolver.resolver._may_exist("python"))
+
+            run_in_background.call_args[0][0]()
+            self.assertFalse(resolver.resolver._may_exist("python"))
+
+    def test_alias_filter_other_process(self) -> None:
+        """Test that the alias filter is rebuilt after writes made by other processes."""
+        ddg = models.Destination.objects.create_with_aliases(
+            "https://duckduckgo.com/?q={}", "DuckDuckGo", ["ddg"], True, True
+        )
+        # Writes only invalidate the module resolver, like they would in another process
+        other_resolver = resolver.DestinationResolver(16, version_check_interval=0.0)
+        self.assertEqual(resolver.ResolvedDestination.from_destination(ddg), other_resolver.resolve("gh")[0])
+
+        github = models.Destination.objects.create_with_aliases("https://github.com/search?q={}", "GitHub", ["gh"])
+        self.assertEqual((resolver.ResolvedDestination.from_destination(github), False), other_resolver.resolve("gh"))
+
+    def test_invalidate_on_save(self) -> None:
+        """Test that saving a destination invalidates the cache."""
+        resolver.resolver.from_alias("r")
+        self.reddit.url = "https://old.reddit.com/r/{}"
+        self.reddit.save()
+        self.assertEqual("https://old.reddit.com/r/{}", resolver.resolver.from_alias("r").url)
+
+    def test_invalidate_on_delete(self) -> None:
+        """Test that deleting an alias or destination invalidates the cache."""
+        resolver.resolver.from_alias("r")
+        resolver.resolver.from_alias("reddit")
+
+        models.Alias.objects.filter(name="r").delete()
+        self.assertIsNone(resolver.resolver.from_alias("r"))
+
+        self.reddit.delete()
+        self.assertIsNone(resolver.resolver.from_alias("reddit"))
+
+    def test_invalidate_other_process(self) -> None:
+        """Test that cached records are invalidated by the next version check after another process writes."""
+        other_resolver = resolver.DestinationResolver(16, version_check_interval=60.0)
+        other_resolver.from_alias("r")
+        self.reddit.url = "https://old.reddit.com/r/{}"
+        self.reddit.save()
+
+        # Until the next check is due, the cache is served without querying the database
+        with self.assertNumQueries(0):
+            self.assertEqual("https://www.reddit.com/r/{}", other_resolver.from_alias("r").url)  # type: ignore
+        other_resolver._next_version_check = 0.0
+        self.assertEqual("https://old.reddit.com/r/{}", other_resolver.from_alias("r").url)  # type: ignore
+
+    def test_invalidate_on_create_with_aliases(self) -> None:
+        """Test that ``DestinationManager.create_with_aliases`` invalidates the cache."""
+        self.assertIsNone(resolver.resolver.from_alias("ddg"))
+        resolver.resolver.from_alias("r")
+
+        with self.assertNumQueries(0):
+            resolver.resolver.from_alias("r")
+        models.Destination.objects.create_with_aliases("https://duckduckgo.com/?q={}", "DuckDuckGo", ["ddg"])
+        self.assertIsNotNone(resolver.resolver.from_alias("ddg"))
+        with self.assertNumQueries(1):
+            resolver.resolver.from_alias("r")
+
+
+class TestStaleWhileError(django_unittest.TestCase):
+    """Tests for serving redirects from ``resolver.ResolverSnapshot`` when the database is unavailable."""
+
+    def setUp(self) -> None:
+        run_background_tasks_inline(self)
+        self.reddit = resolver.ResolvedDestination.from_destination(
+            models.Destination.objects.create_with_aliases("https://www.reddit.com/r/{}", "Reddit", ["r", "reddit"])
+        )
+        self.ddg = resolver.ResolvedDestination.from_destination(
+            models.Destination.objects.create_with_aliases(
+                "https://duckduckgo.com/?q={}", "DuckDuckGo", ["ddg"], True, True
+            )
+        )
+
+    def test_snapshot_resolve(self) -> None:
+        """Test that ``ResolverSnapshot.resolve`` follows the same order as ``DestinationManager.resolve``."""
+        snapshot = resolver.ResolverSnapshot.from_database()
+        tests = [
+            TestUnit("alias", (self.reddit, False), snapshot.resolve("r", "ddg")),
+            TestUnit("fallback_alias", (self.ddg, True), snapshot.resolve("rr", "ddg")),
+            TestUnit("default_fallback", (self.ddg, True), snapshot.resolve("rr", "rrr")),
+            TestUnit("no_alias", (self.ddg, True), snapshot.resolve(None)),
+        ]
+        run_test_units(self, tests)
+
+        snapshot = resolver.ResolverSnapshot({}, None)
+        self.assertRaises(models.Destination.DoesNotExist, snapshot.resolve, "r")
+
+    def test_snapshot_save_load(self) -> None:
+        """Test that snapshots survive a round trip through a file."""
+        snapshot = resolver.ResolverSnapshot.from_database()
+        with tempfile.TemporaryDirectory() as temp_dir:
+            path = Path(temp_dir).joinpath("snapshot.json")
+            snapshot.save(path)
+            loaded = resolver.ResolverSnapshot.load(path)
+
+        self.assertEqual(snapshot.aliases, loaded.aliases)
+        self.assertEqual(snapshot.default_fallback, loaded.default_fallback)
+
+    def test_resolve_database_error(self) -> None:
+        """Test that the resolver serves redirects from the snapshot when the database raises an error."""
+        destination_resolver = resolver.DestinationResolver(16, stale_while_error=True)
+        self.assertEqual((self.reddit, False), destination_resolver.resolve("reddit"))
+        destination_resolver.invalidate()
+
+        with mock.patch.object(models.DestinationManager, "resolve", side_effect=OperationalError("down")):
+            with self.assertLogs("hare.core.resolver", "WARNING"):
+                self.assertEqual((self.reddit, False), destination_resolver.resolve("r"))
+                self.assertEqual((self.ddg, True), destination_resolver.resolve("python", "ggg"))
+
+            # Without a snapshot the error is raised
+            self.assertRaises(OperationalError, resolver.DestinationResolver(16).resolve, "r")
+
+    def test_resolve_query_timeout(self) -> None:
+        """Test that the resolver serves redirects from the snapshot when a query exceeds the deadline."""
+        destination_resolver = resolver.DestinationResolver(16, stale_while_error=True)
+        destination_resolver.resolve("r")
+        destination_resolver.invalidate()
+        destination_resolver.query_timeout = 0.05
+
+        with mock.patch.object(models.DestinationManager, "resolve", side_effect=lambda *_: time.sleep(0.5)):
+            with self.assertLogs("hare.core.resolver", "WARNING"):
+                self.assertEqual((self.reddit, False), destination_resolver.resolve("r"))
+
+    def test_resolve_query_workers_busy(self) -> None:
+        """Test that the resolver skips the database while every query worker is busy, rather than queueing."""
+        destination_resolver = resolver.DestinationResolver(16, stale_while_error=True, max_query_workers=1)
+        destination_resolver.resolve("r")
+        destination_resolver.invalidate()
+        destination_resolver.query_timeout = 0.05
+        release = threading.Event()
+
+        with mock.patch.object(
+            models.DestinationManager, "resolve", side_effect=lambda *_: release.wait(5)
+        ) as mock_resolve:
+            try:
+                with self.assertLogs("hare.core.resolver", "WARNING"):
+                    self.assertEqual((self.reddit, False), destination_resolver.resolve("r"))
+                    self.assertEqual((self.reddit, False), destination_resolver.resolve("reddit"))
+                self.assertEqual(1, mock_resolve.call_count)
+            finally:
+                release.set()
+
+    def test_load_snapshot(self) -> None:
+        """Test that a new resolver serves redirects from a persisted snapshot before reaching the database."""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            path = Path(temp_dir).joinpath("snapshot.json")
+            resolver.DestinationResolver(16, stale_while_error=True, snapshot_path=path).resolve("r")
+
+            destination_resolver = resolver.DestinationResolver(16, stale_while_error=True, snapshot_path=path)
+            destination_resolver.load_snapshot()
+
+        with mock.patch.object(models.DestinationManager, "resolve", side_effect=OperationalError("down")):
+            with self.assertLogs("hare.core.resolver", "WARNING"):
+                self.assertEqual((self.reddit, False), destination_resolver.resolve("r"))
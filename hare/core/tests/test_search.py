@@ -0,0 +1,180 @@
+## MIT License
+##
+## Copyright (c) 2021 conveen
+##
+## Permission is hereby granted, free of charge, to any person obtaining a copy
+## of this software and associated documentation files (the "Software"), to deal
+## in the Software without restriction, including without limitation the rights
+## to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+## copies of the Software, and to permit persons to whom the Software is
+## furnished to do so, subject to the following conditions:
+##
+## The above copyright notice and this permission notice shall be included in all
+## copies or substantial portions of the Software.
+##
+## THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+## IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+## FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+## AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+## LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+## OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+## SOFTWARE.
+
+from unittest import mock
+
+import django.test as django_unittest
+from django.core.management import call_command
+
+from hare.core import models, search, suggestions
+from hare.core.tests_utils import run_test_units, TestUnit
+
+
+class TestSearch(django_unittest.TestCase):
+    """Tests for full-text search of shortcuts with ``search``."""
+
+    def setUp(self) -> None:
+        self.reddit = models.Destination.objects.create_with_aliases(
+            "https://www.reddit.com/r/{}", "Reddit", ["r", "subreddit"]
+        )
+        self.python = models.Destination.objects.create_with_aliases(
+            "https://docs.python.org/3/search.html?q={}", "Python documentation", ["py", "pydocs"]
+        )
+        self.github = models.Destination.objects.create_with_aliases(
+            "https://github.com/search?q={}", "Code search", ["gh", "python-code"]
+        )
+
+    def test_search(self) -> None:
+        """Test that every token must prefix a token of the destination, and results are ranked by field."""
+        for backend in (search.get_backend(), search.FALLBACK_BACKEND):
+            with mock.patch.object(search, "get_backend", return_value=backend):
+                tests = [
+                    TestUnit(f"{type(backend).__name__}_prefix", [self.reddit.id], search.search("sub")),
+                    TestUnit(f"{type(backend).__name__}_url", [self.reddit.id], search.search("reddit.com")),
+                    TestUnit(f"{type(backend).__name__}_all_tokens", [self.python.id], search.search("py docs")),
+                    TestUnit(
+                        f"{type(backend).__name__}_ranked",
+                        [self.github.id, self.python.id],
+                        search.search("python"),
+                    ),
+                    TestUnit(f"{type(backend).__name__}_limit", [self.github.id], search.search("python", 1)),
+                    TestUnit(f"{type(backend).__name__}_no_match", [], search.search("ruby")),
+                    TestUnit(f"{type(backend).__name__}_syntax", [], search.search('" OR * NEAR( -')),
+                ]
+                run_test_units(self, tests)
+
+    def test_filter_destinations(self) -> None:
+        """Test that destinations are filtered to every match, unranked, and can be ordered and counted."""
+        for backend in (search.get_backend(), search.FALLBACK_BACKEND):
+            with mock.patch.object(search, "get_backend", return_value=backend):
+                destinations = models.Destination.objects.order_by("id")
+                tests = [
+                    TestUnit(
+                        f"{type(backend).__name__}_all_matches",
+                        [self.python.id, self.github.id],
+                        list(search.filter_destinations(destinations, "python").values_list("id", flat=True)),
+                    ),
+                    TestUnit(
+                        f"{type(backend).__name__}_count",
+                        1,
+                        search.filter_destinations(destinations, "py docs").count(),
+                    ),
+                    TestUnit(
+                        f"{type(backend).__name__}_no_tokens", 0, search.filter_destinations(destinations, "/").count()
+                    ),
+                ]
+                run_test_units(self, tests)
+
+    def test_index_maintained(self) -> None:
+        """Test that the index is updated with every write to destinations and aliases."""
+        models.Alias.objects.create(name="reddit-home", destination=self.reddit)
+        self.python.description = "Snake manual"
+        self.python.save()
+        models.Destination.objects.update_aliases(self.github, remove=["python-code"], add=["octocat"])
+        github_id = self.github.id
+        self.github.delete()
+        [ruby] = models.Destination.objects.create_many_with_aliases(
+            [models.NewShortcut("https://www.ruby-lang.org", "Ruby", ["rb"])]
+        )
+
+        tests = [
+            TestUnit("alias_created", [self.reddit.id], search.search("home")),
+            TestUnit("description_updated", [self.python.id], search.search("snake")),
+            TestUnit("description_removed", [], search.search("documentation")),
+            TestUnit("destination_deleted", False, github_id in search.search("search")),
+            TestUnit("bulk_created", [ruby.id], search.search("ruby")),
+        ]
+        run_test_units(self, tests)
+
+    def test_rebuild_index(self) -> None:
+        """Test that the rebuilt index contains every destination."""
+        call_command("rebuild_search_index")
+        self.assertEqual([self.github.id, self.python.id], search.search("python"))
+
+
+class TestAliasSuggester(django_unittest.TestCase):
+    """Tests for "did you mean" suggestions with ``suggestions.AliasSuggester``."""
+
+    def setUp(self) -> None:
+        self.github = models.Destination.objects.create_with_aliases(
+            "https://github.com/search?q={}", "GitHub", ["github", "gh"]
+        )
+        models.Destination.objects.create_with_aliases("https://gitlab.com/search?search={}", "GitLab", ["gitlab"])
+        models.Destination.objects.create_with_aliases("https://www.python.org", "Python", ["py", "python"])
+        self.suggester = suggestions.AliasSuggester(refresh_interval=0)
+
+    def test_gen_edit_distance(self) -> None:
+        """Test that transpositions count as one edit and distances over the budget are rejected."""
+        tests = [
+            TestUnit("equal", 0, suggestions.gen_edit_distance("github", "github", 2)),
+            TestUnit("transposition", 1, suggestions.gen_edit_distance("gihtub", "github", 2)),
+            TestUnit("insertion_deletion", 2, suggestions.gen_edit_distance("githb", "gitxhub", 2)),
+            TestUnit("over_budget", None, suggestions.gen_edit_distance("kitten", "sitting", 2)),
+            TestUnit("length_over_budget", None, suggestions.gen_edit_distance("g", "github", 2)),
+        ]
+        run_test_units(self, tests)
+
+    def test_suggest(self) -> None:
+        """Test that aliases within the edit distance are suggested, closest first."""
+        tests = [
+            TestUnit("transposition", ["github"], self.suggester.suggest("gihtub")),
+            TestUnit("closest_first", ["gitlab", "github"], self.suggester.suggest("gitlaub")),
+            TestUnit("budget", ["gitlab"], self.suggester.suggest("gitlaub", 1)),
+            TestUnit("budget_by_length", ["gitlab"], self.suggester.suggest("gitlb")),
+            TestUnit("too_short", [], self.suggester.suggest("hg")),
+            TestUnit("case_insensitive", ["python"], self.suggester.suggest("PYHTON")),
+            TestUnit("limit", ["gitlab"], self.suggester.suggest("gitlaub", limit=1)),
+            TestUnit("no_match", [], self.suggester.suggest("duckduckgo")),
+        ]
+        run_test_units(self, tests)
+
+        with self.assertRaises(ValueError):
+            self.suggester.suggest("gihtub", self.suggester.max_distance + 1)
+
+    def test_refresh_interval(self) -> None:
+        """Test that the shortcuts version is only checked once per refresh interval."""
+        suggester = suggestions.AliasSuggester(refresh_interval=60)
+        suggester.suggest("gihtub")
+
+        with self.assertNumQueries(0):
+            self.assertEqual(["github"], suggester.suggest("gihtub"))
+
+    def test_incremental_refresh(self) -> None:
+        """Test that only the aliases of destinations changed since the last lookup are reloaded."""
+        self.suggester.suggest("gihtub")
+
+        with self.assertNumQueries(1):
+            self.suggester.suggest("gihtub")
+
+        models.Destination.objects.update_aliases(self.github, add=["hub"], remove=["github"])
+        models.Destination.objects.create_with_aliases("https://bitbucket.org", "Bitbucket", ["bitbucket"])
+        with self.assertNumQueries(3):
+            tests = [
+                TestUnit("removed", [], self.suggester.suggest("gihtub")),
+            ]
+        tests.extend(
+            [
+                TestUnit("added", ["hub"], self.suggester.suggest("hbu", 1)),
+                TestUnit("created", ["bitbucket"], self.suggester.suggest("bitbukcet")),
+            ]
+        )
+        run_test_units(self, tests)
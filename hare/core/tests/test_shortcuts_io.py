@@ -0,0 +1,161 @@
+## MIT License
+##
+## Copyright (c) 2021 conveen
+##
+## Permission is hereby granted, free of charge, to any person obtaining a copy
+## of this software and associated documentation files (the "Software"), to deal
+## in the Software without restriction, including without limitation the rights
+## to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+## copies of the Software, and to permit persons to whom the Software is
+## furnished to do so, subject to the following conditions:
+##
+## The above copyright notice and this permission notice shall be included in all
+## copies or substantial portions of the Software.
+##
+## THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+## IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+## FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+## AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+## LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+## OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+## SOFTWARE.
+
+import csv
+from pathlib import Path
+import tempfile
+import typing
+
+import django.test as django_unittest
+from django.core.management import call_command
+
+from hare.core import models, shortcuts_io
+from hare.core.tests_utils import run_test_units, TestUnit
+
+
+class TestShortcutsIO(django_unittest.TestCase):
+    """Tests for importing shortcuts with ``shortcuts_io``."""
+
+    def setUp(self) -> None:
+        self.reddit = models.Destination.objects.create_with_aliases(
+            "https://www.reddit.com/r/{}", "Reddit", ["r", "reddit"]
+        )
+
+    def test_parse_jsonl(self) -> None:
+        """Test that JSON Lines are parsed into rows, and invalid lines into errors."""
+        rows = list(
+            shortcuts_io.parse_jsonl(
+                [
+                    '{"url": "https://www.python.org", "description": "Python", "aliases": ["py"]}\n',
+                    "\n",
+                    "{not json\n",
+                    '{"url": "https://www.python.org", "aliases": "py"}\n',
+                ]
+            )
+        )
+        tests = [
+            TestUnit(
+                "valid",
+                shortcuts_io.ShortcutRow(1, "https://www.python.org", "Python", ["py"], False, False),
+                rows[0],
+            ),
+            TestUnit("invalid_json", 3, rows[1].line),
+            TestUnit("invalid_aliases", shortcuts_io.RowError(4, "Aliases must be a list of strings"), rows[2]),
+            TestUnit("skip_blank", 3, len(rows)),
+        ]
+        run_test_units(self, tests)
+
+    def test_parse_csv(self) -> None:
+        """Test that CSV rows are parsed into rows, with space separated aliases."""
+        rows = list(
+            shortcuts_io.parse_csv(
+                [
+                    "url,description,aliases,is_fallback\n",
+                    "https://duckduckgo.com/?q={},DuckDuckGo,ddg duckduckgo,true\n",
+                ]
+            )
+        )
+        self.assertEqual(
+            [
+                shortcuts_io.ShortcutRow(
+                    2, "https://duckduckgo.com/?q={}", "DuckDuckGo", ["ddg", "duckduckgo"], True, False
+                ),
+            ],
+            rows,
+        )
+
+    def test_parse_csv_reader_error(self) -> None:
+        """Test that a row the CSV reader rejects is reported as an error without aborting the parse."""
+        field_size_limit = csv.field_size_limit(64)
+        try:
+            rows = list(
+                shortcuts_io.parse_csv(
+                    [
+                        "url,description,aliases\n",
+                        f"https://www.python.org,{'x' * 65},py\n",
+                        "https://github.com,GitHub,gh\n",
+                    ]
+                )
+            )
+        finally:
+            csv.field_size_limit(field_size_limit)
+
+        tests = [
+            TestUnit("oversized_field", 2, rows[0].line),
+            TestUnit("oversized_field_error", True, isinstance(rows[0], shortcuts_io.RowError)),
+            TestUnit(
+                "next_row", shortcuts_io.ShortcutRow(3, "https://github.com", "GitHub", ["gh"], False, False), rows[1]
+            ),
+        ]
+        run_test_units(self, tests)
+
+    def test_import_shortcuts(self) -> None:
+        """Test that valid rows are imported in batches and invalid rows are reported without aborting."""
+        rows = shortcuts_io.parse_jsonl(
+            [
+                '{"url": "https://www.python.org", "description": "Python", "aliases": ["py", "python"]}',
+                '{"url": "https://www.reddit.com/r/{}", "aliases": ["subreddit"]}',
+                '{"url": "https://docs.python.org/3/search.html?q={}", "aliases": ["pydocs", "r"]}',
+                '{"url": "https://github.com", "aliases": ["py"]}',
+                '{"url": "ftp://example.com", "aliases": ["ftp"]}',
+                '{"url": "https://github.com", "aliases": ["gh"], "is_fallback": true}',
+                '{"url": "https://duckduckgo.com/?q={}", "aliases": ["ddg"], "is_default_fallback": true}',
+            ]
+        )
+        result = shortcuts_io.import_shortcuts(rows, batch_size=2)
+
+        self.assertEqual(2, result.num_created)
+        self.assertEqual([2, 3, 4, 5, 6], [error.line for error in result.errors])
+        self.assertEqual("Python", models.Destination.objects.from_alias("python").description)  # type: ignore
+        default_fallback = typing.cast(models.Destination, models.Destination.objects.default_fallback())
+        self.assertEqual(["https://duckduckgo.com/?q=", ""], default_fallback.url_segments)
+        self.assertFalse(models.Alias.objects.filter(name__in=["subreddit", "pydocs", "gh"]).exists())
+
+    def test_import_shortcuts_command(self) -> None:
+        """Test that the ``import_shortcuts`` command imports CSV files."""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            path = Path(temp_dir).joinpath("shortcuts.csv")
+            path.write_text("url,description,aliases\nhttps://www.python.org,Python,py python\n")
+            with self.assertLogs("hare.core.management.commands.import_shortcuts", "INFO"):
+                call_command("import_shortcuts", str(path))
+
+        self.assertEqual(
+            {"py", "python"},
+            set(models.Alias.objects.filter(destination__description="Python").values_list("name", flat=True)),
+        )
+
+    def test_export_shortcuts(self) -> None:
+        """Test that exported shortcuts can be imported again, in both formats."""
+        models.Destination.objects.create_with_aliases(
+            "https://duckduckgo.com/?q={}", "DuckDuckGo", ["ddg"], True, True
+        )
+        for file_format in shortcuts_io.FORMATS:
+            with self.subTest(file_format=file_format):
+                lines = list(shortcuts_io.export_shortcuts(file_format, chunk_size=1))
+                records = [row._asdict() for row in shortcuts_io.parse_shortcuts(lines, file_format)]
+                self.assertEqual(
+                    [
+                        ["https://www.reddit.com/r/{}", "Reddit", ["r", "reddit"], False, False],
+                        ["https://duckduckgo.com/?q={}", "DuckDuckGo", ["ddg"], True, True],
+                    ],
+                    [[record[field] for field in shortcuts_io.FIELDS] for record in records],
+                )
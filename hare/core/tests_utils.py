@@ -22,9 +22,12 @@
 
 import typing
 import unittest
+from unittest import mock
 
 import django.test as django_unittest
 
+from hare.core import resolver
+
 
 class TestUnit:
     """Single unit test.
@@ -74,3 +77,14 @@ def run_test_units(
     """Run sequence of test units."""
     for test_unit in test_units:
         test_unit.run_test(test_instance)
+
+
+def run_background_tasks_inline(test_instance: typing.Union[django_unittest.TestCase, unittest.TestCase]) -> None:
+    """Run resolver background tasks (see: ``resolver._run_in_background``) inline until the end of the test.
+
+    Background threads have their own database connection, which can't read rows written by a test
+    that runs in a transaction (i.e., ``django.test.TestCase``).
+    """
+    patcher = mock.patch.object(resolver, "_run_in_background", side_effect=lambda function, _name: function())
+    patcher.start()
+    test_instance.addCleanup(patcher.stop)
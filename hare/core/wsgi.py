@@ -0,0 +1,86 @@
+## MIT License
+##
+## Copyright (c) 2021 conveen
+##
+## Permission is hereby granted, free of charge, to any person obtaining a copy
+## of this software and associated documentation files (the "Software"), to deal
+## in the Software without restriction, including without limitation the rights
+## to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+## copies of the Software, and to permit persons to whom the Software is
+## furnished to do so, subject to the following conditions:
+##
+## The above copyright notice and this permission notice shall be included in all
+## copies or substantial portions of the Software.
+##
+## THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+## IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+## FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+## AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+## LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+## OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+## SOFTWARE.
+
+import logging
+import typing
+from urllib.parse import parse_qs
+
+from django.conf import settings
+from django.core.handlers.wsgi import get_script_name
+from django.db import close_old_connections
+from django.urls import set_script_prefix
+from django.utils.encoding import iri_to_uri
+
+from hare.core import redirect
+
+
+logger = logging.getLogger(__name__)
+StartResponse = typing.Callable[..., typing.Any]
+WSGIApplication = typing.Callable[[typing.Dict[str, typing.Any], StartResponse], typing.Iterable[bytes]]
+
+
+class RedirectApplication:
+    """WSGI application that answers redirect requests before they reach Django.
+
+    Redirect requests (``GET /?query=<alias(+arg_1+...+arg_N)?>(&fallback=<fallback_alias>)?``)
+    are resolved with ``redirect.gen_redirect_url_if_allowed`` without going through the Django middleware stack.
+    Every other request, including redirects to a fallback destination that may need to show alias suggestions
+    (see: ``hare.ui.views.index``), and any redirect request that fails with an unexpected error,
+    falls through to ``application`` so that Django handles (and logs) it as usual.
+    """
+
+    __slots__ = ("application",)
+
+    def __init__(self, application: WSGIApplication) -> None:
+        self.application = application
+
+    def __call__(self, environ: typing.Dict[str, typing.Any], start_response: StartResponse) -> typing.Iterable[bytes]:
+        if environ.get("PATH_INFO", "/") not in {"", "/"} or environ.get("REQUEST_METHOD") not in {"GET", "HEAD"}:
+            return self.application(environ, start_response)
+
+        # PEP 3333 strings are decoded as ISO-8859-1, so re-decode as UTF-8 like Django does
+        query_string = environ.get("QUERY_STRING", "").encode("iso-8859-1").decode("utf-8", "replace")
+        params = parse_qs(query_string)
+        if "query" not in params:
+            return self.application(environ, start_response)
+
+        set_script_prefix(get_script_name(environ))
+        try:
+            url = redirect.gen_redirect_url_if_allowed(
+                params["query"][0],
+                params.get("fallback", [None])[0],
+                # Fallbacks may need to show alias suggestions
+                allow_fallback=settings.ALIAS_SUGGESTION_DISTANCE is None,
+            )
+        except ValueError:
+            start_response("400 Bad Request", [("Content-Type", "text/plain"), ("Content-Length", "0")])
+            return [b""]
+        except Exception:  # pylint: disable=broad-except
+            logger.debug("Failed to resolve redirect, falling through to Django", exc_info=True)
+            url = None
+        finally:
+            close_old_connections()
+
+        if url is None:
+            return self.application(environ, start_response)
+        start_response("302 Found", [("Location", iri_to_uri(url)), ("Content-Length", "0")])
+        return [b""]
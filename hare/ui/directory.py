@@ -0,0 +1,113 @@
+## MIT License
+##
+## Copyright (c) 2021 conveen
+##
+## Permission is hereby granted, free of charge, to any person obtaining a copy
+## of this software and associated documentation files (the "Software"), to deal
+## in the Software without restriction, including without limitation the rights
+## to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+## copies of the Software, and to permit persons to whom the Software is
+## furnished to do so, subject to the following conditions:
+##
+## The above copyright notice and this permission notice shall be included in all
+## copies or substantial portions of the Software.
+##
+## THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+## IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+## FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+## AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+## LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+## OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+## SOFTWARE.
+
+import typing
+
+from django.db.models import Min, QuerySet
+
+from hare.core import aggregates, models, search as search_index
+
+
+# Columns of the directory table, in display order, and the expression each is ordered by
+COLUMNS = ("aliases", "description", "url")
+ORDER_BY = {
+    "aliases": "first_alias",
+    "description": "description",
+    "url": "url",
+}
+# Default and maximum number of rows per page
+PAGE_LENGTH = 25
+MAX_PAGE_LENGTH = 500
+# Number of rows fetched from the database at a time when iterating over the whole directory
+CHUNK_SIZE = 500
+
+DirectoryRow = typing.Dict[str, typing.Union[str, typing.List[str]]]
+
+
+class DirectoryPage(typing.NamedTuple):
+    """Page of the directory table, in the shape DataTables server-side processing expects."""
+
+    records_total: int
+    records_filtered: int
+    rows: typing.List[DirectoryRow]
+
+
+def _filter_destinations(search: str) -> QuerySet:
+    """Filter destinations where every word of ``search`` prefixes a word of the description, URL, or an alias.
+
+    Matches are looked up in the search index (see: ``search.filter_destinations``), rather than scanning
+    the destination and alias tables for every keystroke.
+    """
+    destinations = models.Destination.objects.all()
+    if not search:
+        return destinations
+    return search_index.filter_destinations(destinations, search)
+
+
+def gen_directory_page(
+    start: int = 0,
+    length: int = PAGE_LENGTH,
+    search: str = "",
+    order_column: str = "description",
+    descending: bool = False,
+) -> DirectoryPage:
+    """Search, order, and paginate the directory in the database.
+
+    Only the rows on the page are fetched, one row per destination with its aliases (sorted by name)
+    aggregated in the database (see: ``aggregates.iter_values_with_aliases``), so the cost of rendering
+    a page doesn't depend on the size of the directory. Rows are ordered by ``order_column``
+    (one of ``COLUMNS``, where aliases are ordered by their first alias), then by ID for a stable order.
+
+    Search results are only counted if they don't all fit on the page.
+    """
+    records_total = models.Destination.objects.count()
+    destinations = _filter_destinations(search)
+
+    ordered = destinations
+    if order_column == "aliases":
+        ordered = ordered.annotate(first_alias=Min("alias__name"))
+    order_by = f"-{ORDER_BY[order_column]}" if descending else ORDER_BY[order_column]
+    rows: typing.List[DirectoryRow] = [
+        {"aliases": aliases, "description": description, "url": url}
+        for description, url, aliases in aggregates.iter_values_with_aliases(
+            ordered.order_by(order_by, "id"), ("description", "url"), start, start + length
+        )
+    ]
+
+    if not search:
+        records_filtered = records_total
+    elif len(rows) < length and (rows or not start):
+        records_filtered = start + len(rows)
+    else:
+        records_filtered = destinations.count()
+    return DirectoryPage(records_total, records_filtered, rows)
+
+
+def iter_directory(chunk_size: int = CHUNK_SIZE) -> typing.Iterator[typing.Tuple[str, str, typing.List[str]]]:
+    """Iterate over the description, URL, and aliases (sorted by name) of every destination, sorted by description.
+
+    Rows are streamed from the database ``chunk_size`` at a time (from a server-side cursor where the backend
+    supports one), so memory use doesn't depend on the size of the directory.
+    """
+    return aggregates.iter_values_with_aliases(
+        models.Destination.objects.order_by("description", "id"), ("description", "url"), chunk_size=chunk_size
+    )
@@ -19,3 +19,237 @@
 ## LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
 ## OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
 ## SOFTWARE.
+
+import typing
+from urllib.parse import urlencode
+
+import django.test as django_unittest
+from django.urls import reverse
+
+from hare.core import models, resolver, suggestions
+from hare.core.tests_utils import run_background_tasks_inline, run_test_units, TestUnit
+from hare.ui import directory, views
+
+
+class TestIndex(django_unittest.TestCase):
+    """Tests for the ``index`` view."""
+
+    def setUp(self) -> None:
+        run_background_tasks_inline(self)
+        resolver.resolver.invalidate()
+        models.Destination.objects.create_with_aliases("https://www.reddit.com/r/{}", "Reddit", ["r"])
+        models.Destination.objects.create_with_aliases(
+            "https://duckduckgo.com/?q={}", "DuckDuckGo", ["ddg"], True, True
+        )
+
+    def test_no_query(self) -> None:
+        """Test that requests without a query redirect to the shortcut directory."""
+        self.assertRedirects(self.client.get(reverse("index")), reverse("list-destinations"))
+
+    def test_query(self) -> None:
+        """Test that requests with a query redirect to the resolved destination."""
+        response = self.client.get(reverse("index"), {"query": "r python"})
+        self.assertRedirects(response, "https://www.reddit.com/r/python", fetch_redirect_response=False)
+
+        response = self.client.get(reverse("index"), {"query": "python docs"})
+        self.assertRedirects(response, "https://duckduckgo.com/?q=python+docs", fetch_redirect_response=False)
+
+    def test_query_too_few_arguments(self) -> None:
+        """Test that requests with fewer arguments than the destination accepts are rejected."""
+        self.assertEqual(400, self.client.get(reverse("index"), {"query": "r"}).status_code)
+
+    def test_query_suggestions(self) -> None:
+        """Test that similar aliases are suggested for mistyped aliases when enabled, before the fallback."""
+        suggestions.suggester.clear()
+        self.addCleanup(suggestions.suggester.clear)
+        models.Destination.objects.create_with_aliases("https://github.com/search?q={}", "GitHub", ["github"])
+
+        with self.settings(ALIAS_SUGGESTION_DISTANCE=2):
+            response = self.client.get(reverse("index"), {"query": "gihtub python"})
+            self.assertEqual(200, response.status_code)
+            self.assertEqual(
+                [("github", f"{reverse('index')}?{urlencode({'query': 'github python'})}")],
+                response.context["suggestions"],
+            )
+            self.assertEqual("https://duckduckgo.com/?q=gihtub+python", response.context["redirect_url"])
+
+            response = self.client.get(reverse("index"), {"query": "zzzzzz"})
+            self.assertRedirects(response, "https://duckduckgo.com/?q=zzzzzz", fetch_redirect_response=False)
+
+        response = self.client.get(reverse("index"), {"query": "gihtub python"})
+        self.assertRedirects(response, "https://duckduckgo.com/?q=gihtub+python", fetch_redirect_response=False)
+
+    def test_query_search_not_suggested(self) -> None:
+        """Test that search text still redirects to the fallback when suggestions are enabled."""
+        suggestions.suggester.clear()
+        self.addCleanup(suggestions.suggester.clear)
+        for alias, url in (
+            ("gh", "https://github.com/search?q={}"),
+            ("go", "https://pkg.go.dev/search?q={}"),
+            ("so", "https://stackoverflow.com/search?q={}"),
+            ("wp", "https://en.wikipedia.org/wiki/{}"),
+            ("yt", "https://www.youtube.com/results?search_query={}"),
+            ("github", "https://github.com"),
+        ):
+            models.Destination.objects.create_with_aliases(url, alias, [alias])
+
+        with self.settings(ALIAS_SUGGESTION_DISTANCE=2):
+            for query in ("how to cook rice", "the weather", "why is sky blue", "a", "gihtub python"):
+                with self.subTest(query=query):
+                    response = self.client.get(reverse("index"), {"query": query})
+                    self.assertEqual(302, response.status_code)
+
+            # Suggested once the number of arguments matches the destination
+            response = self.client.get(reverse("index"), {"query": "gihtub"})
+            self.assertEqual(["github"], [alias for alias, _url in response.context["suggestions"]])
+
+    async def test_index_async(self) -> None:
+        """Test that ``index_async`` redirects like ``index``."""
+        factory = django_unittest.AsyncRequestFactory()
+
+        response = await views.index_async(factory.get(reverse("index")))
+        self.assertEqual(reverse("list-destinations"), response.url)
+
+        for query, status_code, url in (
+            ("r python", 302, "https://www.reddit.com/r/python"),
+            ("python docs", 302, "https://duckduckgo.com/?q=python+docs"),
+            ("r", 400, None),
+        ):
+            with self.subTest(query=query):
+                # Django 3.2's AsyncRequestFactory ignores the data argument for GET requests
+                response = await views.index_async(factory.get(f"{reverse('index')}?{urlencode({'query': query})}"))
+                self.assertEqual(status_code, response.status_code)
+                self.assertEqual(url, getattr(response, "url", None))
+
+
+class TestListDestinations(django_unittest.TestCase):
+    """Tests for the ``ListDestinations`` view."""
+
+    def setUp(self) -> None:
+        models.Destination.objects.create_with_aliases("https://www.reddit.com/r/{}", "Reddit", ["r"])
+
+    def test_not_modified(self) -> None:
+        """Test that the page isn't rendered again if the shortcuts haven't changed since the ETag was issued."""
+        # The first response sets the CSRF cookie, which the ETag covers
+        self.client.get(reverse("list-destinations"))
+        response = self.client.get(reverse("list-destinations"))
+        self.assertEqual(200, response.status_code)
+        etag = response["ETag"]
+
+        with self.assertNumQueries(1):
+            response = self.client.get(reverse("list-destinations"), HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(304, response.status_code)
+
+        models.Destination.objects.create_with_aliases("https://www.python.org", "Python", ["py"])
+        response = self.client.get(reverse("list-destinations"), HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(200, response.status_code)
+        self.assertNotEqual(etag, response["ETag"])
+
+    def test_first_page(self) -> None:
+        """Test that the page only renders the first page of the directory."""
+        models.Destination.objects.create_many_with_aliases(
+            [
+                models.NewShortcut(f"https://example.com/{index}", f"Example {index:03}", [f"e{index}"])
+                for index in range(100)
+            ]
+        )
+
+        response = self.client.get(reverse("list-destinations"))
+        self.assertEqual(directory.PAGE_LENGTH, len(response.context["directory"].rows))
+        self.assertContains(
+            response, '<tr><th scope="row">e0</th><td>Example 000</td><td>https://example.com/0</td></tr>'
+        )
+        self.assertNotContains(response, "Example 099")
+
+    def test_stream(self) -> None:
+        """Test that the whole directory is streamed in order, with the rows between the page head and footer."""
+        models.Destination.objects.create_with_aliases("https://www.python.org", "<Python>", ["python", "py"])
+        models.Destination.objects.create_many_with_aliases(
+            [
+                models.NewShortcut(f"https://example.com/{index}", f"Example {index:03}", [f"e{index}"])
+                for index in range(100)
+            ]
+        )
+
+        response = self.client.get(reverse("list-destinations"), {views.STREAM_PARAM: "1"})
+        self.assertTrue(response.streaming)
+        chunks = [chunk.decode("utf-8") for chunk in response.streaming_content]
+        content = "".join(chunks)
+        tests = [
+            TestUnit("head_first", True, chunks[0].rstrip().endswith("<tbody>")),
+            TestUnit("footer_last", True, chunks[-1].lstrip().startswith("</tbody>")),
+            TestUnit("all_rows", 102, content.count("<tr>") - 1),
+            TestUnit(
+                "escaped",
+                True,
+                '<tr><th scope="row">py, python</th><td>&lt;Python&gt;</td><td>https://www.python.org</td></tr>'
+                in content,
+            ),
+            TestUnit("ordered", True, content.index("Example 000") < content.index("Example 099")),
+            TestUnit("client_side", False, "serverSide" in content),
+        ]
+        run_test_units(self, tests)
+
+
+class TestListDestinationsData(django_unittest.TestCase):
+    """Tests for the ``list_destinations_data`` view."""
+
+    def setUp(self) -> None:
+        models.Destination.objects.create_with_aliases("https://www.reddit.com/r/{}", "Reddit", ["r", "reddit"])
+        models.Destination.objects.create_with_aliases("https://www.python.org", "Python", ["py"])
+        models.Destination.objects.create_with_aliases("https://github.com", "GitHub", ["gh", "code"])
+
+    def get_data(self, **params: str) -> typing.Dict[str, typing.Any]:
+        response = self.client.get(reverse("list-destinations-data"), {"draw": "3", **params})
+        self.assertEqual(200, response.status_code)
+        return response.json()
+
+    def get_descriptions(self, **params: str) -> typing.List[str]:
+        return [row[1] for row in self.get_data(**params)["data"]]
+
+    def test_order(self) -> None:
+        """Test that rows are ordered by the requested column."""
+        tests = [
+            TestUnit("description", ["GitHub", "Python", "Reddit"], self.get_descriptions()),
+            TestUnit(
+                "description_desc", ["Reddit", "Python", "GitHub"], self.get_descriptions(**{"order[0][dir]": "desc"})
+            ),
+            TestUnit("aliases", ["GitHub", "Python", "Reddit"], self.get_descriptions(**{"order[0][column]": "0"})),
+            TestUnit("url", ["GitHub", "Python", "Reddit"], self.get_descriptions(**{"order[0][column]": "2"})),
+        ]
+        run_test_units(self, tests)
+
+    def test_search_and_paginate(self) -> None:
+        """Test that rows are searched by description, URL, or alias, and paginated."""
+        data = self.get_data(**{"search[value]": "code"})
+        self.assertEqual((3, 3, 1), (data["draw"], data["recordsTotal"], data["recordsFiltered"]))
+        self.assertEqual([["code, gh", "GitHub", "https://github.com"]], data["data"])
+
+        data = self.get_data(**{"search[value]": "https://www.", "start": "1", "length": "1"})
+        self.assertEqual(2, data["recordsFiltered"])
+        self.assertEqual(["Reddit"], [row[1] for row in data["data"]])
+
+    def test_search_prefix(self) -> None:
+        """Test that every searched word must prefix a word of the description, URL, or an alias."""
+        tests = [
+            TestUnit("description_prefix", ["Python"], self.get_descriptions(**{"search[value]": "pyth"})),
+            TestUnit("alias_and_url", ["Reddit"], self.get_descriptions(**{"search[value]": "r reddit.com"})),
+            TestUnit("infix", [], self.get_descriptions(**{"search[value]": "ython"})),
+            TestUnit("no_words", [], self.get_descriptions(**{"search[value]": "://"})),
+        ]
+        run_test_units(self, tests)
+
+    def test_search_counted_once(self) -> None:
+        """Test that search results are only counted when they don't fit on the page."""
+        with self.assertNumQueries(2):
+            page = directory.gen_directory_page(search="https")
+        self.assertEqual((3, 3), (page.records_total, page.records_filtered))
+
+        with self.assertNumQueries(3):
+            page = directory.gen_directory_page(length=1, search="https")
+        self.assertEqual((3, 3, 1), (page.records_total, page.records_filtered, len(page.rows)))
+
+    def test_invalid_parameters(self) -> None:
+        """Test that invalid parameters are rejected."""
+        response = self.client.get(reverse("list-destinations-data"), {"order[0][column]": "5"})
+        self.assertEqual(400, response.status_code)
@@ -20,33 +20,160 @@
 ## OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
 ## SOFTWARE.
 
-from collections import OrderedDict
+import itertools
 import logging
 import typing
+from urllib.parse import urlencode
 
+from asgiref.sync import sync_to_async
+from django.conf import settings
 from django.db import DatabaseError
 from django.contrib import messages
-from django.http import HttpRequest, HttpResponse, HttpResponseRedirect
+from django.http import (
+    HttpRequest,
+    HttpResponse,
+    HttpResponseBadRequest,
+    HttpResponseRedirect,
+    JsonResponse,
+    StreamingHttpResponse,
+)
+from django.shortcuts import render
+from django.template import loader
+from django.template.loader import render_to_string
 from django.views import generic
 from django.urls import reverse
+from django.utils.decorators import method_decorator
+from django.views.decorators.http import condition
 
-from hare.core import models
+from hare.core import conditional, models, redirect
+from hare.ui import directory
 from hare.ui.forms import CreateDestinationForm
 
 
 logger = logging.getLogger(__name__)
 
+# Query parameter that selects rendering the whole directory as a streamed page (see: ``ListDestinations``)
+STREAM_PARAM = "stream"
+# Placeholder the streamed page is split on, which is replaced by the directory rows
+STREAM_ROWS_MARKER = "<!-- directory-rows -->"
+# Rows of the directory table, shared by the first page and the streamed page
+DIRECTORY_ROWS_TEMPLATE = "ui/components/list-destinations/directory-rows.html"
+
 
 def index(request: HttpRequest) -> HttpResponse:
-    """Redirect to ``ListDestinations`` endpoint."""
-    return HttpResponseRedirect(reverse("list-destinations"))
+    """Redirect to destination for ``query`` URL parameter, or to ``ListDestinations`` endpoint if not provided.
+
+    GET request URL should follow the format:
+        "http(s)?://hare_domain.tld?(fallback=<fallback_alias>&)query=<alias(+arg_1+...+arg_N)?>"
+    See: ``redirect.gen_redirect_url`` for how the alias and arguments are resolved.
+    If the alias doesn't exist and aliases similar to it do, they are suggested before redirecting
+    to the fallback destination (see: ``gen_alias_suggestions``).
+    """
+    query = request.GET.get("query")
+    if query is None:
+        return HttpResponseRedirect(reverse("list-destinations"))
+
+    try:
+        redirect_url = redirect.gen_redirect_url(query, request.GET.get("fallback"))
+    except ValueError:
+        return HttpResponseBadRequest()
+    suggestions = gen_alias_suggestions(query)
+    if suggestions:
+        return render_alias_suggestions(request, query, redirect_url, suggestions)
+    return HttpResponseRedirect(redirect_url)
+
+
+async def index_async(request: HttpRequest) -> HttpResponse:
+    """Asynchronous version of ``index`` for ASGI deployments.
+
+    Redirects are resolved with ``redirect.gen_redirect_url_async``, so that cache hits
+    don't leave the event loop in the view. Django 3.2 still runs the synchronous middleware
+    in threads, so redirects resolved from memory are answered in front of Django instead
+    (see: ``hare.core.asgi.RedirectApplication``), and this view handles the rest.
+    """
+    query = request.GET.get("query")
+    if query is None:
+        return HttpResponseRedirect(reverse("list-destinations"))
+
+    try:
+        redirect_url = await redirect.gen_redirect_url_async(query, request.GET.get("fallback"))
+    except ValueError:
+        return HttpResponseBadRequest()
+    # Avoid a thread hop on every redirect when suggestions are disabled
+    suggestions = (
+        await sync_to_async(gen_alias_suggestions)(query) if settings.ALIAS_SUGGESTION_DISTANCE is not None else []
+    )
+    if suggestions:
+        return render_alias_suggestions(request, query, redirect_url, suggestions)
+    return HttpResponseRedirect(redirect_url)
+
+
+def gen_alias_suggestions(query: str) -> typing.List[str]:
+    """Suggest aliases similar to the alias in ``query`` if it doesn't exist (see: ``redirect.gen_alias_suggestions``).
+
+    Suggestions are disabled unless the ``ALIAS_SUGGESTION_DISTANCE`` setting is set, and are
+    skipped if the database is unavailable, so that redirects don't depend on them.
+    """
+    if settings.ALIAS_SUGGESTION_DISTANCE is None:
+        return []
+
+    try:
+        return redirect.gen_alias_suggestions(query, settings.ALIAS_SUGGESTION_DISTANCE)
+    except DatabaseError as exc:
+        logger.warning("Failed to suggest aliases for query {}", query, exc_info=exc)
+        return []
+
+
+def render_alias_suggestions(
+    request: HttpRequest,
+    query: str,
+    redirect_url: str,
+    suggestions: typing.List[str],
+) -> HttpResponse:
+    """Render "did you mean" page with links to ``query`` with each suggested alias, and to ``redirect_url``."""
+    _alias, arguments = redirect.parse_query(query)
+    fallback = request.GET.get("fallback")
+    return render(
+        request,
+        "ui/suggest-aliases.html",
+        {
+            "query": query,
+            "redirect_url": redirect_url,
+            "suggestions": [
+                (
+                    alias,
+                    f"{reverse('index')}?"
+                    + urlencode(
+                        {
+                            **({"fallback": fallback} if fallback else {}),
+                            "query": " ".join([alias, *arguments]),
+                        }
+                    ),
+                )
+                for alias in suggestions
+            ],
+        },
+    )
+
+
+def gen_list_destinations_etag(request: HttpRequest, *args, **kwargs) -> typing.Optional[str]:
+    """Generate ETag for the ``ListDestinations`` page (see: ``conditional.gen_shortcuts_etag``).
+
+    Pages with pending messages (i.e., after a failed submission) aren't cached, so the messages are shown.
+    """
+    if len(messages.get_messages(request)):
+        return None
+    return conditional.gen_shortcuts_etag(request, *args, **kwargs)
 
 
 class ListDestinations(generic.FormView):
     """List and add destinations with descriptions and aliases.
 
-    The ``GET`` handler lists all available destinations with descriptions and aliases
-    using the ``ui/list-destinations.html`` template.
+    The ``GET`` handler lists the first page of destinations with descriptions and aliases
+    using the ``ui/list-destinations.html`` template, and the table fetches the rest
+    from ``list_destinations_data`` as needed. If the ``stream`` query parameter is set,
+    the whole directory is rendered instead, and the page is streamed: the page head is sent
+    first, then the table rows as they are read from the database, then the rest of the page.
 
     The ``POST`` handler adds a new destination with aliases from the form rendered by
     the ``ui/list-destinations.html`` template. This view handles the ``POST`` request
@@ -63,32 +190,65 @@ class ListDestinations(generic.FormView):
     form_class = CreateDestinationForm
     template_name = "ui/list-destinations.html"
 
+    @method_decorator(condition(etag_func=gen_list_destinations_etag))
+    def get(self, request: HttpRequest, *args, **kwargs) -> HttpResponse:
+        if request.GET.get(STREAM_PARAM):
+            return self.render_to_streaming_response(self.get_context_data(stream=True))
+        return super().get(request, *args, **kwargs)
+
     @staticmethod
-    def gen_destinations_with_aliases() -> typing.Dict[int, typing.Dict[str, typing.Union[str, typing.List[str]]]]:
-        """Retrieve list of destinations and aliases from database.
+    def gen_directory_rows_html() -> typing.Iterator[str]:
+        """Render rows of the whole directory table, ``directory.CHUNK_SIZE`` rows at a time.
 
-        Aliases are aggregated per-destination and sorted in alphabetical order for display.
+        The response has already started by the time rows are read, so a database error
+        ends the table early rather than failing the request.
         """
-        # OrderedDict + ordering by Destination.description ensures the table is sorted by description in the UI
-        destinations: typing.Dict[int, typing.Dict[str, typing.Any]] = OrderedDict()
-        aliases = models.Alias.objects.select_related("destination").order_by("destination__description", "name").all()
+        template = loader.get_template(DIRECTORY_ROWS_TEMPLATE)
+        rows = directory.iter_directory()
         try:
-            for alias in aliases:
-                if alias.destination.id not in destinations:
-                    destinations[alias.destination.id] = {
-                        "url": alias.destination.url,
-                        "description": alias.destination.description,
-                        "aliases": [alias.name],
-                    }
-                else:
-                    destinations[alias.destination.id]["aliases"].append(alias.name)
+            while True:
+                chunk = [
+                    {"aliases": aliases, "description": description, "url": url}
+                    for description, url, aliases in itertools.islice(rows, directory.CHUNK_SIZE)
+                ]
+                if not chunk:
+                    return
+                yield template.render({"rows": chunk})
         except DatabaseError as exc:
             logger.warning("Failed to fetch destinations from database", exc_info=exc)
-        return destinations
+
+    def render_to_streaming_response(self, context: typing.Dict[str, typing.Any]) -> StreamingHttpResponse:
+        """Render the page around ``STREAM_ROWS_MARKER``, and stream it with the rows in place of the marker.
+
+        Only the rows being rendered are held in memory, so time to first byte and memory use
+        don't depend on the size of the directory.
+        """
+        page = render_to_string(self.get_template_names(), context, request=self.request)
+        head, footer = page.split(STREAM_ROWS_MARKER, 1)
+        return StreamingHttpResponse(
+            itertools.chain((head,), self.gen_directory_rows_html(), (footer,)),
+            content_type="text/html; charset=utf-8",
+        )
+
+    @staticmethod
+    def gen_directory_page() -> directory.DirectoryPage:
+        """Retrieve the first page of the directory, sorted by description (see: ``directory.gen_directory_page``).
+
+        Later pages, searches, and other orderings are fetched by the table from ``list_destinations_data``.
+        """
+        try:
+            return directory.gen_directory_page()
+        except DatabaseError as exc:
+            logger.warning("Failed to fetch destinations from database", exc_info=exc)
+            return directory.DirectoryPage(0, 0, [])
 
     def get_context_data(self, **kwargs) -> typing.Dict[typing.Any, typing.Any]:
         context = super().get_context_data(**kwargs)
-        context["destinations"] = self.gen_destinations_with_aliases()
+        if context.get("stream"):
+            context["rows_marker"] = STREAM_ROWS_MARKER
+        else:
+            context["directory"] = self.gen_directory_page()
+        context["page_length"] = directory.PAGE_LENGTH
         return context
 
     def form_valid(self, form: CreateDestinationForm) -> HttpResponse:
@@ -110,3 +270,38 @@ class ListDestinations(generic.FormView):
             )
             messages.error(self.request, "Could not add shortcut, please check submission and try again")
         return HttpResponseRedirect(reverse("list-destinations"))
+
+
+def list_destinations_data(request: HttpRequest) -> HttpResponse:
+    """Serve pages of the directory table for DataTables server-side processing.
+
+    Search, ordering, and pagination are done in the database (see: ``directory.gen_directory_page``),
+    using the request parameters sent by DataTables (only the first ordering column is supported).
+    See: https://datatables.net/manual/server-side
+    """
+    try:
+        draw = int(request.GET.get("draw", "0"))
+        start = max(int(request.GET.get("start", "0")), 0)
+        length = int(request.GET.get("length", str(directory.PAGE_LENGTH)))
+        order_column = directory.COLUMNS[int(request.GET.get("order[0][column]", "1"))]
+    except (ValueError, IndexError):
+        return HttpResponseBadRequest()
+    # DataTables requests every row with a length of -1
+    if length < 0 or length > directory.MAX_PAGE_LENGTH:
+        length = directory.MAX_PAGE_LENGTH
+
+    page = directory.gen_directory_page(
+        start,
+        length,
+        request.GET.get("search[value]", "").strip(),
+        order_column,
+        request.GET.get("order[0][dir]") == "desc",
+    )
+    return JsonResponse(
+        {
+            "draw": draw,
+            "recordsTotal": page.records_total,
+            "recordsFiltered": page.records_filtered,
+            "data": [[", ".join(row["aliases"]), row["description"], row["url"]] for row in page.rows],
+        }
+    )